@@ -38,7 +38,8 @@ def create_app(config_name=None):
         r"/api/*": {
             "origins": app.config['FRONTEND_URL'],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "X-Timezone", "Idempotency-Key"],
+            "expose_headers": ["Idempotent-Replayed", "Location", "X-Data-Stale"]
         }
     })
     
@@ -48,15 +49,146 @@ def create_app(config_name=None):
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    # Compress large responses
+    from app.middleware.compression import init_compression
+    init_compression(app)
+    
     # Register error handlers
     register_error_handlers(app)
     
     # Register blueprints
     register_blueprints(app)
     
+    # Deadlines, hedged reads and stale fallbacks for Supabase calls
+    from app.services.supabase_service import SupabaseService
+    SupabaseService.configure(
+        app.config['SUPABASE_TIMEOUT'],
+        app.config['SUPABASE_READ_DEADLINE'],
+        app.config['SUPABASE_HEDGE_DELAY'],
+        app.config['SUPABASE_READ_THREADS'],
+        app.config['STALE_FALLBACK_ENABLED'],
+        app.config['STALE_MAX_AGE'],
+        app.config['STALE_MAX_USERS']
+    )
+    
+    # Route suggestions across the configured models, skipping those that keep failing
+    # (before preloading, which creates the model instances for these routes)
+    from app.services.model_router import ModelRouter, parse_models
+    ModelRouter.configure(
+        parse_models(app.config['AI_MODELS']),
+        app.config['AI_COST_BUDGET'],
+        app.config['AI_MODEL_PROBE_INTERVAL'],
+        app.config['GEMINI_CIRCUIT_FAILURES'],
+        app.config['GEMINI_CIRCUIT_RESET']
+    )
+    
+    # Initialize shared clients eagerly
+    if app.config['PRELOAD_CLIENTS']:
+        init_services(app)
+    
+    # Configure caches and the change feed that keeps them fresh
+    init_caches(app)
+    
+    # Limit how much of a friend's notes goes into each AI prompt
+    from app.services.prompt_builder import PromptBuilder
+    PromptBuilder.configure(app.config['PROMPT_NOTES_TOKEN_BUDGET'])
+    
+    # Track in-flight requests and probe dependencies for readiness checks
+    from app.services.health_monitor import HealthMonitor
+    HealthMonitor.init_app(app)
+    
+    # Replay window for requests sent with an Idempotency-Key
+    from app.services.idempotency_store import IdempotencyStore
+    IdempotencyStore.configure(app.config['IDEMPOTENCY_TTL'], app.config['IDEMPOTENCY_MAX_KEYS'])
+    
+    # Durable queue for work moved off the request path
+    from app.services.job_queue import JobQueue
+    JobQueue.configure(
+        app.config['JOB_QUEUE_PATH'],
+        app.config['JOB_MAX_ATTEMPTS'],
+        app.config['JOB_RETRY_BACKOFF'],
+        app.config['JOB_TIMEOUT'],
+        app.config['JOB_RESULT_TTL']
+    )
+    
     return app
 
 
+def init_caches(app):
+    """Configure in-process caches and subscribe them to the change feed."""
+    from app.services.friend_cache import FriendCache
+    from app.services.change_feed import ChangeFeed
+    from app.services.suggestion_cache import SuggestionCache
+    from app.services.shared_friend_cache import SharedFriendCache
+    from app.services.calendar_feed import CalendarFeed
+    from app.services.search_index import SearchIndex
+    
+    FriendCache.configure(
+        app.config['FRIEND_CACHE_ENABLED'],
+        app.config['FRIEND_CACHE_TTL'],
+        app.config['FRIEND_CACHE_MAX_USERS']
+    )
+    ChangeFeed.subscribe(FriendCache.apply_change, FriendCache.clear)
+    
+    SharedFriendCache.configure(
+        app.config['SHARED_CACHE_ENABLED'],
+        app.config['SHARED_CACHE_PATH'],
+        app.config['SHARED_CACHE_SLOTS'],
+        app.config['SHARED_CACHE_SLOT_SIZE'],
+        app.config['SHARED_CACHE_TTL']
+    )
+    ChangeFeed.subscribe(SharedFriendCache.apply_change, SharedFriendCache.clear)
+    
+    CalendarFeed.configure(
+        app.config['CALENDAR_FEED_CACHE_ENABLED'],
+        app.config['CALENDAR_FEED_CACHE_TTL'],
+        app.config['CALENDAR_FEED_CACHE_MAX_USERS'],
+        app.config['CALENDAR_FEED_REFRESH'],
+        app.config['CALENDAR_FEED_SECRET'] or ''
+    )
+    ChangeFeed.subscribe(CalendarFeed.apply_change, CalendarFeed.clear)
+    
+    SearchIndex.configure(
+        app.config['SEARCH_INDEX_ENABLED'],
+        app.config['SEARCH_INDEX_TTL'],
+        app.config['SEARCH_INDEX_MAX_USERS'],
+        app.config['SEARCH_FUZZY_THRESHOLD']
+    )
+    ChangeFeed.subscribe(SearchIndex.apply_change, SearchIndex.clear)
+    
+    SuggestionCache.configure(
+        app.config['SUGGESTION_CACHE_ENABLED'],
+        app.config['SUGGESTION_CACHE_TTL'],
+        app.config['SUGGESTION_CACHE_MAX_ENTRIES'],
+        app.config['SUGGESTION_SIMILARITY_THRESHOLD'],
+        app.config['SUGGESTION_CACHE_SHARED']
+    )
+    
+    if app.config['CHANGE_FEED'] != 'none':
+        # Started per worker on first request, so it survives gunicorn --preload forks
+        @app.before_request
+        def start_change_feed():
+            ChangeFeed.ensure_started(app.config)
+
+
+def init_services(app):
+    """Initialize shared service clients at startup instead of on first request."""
+    from app.services.ai_service import AIService
+    from app.services.supabase_service import SupabaseService
+    
+    if app.config['SUPABASE_URL'] and app.config['SUPABASE_KEY']:
+        try:
+            SupabaseService.init_client(app.config['SUPABASE_URL'], app.config['SUPABASE_KEY'])
+        except Exception as e:
+            app.logger.error(f"Failed to initialize Supabase client: {e}")
+    
+    if app.config['GEMINI_API_KEY']:
+        try:
+            AIService.init_model(app.config['GEMINI_API_KEY'])
+        except Exception as e:
+            app.logger.error(f"Failed to initialize Gemini model: {e}")
+
+
 def register_error_handlers(app):
     """Register error handlers for common HTTP errors."""
     
@@ -101,6 +233,16 @@ def register_blueprints(app):
     """Register Flask blueprints."""
     from app.routes.health import health_bp
     from app.routes.friends import friends_bp
+    from app.routes.jobs import jobs_bp
+    from app.routes.calendar import calendar_bp
+    from app.config import DEFAULT_SECRET_KEY
     
     app.register_blueprint(health_bp, url_prefix='/api/v1')
     app.register_blueprint(friends_bp, url_prefix='/api/v1')
+    app.register_blueprint(jobs_bp, url_prefix='/api/v1')
+    
+    # Feed URLs are bearer credentials: never sign them with a missing or committed secret
+    if app.config['CALENDAR_FEED_SECRET'] in (None, '', DEFAULT_SECRET_KEY):
+        app.logger.warning("CALENDAR_FEED_SECRET is not set; calendar feed routes are disabled")
+    else:
+        app.register_blueprint(calendar_bp, url_prefix='/api/v1')
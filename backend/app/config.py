@@ -5,15 +5,21 @@ Loads environment variables and provides configuration classes.
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from backend/.env (skipped when absent, e.g. serverless)
+_ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+if os.path.exists(_ENV_FILE):
+    load_dotenv(_ENV_FILE)
+
+
+# Committed default for SECRET_KEY; never accepted as a feed signing secret
+DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production'
 
 
 class Config:
     """Base configuration class."""
     
     # Flask settings
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    SECRET_KEY = os.getenv('SECRET_KEY', DEFAULT_SECRET_KEY)
     DEBUG = False
     TESTING = False
     
@@ -27,6 +33,118 @@ class Config:
     # CORS settings
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
     
+    # Supabase calls: HTTP timeout for every call; reads also get a deadline, one hedged
+    # retry after SUPABASE_HEDGE_DELAY (0 disables) and a fallback to the last list this
+    # worker fetched (marked stale) when they still fail
+    SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', 10))  # seconds
+    SUPABASE_READ_DEADLINE = float(os.getenv('SUPABASE_READ_DEADLINE', 2))  # seconds, 0 disables
+    SUPABASE_HEDGE_DELAY = float(os.getenv('SUPABASE_HEDGE_DELAY', 0.5))  # seconds
+    SUPABASE_READ_THREADS = int(os.getenv('SUPABASE_READ_THREADS', 16))
+    STALE_FALLBACK_ENABLED = os.getenv('STALE_FALLBACK_ENABLED', 'true').lower() == 'true'
+    STALE_MAX_AGE = int(os.getenv('STALE_MAX_AGE', 900))  # oldest list served stale, seconds
+    STALE_MAX_USERS = int(os.getenv('STALE_MAX_USERS', 10000))
+    
+    # Initialize Supabase and Gemini clients in create_app instead of on first use.
+    # Disable for serverless cold starts; with gunicorn --preload the clients are
+    # then created once in the master process before workers fork.
+    PRELOAD_CLIENTS = os.getenv('PRELOAD_CLIENTS', 'true').lower() == 'true'
+    
+    # Rate limiting: per-user token buckets, "<requests>/<seconds>" per route class
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')  # 'memory' or 'redis'
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_BUCKETS = int(os.getenv('RATE_LIMIT_MAX_BUCKETS', 100000))  # memory store, per worker
+    RATE_LIMITS = {
+        'ai': os.getenv('RATE_LIMIT_AI', '10/60'),
+        'write': os.getenv('RATE_LIMIT_WRITE', '60/60'),
+        'read': os.getenv('RATE_LIMIT_READ', '300/60')
+    }
+    
+    # Change feed keeping in-process caches fresh: 'supabase' (Realtime), 'local' or 'none'.
+    # Realtime needs a key that can read every user's rows (service role).
+    CHANGE_FEED = os.getenv('CHANGE_FEED', 'none')
+    SUPABASE_REALTIME_KEY = os.getenv('SUPABASE_REALTIME_KEY', os.getenv('SUPABASE_KEY'))
+    
+    # Response compression (brotli when installed, otherwise gzip)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))  # gzip 1-9
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))  # brotli 0-11
+    
+    # Per-user friend cache; only safe across workers with a change feed
+    FRIEND_CACHE_ENABLED = os.getenv('FRIEND_CACHE_ENABLED', 'false').lower() == 'true'
+    FRIEND_CACHE_TTL = int(os.getenv('FRIEND_CACHE_TTL', 3600))
+    FRIEND_CACHE_MAX_USERS = int(os.getenv('FRIEND_CACHE_MAX_USERS', 10000))
+    
+    # Friend lists shared by all workers on the host through a memory-mapped file
+    # (Unix only); writes invalidate every worker's copy via generation counters
+    SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', 'false').lower() == 'true'
+    SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', '/dev/shm/birthday-friends.cache' if os.path.isdir('/dev/shm') else os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'friends.cache'))
+    SHARED_CACHE_SLOTS = int(os.getenv('SHARED_CACHE_SLOTS', 1024))  # users cached at most
+    SHARED_CACHE_SLOT_SIZE = int(os.getenv('SHARED_CACHE_SLOT_SIZE', 64 * 1024))  # bytes per user (compressed)
+    SHARED_CACHE_TTL = int(os.getenv('SHARED_CACHE_TTL', 300))
+    
+    # iCalendar feed: rendered feeds are cached per user until their friends change
+    # (other workers' copies also expire after the TTL unless the shared cache is on)
+    CALENDAR_FEED_CACHE_ENABLED = os.getenv('CALENDAR_FEED_CACHE_ENABLED', 'true').lower() == 'true'
+    CALENDAR_FEED_CACHE_TTL = int(os.getenv('CALENDAR_FEED_CACHE_TTL', 3600))
+    CALENDAR_FEED_CACHE_MAX_USERS = int(os.getenv('CALENDAR_FEED_CACHE_MAX_USERS', 1000))
+    CALENDAR_FEED_REFRESH = int(os.getenv('CALENDAR_FEED_REFRESH', 3600))  # polling interval suggested to clients, seconds
+    # Signs feed URLs; rotate to revoke them. The calendar routes are disabled while it is unset.
+    CALENDAR_FEED_SECRET = os.getenv('CALENDAR_FEED_SECRET')
+    
+    # Friend search: per-user index built on first search, updated by this worker's writes
+    # (other workers' writes reach it through the shared cache or after the TTL)
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+    SEARCH_INDEX_TTL = int(os.getenv('SEARCH_INDEX_TTL', 300))
+    SEARCH_INDEX_MAX_USERS = int(os.getenv('SEARCH_INDEX_MAX_USERS', 1000))
+    SEARCH_FUZZY_THRESHOLD = float(os.getenv('SEARCH_FUZZY_THRESHOLD', 0.5))  # 1 - typos / word length, 0-1
+    
+    # AI suggestion cache: exact matches plus reuse for similar notes in the same age bracket
+    SUGGESTION_CACHE_ENABLED = os.getenv('SUGGESTION_CACHE_ENABLED', 'true').lower() == 'true'
+    SUGGESTION_CACHE_TTL = int(os.getenv('SUGGESTION_CACHE_TTL', 7 * 24 * 3600))
+    SUGGESTION_CACHE_MAX_ENTRIES = int(os.getenv('SUGGESTION_CACHE_MAX_ENTRIES', 5000))
+    SUGGESTION_SIMILARITY_THRESHOLD = float(os.getenv('SUGGESTION_SIMILARITY_THRESHOLD', 0.85))  # cosine, 0-1
+    SUGGESTION_CACHE_SHARED = os.getenv('SUGGESTION_CACHE_SHARED', 'false').lower() == 'true'  # reuse across users
+    
+    # Notes longer than this (estimated Gemini tokens) are shortened in prompts
+    PROMPT_NOTES_TOKEN_BUDGET = int(os.getenv('PROMPT_NOTES_TOKEN_BUDGET', 200))
+    
+    # Background jobs (SQLite queue shared by API and job worker processes on one host)
+    JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'jobs.sqlite3'))
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # processes started by worker.py
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', 5))  # seconds, doubled per attempt
+    JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', 300))  # running jobs are retried after this long
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 86400))  # finished jobs kept for polling
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 0.5))
+    
+    # Responses to POST /friends with an Idempotency-Key are replayed for this long (per worker)
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 3600))
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 100000))
+    
+    # Gemini circuit breaker: open after this many consecutive failures, retry after the timeout
+    GEMINI_CIRCUIT_FAILURES = int(os.getenv('GEMINI_CIRCUIT_FAILURES', 5))
+    GEMINI_CIRCUIT_RESET = float(os.getenv('GEMINI_CIRCUIT_RESET', 30))  # seconds
+    
+    # Suggestion models, comma-separated "name[:USD per million tokens]"; "stub" is a local fake
+    AI_MODELS = os.getenv('AI_MODELS', 'gemini-pro')
+    AI_COST_BUDGET = float(os.getenv('AI_COST_BUDGET', 0))  # USD per hour per worker, 0 = no limit
+    AI_MODEL_PROBE_INTERVAL = float(os.getenv('AI_MODEL_PROBE_INTERVAL', 60))  # seconds, 0 = never
+    
+    # Readiness: dependency probes run in the background every HEALTH_PROBE_INTERVAL seconds
+    HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', 15))
+    HEALTH_MAX_SATURATION = float(os.getenv('HEALTH_MAX_SATURATION', 0.9))  # in-flight / capacity
+    # Bearer token for GET /health/stats (detailed counters); the endpoint is disabled when unset
+    HEALTH_STATS_TOKEN = os.getenv('HEALTH_STATS_TOKEN')
+    # Concurrent requests one worker can serve (gevent worker connections in async mode).
+    # 0 turns the saturation check off: a sync worker cannot answer a health check while it
+    # serves a request, so its own count never shows saturation.
+    WORKER_CAPACITY = int(os.getenv(
+        'WORKER_CAPACITY',
+        os.getenv('WORKER_CONNECTIONS', 500) if os.getenv('SERVER_MODE', 'sync').lower() == 'async' else 0
+    ))
+    
     @staticmethod
     def validate():
         """Validate that required environment variables are set."""
@@ -4,7 +4,6 @@ Handles JWT token verification using Supabase auth.
 """
 from functools import wraps
 from flask import request, jsonify, current_app
-from supabase import create_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,6 +32,8 @@ def get_user_from_token():
     logger.info(f"Token received (first 20 chars): {token[:20]}...")
     
     try:
+        from supabase import create_client
+        
         # Verify token with Supabase
         supabase_url = current_app.config['SUPABASE_URL']
         supabase_key = current_app.config['SUPABASE_KEY']
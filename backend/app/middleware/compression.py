@@ -0,0 +1,111 @@
+"""
+Response compression middleware.
+Compresses JSON and text responses with brotli or gzip, negotiated from Accept-Encoding.
+"""
+from flask import request, current_app
+from functools import lru_cache
+import gzip
+import logging
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/calendar', 'text/csv'}
+
+
+@lru_cache(maxsize=None)
+def _get_brotli():
+    """Return the brotli module if installed (optional dependency), resolved once."""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def choose_encoding(accept_encodings, brotli_available: bool):
+    """
+    Pick the response encoding the client accepts, preferring brotli.
+    
+    Args:
+        accept_encodings: Parsed Accept-Encoding header
+        brotli_available: Whether the brotli module is installed
+    
+    Returns:
+        'br', 'gzip' or None
+    """
+    if brotli_available and accept_encodings['br'] > 0:
+        return 'br'
+    if accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a representation compressed with encoding."""
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag: str):
+    """
+    Get the ETags a response may have been sent with.
+    
+    Args:
+        etag: ETag of the uncompressed representation
+    
+    Returns:
+        The ETag and its per-encoding variants set by compress_response
+    """
+    return [etag] + [encoded_etag(etag, encoding) for encoding in ('br', 'gzip')]
+
+
+def compress_response(response):
+    """
+    Compress a response body in place if worthwhile.
+    
+    Args:
+        response: Flask response
+    
+    Returns:
+        The (possibly compressed) response
+    """
+    config = current_app.config
+    
+    if (
+        not config['COMPRESS_ENABLED']
+        or response.direct_passthrough
+        or response.is_streamed
+        or not 200 <= response.status_code < 300
+        or response.status_code == 204
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    brotli = _get_brotli()
+    encoding = choose_encoding(request.accept_encodings, brotli is not None)
+    if encoding is None:
+        return response
+    
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    else:
+        compressed = gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'])
+    
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # Keep validators distinct from the uncompressed representation
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+
+def init_compression(app):
+    """Register response compression for the app."""
+    app.after_request(compress_response)
@@ -0,0 +1,207 @@
+"""
+Rate limiting middleware.
+Applies per-user token buckets to route classes (e.g. AI suggestions, writes).
+"""
+from collections import OrderedDict
+from functools import wraps
+from flask import jsonify, current_app
+from typing import Dict, Tuple
+import math
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryRateLimitStore:
+    """In-process token bucket store (per worker), bounded to max_buckets keys."""
+    
+    def __init__(self, max_buckets: int = 100000):
+        self.max_buckets = max_buckets
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def consume(self, key: str, capacity: int, period: float) -> Tuple[bool, float, int]:
+        """
+        Take one token from a bucket, refilling it for the time elapsed.
+        
+        The least recently used bucket is dropped when max_buckets is reached;
+        idle buckets have usually refilled to capacity, which is also what a
+        new bucket starts with.
+        
+        Args:
+            key: Bucket key
+            capacity: Maximum tokens (burst size)
+            period: Seconds to refill a full bucket
+            
+        Returns:
+            Tuple of (allowed, retry_after_seconds, remaining_tokens)
+        """
+        now = time.monotonic()
+        rate = capacity / period
+        
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            
+            if allowed:
+                return True, 0.0, int(tokens)
+            return False, (1 - tokens) / rate, 0
+
+
+class RedisRateLimitStore:
+    """Token bucket store shared by all workers through Redis."""
+    
+    # Refill and take atomically on the Redis server
+    _SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+    
+    def __init__(self, url: str):
+        import redis
+        
+        self._redis = redis.Redis.from_url(url)
+        self._consume = self._redis.register_script(self._SCRIPT)
+    
+    def consume(self, key: str, capacity: int, period: float) -> Tuple[bool, float, int]:
+        """Take one token from a shared bucket (see MemoryRateLimitStore.consume)."""
+        rate = capacity / period
+        allowed, tokens = self._consume(keys=[f'ratelimit:{key}'], args=[capacity, rate, time.time()])
+        tokens = float(tokens)
+        
+        if allowed:
+            return True, 0.0, int(tokens)
+        return False, (1 - tokens) / rate, 0
+
+
+class RateLimiter:
+    """Holds the configured store and per-route-class counters."""
+    
+    _store = None
+    _stats: Dict[str, Dict[str, int]] = {}
+    _stats_lock = threading.Lock()
+    
+    @classmethod
+    def get_store(cls):
+        """
+        Get or create the configured token bucket store.
+        
+        Falls back to the per-worker memory store, with a single warning,
+        when the redis package is not installed.
+        
+        Returns:
+            Store exposing consume(key, capacity, period)
+        """
+        if cls._store is None:
+            config = current_app.config
+            if config['RATE_LIMIT_STORE'] == 'redis':
+                try:
+                    cls._store = RedisRateLimitStore(config['RATE_LIMIT_REDIS_URL'])
+                except ImportError:
+                    logger.warning("RATE_LIMIT_STORE=redis but the redis package is not installed; "
+                                   "using per-worker rate limit buckets")
+            if cls._store is None:
+                cls._store = MemoryRateLimitStore(config['RATE_LIMIT_MAX_BUCKETS'])
+        return cls._store
+    
+    @classmethod
+    def record(cls, route_class: str, allowed: bool):
+        """Count an allowed or limited request for a route class."""
+        with cls._stats_lock:
+            counters = cls._stats.setdefault(route_class, {'allowed': 0, 'limited': 0})
+            counters['allowed' if allowed else 'limited'] += 1
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, int]]:
+        """
+        Get allowed/limited counters per route class for this worker.
+        
+        Returns:
+            Dictionary of route class to counters
+        """
+        with cls._stats_lock:
+            return {route_class: dict(counters) for route_class, counters in cls._stats.items()}
+
+
+def parse_limit(limit: str) -> Tuple[int, float]:
+    """
+    Parse a "<requests>/<seconds>" limit string.
+    
+    Args:
+        limit: Limit string, e.g. "10/60"
+        
+    Returns:
+        Tuple of (capacity, period_seconds)
+    """
+    capacity, period = limit.split('/')
+    return int(capacity), float(period)
+
+
+def rate_limit(route_class: str):
+    """
+    Decorator to rate limit a route per authenticated user.
+    Must be applied below require_auth so user_id is available.
+    
+    Args:
+        route_class: Key into the RATE_LIMITS config (e.g. 'ai', 'write', 'read')
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_app.config['RATE_LIMIT_ENABLED']:
+                return f(*args, **kwargs)
+            
+            capacity, period = parse_limit(current_app.config['RATE_LIMITS'][route_class])
+            key = f"{route_class}:{kwargs['user_id']}"
+            
+            try:
+                allowed, retry_after, remaining = RateLimiter.get_store().consume(key, capacity, period)
+            except Exception as e:
+                # Never fail requests because the limiter's store is unavailable
+                logger.error(f"Rate limit store error: {e}")
+                return f(*args, **kwargs)
+            
+            RateLimiter.record(route_class, allowed)
+            
+            if not allowed:
+                logger.warning(f"Rate limit exceeded for {key}")
+                response = jsonify({
+                    'error': 'Too Many Requests',
+                    'message': 'Rate limit exceeded, please try again later'
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response
+            
+            response = current_app.make_response(f(*args, **kwargs))
+            response.headers['X-RateLimit-Limit'] = str(capacity)
+            response.headers['X-RateLimit-Remaining'] = str(remaining)
+            return response
+        
+        return decorated_function
+    
+    return decorator
@@ -0,0 +1,154 @@
+"""
+Friend data models.
+Compact __slots__ classes used in place of raw row dictionaries.
+"""
+from datetime import date, datetime
+from typing import Dict, Optional
+
+
+class Friend:
+    """A row of the friends table with date_of_birth parsed once."""
+    
+    __slots__ = (
+        'id', 'user_id', 'name', 'date_of_birth', 'notes',
+        'created_at', 'updated_at', 'birth_month', 'birth_day', 'birth_doy'
+    )
+    
+    def __init__(self, id: Optional[str], user_id: Optional[str], name: str, date_of_birth: date,
+                 notes: Optional[str] = None, created_at: Optional[str] = None,
+                 updated_at: Optional[str] = None, birth_month: Optional[int] = None,
+                 birth_day: Optional[int] = None, birth_doy: Optional[int] = None):
+        self.id = id
+        self.user_id = user_id
+        self.name = name
+        self.date_of_birth = date_of_birth
+        self.notes = notes
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.birth_month = birth_month
+        self.birth_day = birth_day
+        self.birth_doy = birth_doy
+    
+    @classmethod
+    def from_row(cls, row: Dict, date_of_birth: Optional[date] = None) -> 'Friend':
+        """
+        Build a Friend from a Supabase row, parsing date_of_birth.
+        
+        Args:
+            row: Row dictionary from the friends table
+            date_of_birth: Already-parsed date of birth, skips parsing the row's string
+            
+        Returns:
+            Friend instance
+        """
+        dob = date_of_birth or row['date_of_birth']
+        if isinstance(dob, str):
+            dob = datetime.strptime(dob, '%Y-%m-%d').date()
+        
+        return cls(
+            row.get('id'),
+            row.get('user_id'),
+            row['name'],
+            dob,
+            row.get('notes'),
+            row.get('created_at'),
+            row.get('updated_at'),
+            row.get('birth_month'),
+            row.get('birth_day'),
+            row.get('birth_doy')
+        )
+    
+    def to_dict(self) -> Dict:
+        """
+        Convert to a JSON-serializable dictionary.
+        
+        Returns:
+            Dictionary in the same shape as the table row
+        """
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'date_of_birth': self.date_of_birth.isoformat(),
+            'notes': self.notes,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'birth_month': self.birth_month,
+            'birth_day': self.birth_day,
+            'birth_doy': self.birth_doy
+        }
+    
+    def to_compact_dict(self) -> Dict:
+        """
+        Convert to a minimal dictionary for bandwidth-sensitive clients.
+        
+        Omits null fields, user_id and the derived birth_* columns, and encodes
+        date_of_birth as YYYYMMDD.
+        
+        Returns:
+            Compact dictionary
+        """
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'date_of_birth': compact_date(self.date_of_birth)
+        }
+        if self.notes:
+            data['notes'] = self.notes
+        if self.updated_at:
+            data['updated_at'] = self.updated_at
+        return data
+
+
+def compact_date(value: Optional[date]) -> Optional[str]:
+    """Encode a date as YYYYMMDD."""
+    return value.strftime('%Y%m%d') if value else None
+
+
+class EnrichedFriend:
+    """A Friend plus calculated birthday fields; references the Friend without copying it."""
+    
+    __slots__ = ('friend', 'age', 'next_birthday', 'days_until_birthday', 'is_reminder_due')
+    
+    def __init__(self, friend: Friend, age: int, next_birthday: date,
+                 days_until_birthday: int, is_reminder_due: bool):
+        self.friend = friend
+        self.age = age
+        self.next_birthday = next_birthday
+        self.days_until_birthday = days_until_birthday
+        self.is_reminder_due = is_reminder_due
+    
+    def __getattr__(self, name):
+        # Only called for names not found in __slots__: fall through to the friend
+        if name == 'friend':
+            raise AttributeError(name)
+        return getattr(self.friend, name)
+    
+    def to_dict(self) -> Dict:
+        """
+        Convert to a JSON-serializable dictionary.
+        
+        Returns:
+            Friend fields plus age, next_birthday, days_until_birthday, is_reminder_due
+        """
+        data = self.friend.to_dict()
+        data['age'] = self.age
+        data['next_birthday'] = self.next_birthday.isoformat()
+        data['days_until_birthday'] = self.days_until_birthday
+        data['is_reminder_due'] = self.is_reminder_due
+        return data
+    
+    def to_compact_dict(self) -> Dict:
+        """
+        Convert to a minimal dictionary (see Friend.to_compact_dict).
+        
+        Returns:
+            Compact dictionary with next_birthday as YYYYMMDD
+        """
+        data = self.friend.to_compact_dict()
+        data['age'] = self.age
+        data['next_birthday'] = compact_date(self.next_birthday)
+        data['days_until_birthday'] = self.days_until_birthday
+        if self.is_reminder_due:
+            data['is_reminder_due'] = True
+        return data
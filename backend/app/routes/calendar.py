@@ -0,0 +1,136 @@
+"""
+Calendar routes.
+iCalendar feed of friends' birthdays for calendar apps to subscribe to.
+"""
+from functools import wraps
+from flask import Blueprint, Response, jsonify, request, url_for
+from app.middleware.auth import require_auth
+from app.middleware.compression import etag_variants
+from app.middleware.rate_limit import rate_limit
+from app.services.calendar_feed import CalendarFeed, feed_etag
+from app.services.supabase_service import SupabaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+calendar_bp = Blueprint('calendar', __name__)
+
+CALENDAR_MIMETYPE = 'text/calendar'
+
+
+def require_feed_token(f):
+    """
+    Decorator authenticating feed requests by the token in the URL.
+    Calendar apps cannot send Authorization headers, so the feed URL is the credential.
+    Adds user_id to kwargs like require_auth.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user_id = CalendarFeed.verify_token(kwargs['token'])
+        
+        if not user_id:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Calendar feed not found'
+            }), 404
+        
+        kwargs['user_id'] = user_id
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+
+def not_modified(etag):
+    """
+    Answer a poll whose If-None-Match already has the feed.
+    
+    Args:
+        etag: Feed ETag (compressed responses carry an encoding-suffixed variant)
+    
+    Returns:
+        304 response, or None if the client's copy is outdated
+    """
+    for variant in etag_variants(etag):
+        if request.if_none_match.contains(variant):
+            CalendarFeed.record_not_modified()
+            response = Response(status=304)
+            response.set_etag(variant)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+    return None
+
+
+def feed_response(body, etag):
+    """Build a feed response that clients revalidate on every poll."""
+    response = Response(body, mimetype=CALENDAR_MIMETYPE)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@calendar_bp.route('/calendar/feed', methods=['GET'])
+@require_auth
+@rate_limit('read')
+def get_feed_url(user_id):
+    """
+    Get the user's calendar feed URL.
+    
+    Returns:
+        JSON response with the webcal-compatible https URL to subscribe to
+    """
+    return jsonify({
+        'url': url_for('calendar.get_feed', token=CalendarFeed.make_token(user_id), _external=True)
+    }), 200
+
+
+@calendar_bp.route('/calendar/<token>.ics', methods=['GET'])
+@require_feed_token
+@rate_limit('read')
+def get_feed(token, user_id):
+    """
+    Get the user's birthdays as an iCalendar feed.
+    
+    Polls with a current If-None-Match get 304. A cached feed is served
+    without reading friends; otherwise the feed is streamed while rendering
+    and cached until the user's friends change.
+    
+    Args:
+        token: Feed token from GET /calendar/feed
+    
+    Returns:
+        text/calendar response, or 304
+    """
+    try:
+        cached = CalendarFeed.get_cached(user_id)
+        if cached is not None:
+            return not_modified(cached.etag) or feed_response(cached.body, cached.etag)
+        
+        generation = CalendarFeed.begin_render(user_id)
+        streaming = False
+        try:
+            friends = SupabaseService.get_friends(user_id)
+            etag = feed_etag(friends)
+            
+            response = not_modified(etag)
+            if response is not None:
+                return response
+            
+            stale = SupabaseService.served_stale()
+            response = feed_response(CalendarFeed.render(user_id, friends, etag, generation, store=not stale), etag)
+            # The render ends once the streamed body is closed
+            response.call_on_close(lambda: CalendarFeed.end_render(user_id))
+            streaming = True
+        finally:
+            if not streaming:
+                CalendarFeed.end_render(user_id)
+        
+        if stale:
+            response.headers['X-Data-Stale'] = 'true'
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error building calendar feed: {e}")
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to build calendar feed'
+        }), 500
@@ -2,12 +2,17 @@
 Friends API endpoints.
 Handles CRUD operations for friends and AI suggestions.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from app.middleware.auth import require_auth
+from app.middleware.rate_limit import rate_limit
 from app.services.supabase_service import SupabaseService
 from app.services.birthday_service import BirthdayService
 from app.services.ai_service import AIService
-from app.utils.validators import validate_friend_data
+from app.services.job_queue import JobQueue
+from app.services.idempotency_store import IdempotencyStore, IdempotencyKeyReused, request_fingerprint
+from app.services.search_index import SearchIndex
+from app.utils.validators import validate_friend_payload, validate_friend_batch, MAX_BATCH_SIZE
+from app.utils.timezone import get_request_today
 from datetime import datetime
 import logging
 
@@ -15,9 +20,109 @@ logger = logging.getLogger(__name__)
 
 friends_bp = Blueprint('friends', __name__)
 
+# Number of days ahead counted as an upcoming birthday
+UPCOMING_DAYS = 30
+
+# Largest page accepted by GET /friends
+MAX_PAGE_SIZE = 500
+
+# Most next birthdays returned by GET /friends/summary
+MAX_SUMMARY_NEXT = 20
+
+# Largest page and longest query accepted by GET /friends/search
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_QUERY_LENGTH = 200
+
+# Longest accepted Idempotency-Key header
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+@friends_bp.after_request
+def mark_stale(response):
+    """Flag responses built from last-known-good data while Supabase was failing."""
+    if SupabaseService.served_stale():
+        response.headers['X-Data-Stale'] = 'true'
+    return response
+
+
+def validation_error(errors):
+    """
+    Build a 400 response for validation errors.
+    
+    Args:
+        errors: Field name to error message mapping
+    
+    Returns:
+        JSON response with the first error as message and all errors listed
+    """
+    return jsonify({
+        'error': 'Bad Request',
+        'message': next(iter(errors.values())),
+        'errors': errors
+    }), 400
+
+
+def wants_async():
+    """Check whether the client asked for the work to be queued (?async=true)."""
+    return request.args.get('async', '').lower() == 'true'
+
+
+def get_idempotency_key():
+    """
+    Read the optional Idempotency-Key header.
+    
+    Returns:
+        Tuple of (key or None, 400 response if the key is invalid)
+    """
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        return None, (jsonify({
+            'error': 'Bad Request',
+            'message': f'Idempotency-Key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters'
+        }), 400)
+    return idempotency_key, None
+
+
+def enqueue_job(job_type, user_id, payload):
+    """
+    Queue a background job and build the 202 response pointing at its status.
+    
+    Args:
+        job_type: Handler name
+        user_id: Owner of the job
+        payload: JSON-serializable handler arguments
+    
+    Returns:
+        202 JSON response with the job, 400 for an invalid Idempotency-Key, or
+        422 if the key was used for a different request
+    """
+    idempotency_key, error = get_idempotency_key()
+    if error:
+        return error
+    
+    # The key is bound to the job type and the request it came with
+    fingerprint = request_fingerprint({
+        'type': job_type,
+        'path': request.path,
+        'body': request.get_json(silent=True)
+    })
+    try:
+        job = JobQueue.enqueue(job_type, user_id, payload, idempotency_key, fingerprint)
+    except IdempotencyKeyReused:
+        return jsonify({
+            'error': 'Unprocessable Entity',
+            'message': 'Idempotency-Key was already used with a different request'
+        }), 422
+    
+    response = jsonify({'job': job})
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.get_job', job_id=job['id'])
+    return response
+
 
 @friends_bp.route('/friends', methods=['GET'])
 @require_auth
+@rate_limit('read')
 def get_friends(user_id):
     """
     Get all friends for the authenticated user.
@@ -25,37 +130,73 @@ def get_friends(user_id):
     Query Parameters:
         upcoming (bool): Filter friends with upcoming birthdays (within 30 days)
         reminders (bool): Filter friends needing reminders (2 days or less)
+        compact (bool): Minimal response shape (see Friend.to_compact_dict)
+        limit (int, optional): Page size (at most MAX_PAGE_SIZE); all friends when omitted
+        offset (int, optional): Number of friends to skip
     
     Returns:
-        JSON response with list of friends
+        JSON response with list of friends, the total count and the next page offset
     """
     try:
         # Get query parameters
         show_upcoming = request.args.get('upcoming', '').lower() == 'true'
         show_reminders = request.args.get('reminders', '').lower() == 'true'
+        compact = request.args.get('compact', '').lower() == 'true'
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
         
-        # Fetch friends from database
-        friends = SupabaseService.get_friends(user_id)
+        if (limit is not None and not 1 <= limit <= MAX_PAGE_SIZE) or offset < 0:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'limit must be between 1 and {MAX_PAGE_SIZE} and offset must not be negative'
+            }), 400
+        
+        # Birthdays are counted from today in the user's timezone
+        today = get_request_today()
+        
+        # Fetch friends from database (range scan on birth_doy for upcoming).
+        # Unfiltered pages are read page by page; total is None when the full list was read.
+        total = None
+        if show_upcoming:
+            friends = SupabaseService.get_friends_in_birthday_window(user_id, UPCOMING_DAYS, today)
+        elif limit is not None and not show_reminders:
+            friends, total = SupabaseService.get_friends_page(user_id, offset, limit, today)
+        else:
+            friends = SupabaseService.get_friends(user_id)
         
         # Enrich with birthday data
         enriched_friends = []
         for friend in friends:
-            enriched = BirthdayService.enrich_friend_data(friend)
+            enriched = BirthdayService.enrich_friend(friend, today)
             
             # Apply filters
-            if show_upcoming and enriched['days_until_birthday'] > 30:
+            if show_upcoming and enriched.days_until_birthday > UPCOMING_DAYS:
                 continue
-            if show_reminders and not enriched['is_reminder_due']:
+            if show_reminders and not enriched.is_reminder_due:
                 continue
             
             enriched_friends.append(enriched)
         
-        # Sort by days until birthday
-        enriched_friends.sort(key=lambda x: x['days_until_birthday'])
+        # Sort by next birthday, in the same order as database pages
+        enriched_friends.sort(key=BirthdayService.next_birthday_key)
+        
+        if total is None:
+            total = len(enriched_friends)
+            end = total if limit is None else offset + limit
+            page = enriched_friends[offset:end]
+        else:
+            end = offset + limit
+            page = enriched_friends
         
         return jsonify({
-            'friends': enriched_friends,
-            'count': len(enriched_friends)
+            'friends': [
+                enriched.to_compact_dict() if compact else enriched.to_dict()
+                for enriched in page
+            ],
+            'count': len(page),
+            'total': total,
+            'next_offset': end if end < total else None,
+            'stale': SupabaseService.served_stale()
         }), 200
         
     except Exception as e:
@@ -66,8 +207,134 @@ def get_friends(user_id):
         }), 500
 
 
+@friends_bp.route('/friends/summary', methods=['GET'])
+@require_auth
+@rate_limit('read')
+def get_friends_summary(user_id):
+    """
+    Get dashboard aggregates for the authenticated user.
+    
+    Computed in one pass over the user's friends (served from the friend
+    cache when enabled), instead of fetching the list once per filter.
+    
+    Query Parameters:
+        next (int, optional): Number of next birthdays to include (0 to
+            MAX_SUMMARY_NEXT, default 5)
+        compact (bool): Minimal shape for next_birthdays (see Friend.to_compact_dict)
+    
+    Returns:
+        JSON response with total, birthdays_today, reminders_due, upcoming
+        (within UPCOMING_DAYS), by_month (12 counts, January first) and next_birthdays
+    """
+    try:
+        next_count = request.args.get('next', 5, type=int)
+        compact = request.args.get('compact', '').lower() == 'true'
+        
+        if not 0 <= next_count <= MAX_SUMMARY_NEXT:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'next must be between 0 and {MAX_SUMMARY_NEXT}'
+            }), 400
+        
+        friends = SupabaseService.get_friends(user_id)
+        counts, next_birthdays = BirthdayService.summarize(
+            friends, UPCOMING_DAYS, next_count, get_request_today()
+        )
+        
+        return jsonify({
+            **counts,
+            'upcoming_days': UPCOMING_DAYS,
+            'next_birthdays': [
+                enriched.to_compact_dict() if compact else enriched.to_dict()
+                for enriched in next_birthdays
+            ],
+            'stale': SupabaseService.served_stale()
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Error building friends summary: {e}")
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to fetch friends summary'
+        }), 500
+
+
+@friends_bp.route('/friends/search', methods=['GET'])
+@require_auth
+@rate_limit('read')
+def search_friends(user_id):
+    """
+    Search friends by name and notes.
+    
+    Every word of the query must match a word of the friend's name or notes,
+    exactly, as a prefix ("ali" finds "Alice") or, with fuzzy matching, by
+    spelling similarity ("jhon" finds "John"). Name matches rank first.
+    
+    Query Parameters:
+        q (str): Search text
+        fuzzy (bool, optional): Match misspelled words (default true)
+        compact (bool): Minimal response shape (see Friend.to_compact_dict)
+        limit (int, optional): Page size (1 to MAX_SEARCH_PAGE_SIZE, default 20)
+        offset (int, optional): Number of results to skip
+    
+    Returns:
+        JSON response with ranked friends (each with its score), the total
+        number of matches and the next page offset
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        fuzzy = request.args.get('fuzzy', 'true').lower() != 'false'
+        compact = request.args.get('compact', '').lower() == 'true'
+        limit = request.args.get('limit', 20, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        if not 0 < len(query) <= MAX_SEARCH_QUERY_LENGTH:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'q must be 1 to {MAX_SEARCH_QUERY_LENGTH} characters'
+            }), 400
+        if not 1 <= limit <= MAX_SEARCH_PAGE_SIZE or offset < 0:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'limit must be between 1 and {MAX_SEARCH_PAGE_SIZE} and offset must not be negative'
+            }), 400
+        
+        end = offset + limit
+        # Only the results up to this page are ranked
+        results, total = SearchIndex.search(
+            user_id, query, lambda: SupabaseService.get_friends(user_id), fuzzy, limit=end
+        )
+        if SupabaseService.served_stale():
+            # Built from last-known-good data; rebuild once Supabase answers again
+            SearchIndex.invalidate(user_id)
+        
+        today = get_request_today()
+        page = []
+        for friend, score in results[offset:end]:
+            enriched = BirthdayService.enrich_friend(friend, today)
+            item = enriched.to_compact_dict() if compact else enriched.to_dict()
+            item['score'] = round(score, 3)
+            page.append(item)
+        
+        return jsonify({
+            'friends': page,
+            'count': len(page),
+            'total': total,
+            'next_offset': end if end < total else None,
+            'stale': SupabaseService.served_stale()
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Error searching friends: {e}")
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to search friends'
+        }), 500
+
+
 @friends_bp.route('/friends/<friend_id>', methods=['GET'])
 @require_auth
+@rate_limit('read')
 def get_friend(friend_id, user_id):
     """
     Get a single friend by ID.
@@ -75,6 +342,9 @@ def get_friend(friend_id, user_id):
     Args:
         friend_id: Friend UUID
     
+    Query Parameters:
+        compact (bool): Minimal response shape (see Friend.to_compact_dict)
+    
     Returns:
         JSON response with friend data
     """
@@ -88,9 +358,11 @@ def get_friend(friend_id, user_id):
             }), 404
         
         # Enrich with birthday data
-        enriched = BirthdayService.enrich_friend_data(friend)
+        enriched = BirthdayService.enrich_friend(friend, get_request_today())
         
-        return jsonify(enriched), 200
+        if request.args.get('compact', '').lower() == 'true':
+            return jsonify(enriched.to_compact_dict()), 200
+        return jsonify(enriched.to_dict()), 200
         
     except Exception as e:
         logger.error(f"Error fetching friend {friend_id}: {e}")
@@ -102,17 +374,24 @@ def get_friend(friend_id, user_id):
 
 @friends_bp.route('/friends', methods=['POST'])
 @require_auth
+@rate_limit('write')
 def create_friend(user_id):
     """
     Create a new friend.
     
+    Headers:
+        Idempotency-Key (optional): Retries with the same key and body return the
+            original response (with Idempotent-Replayed: true) instead of creating
+            another friend
+    
     Request Body:
         name (str): Friend's name
         date_of_birth (str): Date of birth in YYYY-MM-DD format
         notes (str, optional): Additional notes
     
     Returns:
-        JSON response with created friend data
+        JSON response with created friend data; 409 while a request with the same
+        key is in progress, 422 if the key was used with a different body
     """
     try:
         data = request.get_json()
@@ -123,38 +402,173 @@ def create_friend(user_id):
                 'message': 'Request body must be JSON'
             }), 400
         
-        # Validate input
-        is_valid, error_message = validate_friend_data(data, is_update=False)
-        if not is_valid:
+        idempotency_key, error = get_idempotency_key()
+        if error:
+            return error
+        
+        # Validate input (date_of_birth comes back parsed)
+        friend_data, errors = validate_friend_payload(data, is_update=False, today=get_request_today())
+        if errors:
+            return validation_error(errors)
+        friend_data.setdefault('notes', None)
+        
+        if idempotency_key is None:
+            # Create friend in database
+            created_friend = SupabaseService.create_friend(user_id, friend_data)
+            
+            # Enrich with birthday data
+            enriched = BirthdayService.enrich_friend(created_friend, get_request_today())
+            
+            return jsonify(enriched.to_dict()), 201
+        
+        return create_friend_once(user_id, idempotency_key, data, friend_data)
+        
+    except Exception as e:
+        logger.error(f"Error creating friend: {e}")
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to create friend'
+        }), 500
+
+
+def create_friend_once(user_id, idempotency_key, data, friend_data):
+    """
+    Create a friend for a request carrying an Idempotency-Key.
+    
+    Replays come from the worker's idempotency store when it has the key;
+    otherwise the upsert on (user_id, idempotency_key) returns the original row.
+    
+    Args:
+        user_id: Requesting user
+        idempotency_key: Idempotency-Key header
+        data: Raw request body, fingerprinted to detect reuse with a different body
+        friend_data: Validated friend data
+    
+    Returns:
+        JSON response (201 with the friend, 409 or 422)
+    """
+    fingerprint = request_fingerprint(data)
+    state, stored = IdempotencyStore.begin(user_id, idempotency_key, fingerprint)
+    
+    if state == IdempotencyStore.REPLAY:
+        body, status_code = stored
+        response = jsonify(body)
+        response.status_code = status_code
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    if state == IdempotencyStore.IN_PROGRESS:
+        return jsonify({
+            'error': 'Conflict',
+            'message': 'A request with this Idempotency-Key is still in progress'
+        }), 409
+    if state == IdempotencyStore.MISMATCH:
+        return jsonify({
+            'error': 'Unprocessable Entity',
+            'message': 'Idempotency-Key was already used with a different request body'
+        }), 422
+    
+    try:
+        friend, created = SupabaseService.create_friend_idempotent(
+            user_id, friend_data, idempotency_key, fingerprint
+        )
+    except IdempotencyKeyReused:
+        # Another worker created the row from a different body
+        IdempotencyStore.release(user_id, idempotency_key)
+        return jsonify({
+            'error': 'Unprocessable Entity',
+            'message': 'Idempotency-Key was already used with a different request body'
+        }), 422
+    except Exception:
+        IdempotencyStore.release(user_id, idempotency_key)
+        raise
+    
+    if friend is None:
+        IdempotencyStore.release(user_id, idempotency_key)
+        return jsonify({
+            'error': 'Conflict',
+            'message': 'The friend created with this Idempotency-Key was deleted'
+        }), 409
+    
+    body = BirthdayService.enrich_friend(friend, get_request_today()).to_dict()
+    IdempotencyStore.complete(user_id, idempotency_key, body, 201)
+    
+    response = jsonify(body)
+    response.status_code = 201
+    if not created:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+@friends_bp.route('/friends/bulk', methods=['POST'])
+@require_auth
+@rate_limit('write')
+def create_friends_bulk(user_id):
+    """
+    Create many friends in one request.
+    
+    Query Parameters:
+        async (bool): Validate now, then create in a background job (202 with the job)
+    
+    Request Body:
+        friends (list): Friend objects with name, date_of_birth and optional notes
+    
+    Returns:
+        JSON response with created friends; nothing is created if any item is invalid
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('friends'), list) or not data['friends']:
             return jsonify({
                 'error': 'Bad Request',
-                'message': error_message
+                'message': 'friends must be a non-empty list'
             }), 400
         
-        # Create friend in database
-        friend_data = {
-            'name': data['name'].strip(),
-            'date_of_birth': data['date_of_birth'],
-            'notes': data.get('notes', '').strip() if data.get('notes') else None
-        }
+        if len(data['friends']) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'At most {MAX_BATCH_SIZE} friends can be created at once'
+            }), 400
         
-        created_friend = SupabaseService.create_friend(user_id, friend_data)
+        # Validate every item in one pass
+        today = get_request_today()
+        friends_data, errors_by_index = validate_friend_batch(data['friends'], today=today)
+        if errors_by_index:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'{len(errors_by_index)} friends failed validation',
+                'errors': errors_by_index
+            }), 400
         
-        # Enrich with birthday data
-        enriched = BirthdayService.enrich_friend_data(created_friend)
+        for friend_data in friends_data:
+            friend_data.setdefault('notes', None)
+        
+        if wants_async():
+            for friend_data in friends_data:
+                friend_data['date_of_birth'] = friend_data['date_of_birth'].isoformat()
+            return enqueue_job('import_friends', user_id, {
+                'friends': friends_data,
+                'today': today.isoformat()
+            })
         
-        return jsonify(enriched), 201
+        created_friends = SupabaseService.create_friends(user_id, friends_data)
         
+        return jsonify({
+            'friends': [BirthdayService.enrich_friend(friend, today).to_dict() for friend in created_friends],
+            'count': len(created_friends)
+        }), 201
+    
     except Exception as e:
-        logger.error(f"Error creating friend: {e}")
+        logger.error(f"Error creating friends in bulk: {e}")
         return jsonify({
             'error': 'Internal Server Error',
-            'message': 'Failed to create friend'
+            'message': 'Failed to create friends'
         }), 500
 
 
 @friends_bp.route('/friends/<friend_id>', methods=['PUT'])
 @require_auth
+@rate_limit('write')
 def update_friend(friend_id, user_id):
     """
     Update an existing friend.
@@ -179,22 +593,10 @@ def update_friend(friend_id, user_id):
                 'message': 'Request body must be JSON'
             }), 400
         
-        # Validate input
-        is_valid, error_message = validate_friend_data(data, is_update=True)
-        if not is_valid:
-            return jsonify({
-                'error': 'Bad Request',
-                'message': error_message
-            }), 400
-        
-        # Prepare update data
-        update_data = {}
-        if 'name' in data:
-            update_data['name'] = data['name'].strip()
-        if 'date_of_birth' in data:
-            update_data['date_of_birth'] = data['date_of_birth']
-        if 'notes' in data:
-            update_data['notes'] = data['notes'].strip() if data['notes'] else None
+        # Validate input and prepare update data
+        update_data, errors = validate_friend_payload(data, is_update=True, today=get_request_today())
+        if errors:
+            return validation_error(errors)
         
         # Add updated_at timestamp
         update_data['updated_at'] = datetime.utcnow().isoformat()
@@ -209,9 +611,9 @@ def update_friend(friend_id, user_id):
             }), 404
         
         # Enrich with birthday data
-        enriched = BirthdayService.enrich_friend_data(updated_friend)
+        enriched = BirthdayService.enrich_friend(updated_friend, get_request_today())
         
-        return jsonify(enriched), 200
+        return jsonify(enriched.to_dict()), 200
         
     except Exception as e:
         logger.error(f"Error updating friend {friend_id}: {e}")
@@ -223,6 +625,7 @@ def update_friend(friend_id, user_id):
 
 @friends_bp.route('/friends/<friend_id>', methods=['DELETE'])
 @require_auth
+@rate_limit('write')
 def delete_friend(friend_id, user_id):
     """
     Delete a friend.
@@ -254,6 +657,7 @@ def delete_friend(friend_id, user_id):
 
 @friends_bp.route('/friends/<friend_id>/suggestions', methods=['POST'])
 @require_auth
+@rate_limit('ai')
 def get_suggestions(friend_id, user_id):
     """
     Get AI-powered gift or event suggestions for a friend.
@@ -261,11 +665,16 @@ def get_suggestions(friend_id, user_id):
     Args:
         friend_id: Friend UUID
     
+    Query Parameters:
+        async (bool): Generate in a background job (202 with the job)
+    
     Request Body:
-        suggestion_type (str): 'gifts' or 'events'
+        suggestion_type (str): 'gifts', 'events' or 'both'
     
     Returns:
-        JSON response with AI suggestions
+        JSON response with AI suggestions ('both' returns a dict keyed by type),
+        whether they were reused from the suggestion cache and the cache tier
+        ('exact', 'similar' or null) that served them
     """
     try:
         data = request.get_json()
@@ -273,14 +682,14 @@ def get_suggestions(friend_id, user_id):
         if not data or 'suggestion_type' not in data:
             return jsonify({
                 'error': 'Bad Request',
-                'message': 'suggestion_type is required (gifts or events)'
+                'message': 'suggestion_type is required (gifts, events or both)'
             }), 400
         
         suggestion_type = data['suggestion_type'].lower()
-        if suggestion_type not in ['gifts', 'events']:
+        if suggestion_type not in ['gifts', 'events', 'both']:
             return jsonify({
                 'error': 'Bad Request',
-                'message': 'suggestion_type must be "gifts" or "events"'
+                'message': 'suggestion_type must be "gifts", "events" or "both"'
             }), 400
         
         # Get friend data
@@ -292,30 +701,19 @@ def get_suggestions(friend_id, user_id):
                 'message': 'Friend not found'
             }), 404
         
+        today = get_request_today()
+        
+        if wants_async():
+            return enqueue_job('suggestions', user_id, {
+                'friend_id': friend_id,
+                'suggestion_type': suggestion_type,
+                'today': today.isoformat()
+            })
+        
         # Enrich with birthday data
-        enriched = BirthdayService.enrich_friend_data(friend)
-        
-        # Generate AI suggestions
-        if suggestion_type == 'gifts':
-            suggestions = AIService.generate_gift_suggestions(
-                enriched['name'],
-                enriched['age'],
-                enriched.get('notes')
-            )
-        else:
-            suggestions = AIService.generate_event_suggestions(
-                enriched['name'],
-                enriched['age'],
-                enriched.get('notes')
-            )
+        enriched = BirthdayService.enrich_friend(friend, today)
         
-        return jsonify({
-            'friend_name': enriched['name'],
-            'age': enriched['age'],
-            'suggestion_type': suggestion_type,
-            'suggestions': suggestions,
-            'generated_at': datetime.utcnow().isoformat() + 'Z'
-        }), 200
+        return jsonify(AIService.suggest_for_friend(enriched, suggestion_type, user_id)), 200
         
     except Exception as e:
         logger.error(f"Error generating suggestions for friend {friend_id}: {e}")
@@ -1,22 +1,122 @@
 """
-Health check endpoint.
-Provides a simple health check for monitoring.
+Health check endpoints.
+Liveness and readiness checks for load balancers and orchestrators, plus a
+token-protected summary of this worker's counters for monitoring.
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app, abort
+from app.middleware.rate_limit import RateLimiter
+from app.services.ai_service import AIService
+from app.services.model_router import ModelRouter
+from app.services.supabase_service import SupabaseService
+from app.services.friend_cache import FriendCache
+from app.services.change_feed import ChangeFeed
+from app.services.health_monitor import HealthMonitor
+from app.services.idempotency_store import IdempotencyStore
+from app.services.shared_friend_cache import SharedFriendCache
+from app.services.calendar_feed import CalendarFeed
+from app.services.search_index import SearchIndex
+from app.services.suggestion_cache import SuggestionCache
 from datetime import datetime
+import hmac
 
 health_bp = Blueprint('health', __name__)
 
 
+def _timestamp() -> str:
+    return datetime.utcnow().isoformat() + 'Z'
+
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint.
     
+    Public, so it only reports that the worker is up; counters are served
+    by the token-protected /health/stats.
+    
     Returns:
         JSON response with status and timestamp
     """
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
+        'timestamp': _timestamp()
+    }), 200
+
+
+@health_bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """
+    Liveness check: the worker is running and serving requests.
+    
+    Returns:
+        JSON response with status 'alive'; never touches dependencies
+    """
+    return jsonify({
+        'status': 'alive',
+        'timestamp': _timestamp()
+    }), 200
+
+
+@health_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness check: whether this worker should receive traffic.
+    
+    Reads dependency results cached by the background prober, so frequent
+    probes add no upstream calls. Reasons and checks are served by
+    /health/stats.
+    
+    Returns:
+        200 with status 'ready' or 'degraded', or 503 with 'not_ready' or 'starting'
+    """
+    HealthMonitor.ensure_started()
+    status, _, _ = HealthMonitor.get_readiness()
+    
+    return jsonify({
+        'status': status,
+        'timestamp': _timestamp()
+    }), 200 if status in ('ready', 'degraded') else 503
+
+
+@health_bp.route('/health/stats', methods=['GET'])
+def health_stats():
+    """
+    Detailed health for operators: readiness reasons, dependency checks and
+    this worker's counters.
+    
+    Requires "Authorization: Bearer <HEALTH_STATS_TOKEN>"; without a
+    configured token the endpoint does not exist.
+    
+    Returns:
+        JSON response with readiness and this worker's rate limit, Supabase read,
+        cache, idempotency, change feed, AI token and model routing counters
+    """
+    token = current_app.config['HEALTH_STATS_TOKEN']
+    if not token:
+        abort(404)
+    
+    auth_header = request.headers.get('Authorization', '')
+    scheme, _, provided = auth_header.partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(provided.encode(), token.encode()):
+        return jsonify({'error': 'Unauthorized', 'message': 'Invalid or missing health stats token'}), 401
+    
+    HealthMonitor.ensure_started()
+    status, reasons, checks = HealthMonitor.get_readiness()
+    
+    return jsonify({
+        'status': status,
+        'reasons': reasons,
+        'timestamp': _timestamp(),
+        'checks': checks,
+        'rate_limits': RateLimiter.get_stats(),
+        'supabase': SupabaseService.get_stats(),
+        'friend_cache': FriendCache.get_stats(),
+        'shared_friend_cache': SharedFriendCache.get_stats(),
+        'calendar_feed': CalendarFeed.get_stats(),
+        'search_index': SearchIndex.get_stats(),
+        'suggestion_cache': SuggestionCache.get_stats(),
+        'ai_usage': AIService.get_usage_stats(),
+        'ai_models': ModelRouter.get_stats(),
+        'idempotency': IdempotencyStore.get_stats(),
+        'change_feed': ChangeFeed.get_stats()
     }), 200
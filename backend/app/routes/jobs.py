@@ -0,0 +1,46 @@
+"""
+Job routes.
+Status and results of background jobs queued by other endpoints.
+"""
+from flask import Blueprint, jsonify
+from app.middleware.auth import require_auth
+from app.middleware.rate_limit import rate_limit
+from app.services.job_queue import JobQueue
+import logging
+
+logger = logging.getLogger(__name__)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+@require_auth
+@rate_limit('read')
+def get_job(job_id, user_id):
+    """
+    Get the status of a background job.
+    
+    Args:
+        job_id: Job UUID returned in a 202 response
+    
+    Returns:
+        JSON response with the job's status, attempts, error and, once
+        succeeded, its result
+    """
+    try:
+        job = JobQueue.get(job_id, user_id)
+        
+        if not job:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'Job not found'
+            }), 404
+        
+        return jsonify({'job': job}), 200
+        
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {e}")
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to fetch job'
+        }), 500
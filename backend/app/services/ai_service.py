@@ -1,34 +1,166 @@
 """
 Gemini AI service module.
-Provides AI-powered gift and event suggestions using Google's Gemini API.
+Provides AI-powered gift and event suggestions using Google's Gemini API,
+routed across the configured models by ModelRouter.
 """
-import google.generativeai as genai
 from flask import current_app
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, List, Dict, Optional, Tuple
 import json
+import threading
 import logging
 
+from app.models.friend import EnrichedFriend
+from app.services.prompt_builder import PromptBuilder, count_tokens
+from app.services.model_router import STUB_MODEL, ModelRoute, ModelRouter
+from app.services.suggestion_cache import SuggestionCache
+
 logger = logging.getLogger(__name__)
 
 
 class AIService:
     """Service for AI-powered suggestions using Gemini."""
     
-    _model = None
+    # Shared pool for generating gift and event suggestions side by side
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='ai-suggestions')
+    
+    # Token usage of Gemini calls made by this worker
+    _usage = {'calls': 0, 'prompt_tokens': 0, 'response_tokens': 0, 'notes_truncated': 0}
+    _usage_lock = threading.Lock()
+    
+    @classmethod
+    def get_circuit_state(cls) -> Dict:
+        """Get the circuit breaker state of the healthiest configured model."""
+        return ModelRouter.get_circuit_state()
+    
+    @classmethod
+    def get_queued_generations(cls) -> int:
+        """Get the number of generations waiting for a free thread in the suggestions pool."""
+        return cls._executor._work_queue.qsize()
+    
+    @classmethod
+    def init_model(cls, api_key: str):
+        """
+        Configure the Gemini client and create the configured model instances.
+        
+        Called at startup so the first suggestion request does not pay
+        for client configuration.
+        
+        Args:
+            api_key: Gemini API key
+        """
+        ModelRouter.init_models(api_key)
     
     @classmethod
     def get_model(cls):
         """
-        Get or create Gemini model instance.
+        Create the configured model instances if not done yet.
+        
+        Returns:
+            ModelRouter, which picks a model for each call
+        """
+        if not ModelRouter.is_initialized():
+            cls.init_model(current_app.config['GEMINI_API_KEY'])
+        return ModelRouter
+    
+    @classmethod
+    def suggest_for_friend(cls, enriched: EnrichedFriend, suggestion_type: str, user_id: str,
+                           use_fallback: bool = True) -> Dict:
+        """
+        Build the suggestions response for a friend.
+        
+        Args:
+            enriched: Friend with calculated birthday fields
+            suggestion_type: 'gifts', 'events' or 'both'
+            user_id: Requesting user
+            use_fallback: Return static suggestions when Gemini fails instead of raising
         
         Returns:
-            Gemini generative model
+            Dictionary with the friend's name and age, suggestions, reuse flag and cache tier
         """
-        if cls._model is None:
-            api_key = current_app.config['GEMINI_API_KEY']
-            genai.configure(api_key=api_key)
-            cls._model = genai.GenerativeModel('gemini-pro')
-        return cls._model
+        # Reuse cached suggestions when possible, otherwise ask the model
+        suggestions, cache_tier = cls.get_suggestions(
+            suggestion_type,
+            enriched.name,
+            enriched.age,
+            enriched.notes,
+            user_id,
+            use_fallback
+        )
+        
+        if suggestion_type == 'both':
+            reused = all(cache_tier.values())
+        else:
+            reused = cache_tier is not None
+        
+        return {
+            'friend_name': enriched.name,
+            'age': enriched.age,
+            'suggestion_type': suggestion_type,
+            'suggestions': suggestions,
+            'reused': reused,
+            'cache_tier': cache_tier,
+            'generated_at': datetime.utcnow().isoformat() + 'Z'
+        }
+    
+    @classmethod
+    def get_suggestions(cls, suggestion_type: str, friend_name: str, age: int,
+                        notes: Optional[str] = None, user_id: Optional[str] = None,
+                        use_fallback: bool = True) -> Tuple[Any, Any]:
+        """
+        Get suggestions from the suggestion cache, generating them on a miss.
+        
+        Args:
+            suggestion_type: 'gifts', 'events' or 'both'
+            friend_name: Name of the friend
+            age: Current age (turning age+1)
+            notes: Optional relationship context
+            user_id: Requesting user (scopes the cache)
+            use_fallback: Return static suggestions when Gemini fails instead of raising
+        
+        Returns:
+            Tuple of (suggestions, cache tier); for 'both' each is a dict keyed by type.
+            The tier is 'exact' or 'similar' when reused and None when generated.
+        """
+        if suggestion_type != 'both':
+            return cls._get_cached_or_generate(suggestion_type, friend_name, age, notes, user_id, use_fallback)
+        
+        # Resolve the model here, where the app context is available
+        cls.get_model()
+        
+        futures = {
+            kind: cls._executor.submit(cls._get_cached_or_generate, kind, friend_name, age, notes, user_id, use_fallback)
+            for kind in ('gifts', 'events')
+        }
+        results = {kind: future.result() for kind, future in futures.items()}
+        
+        return (
+            {kind: result[0] for kind, result in results.items()},
+            {kind: result[1] for kind, result in results.items()}
+        )
+    
+    @classmethod
+    def _get_cached_or_generate(cls, suggestion_type: str, friend_name: str, age: int,
+                                notes: Optional[str], user_id: Optional[str],
+                                use_fallback: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """Look up one suggestion type in the cache, calling the model on a miss."""
+        cached = SuggestionCache.lookup(user_id, suggestion_type, friend_name, age, notes)
+        if cached is not None:
+            return cached
+        
+        try:
+            suggestions, route = cls._generate(suggestion_type, friend_name, age, notes)
+        except Exception as e:
+            logger.error(f"Error generating {suggestion_type} suggestions: {e}")
+            if not use_fallback:
+                raise
+            return cls._get_fallback_suggestions(suggestion_type, age), None
+        
+        # Only real model output is cached; fallbacks and stub answers are retried on the next request
+        if route.name != STUB_MODEL:
+            SuggestionCache.store(user_id, suggestion_type, friend_name, age, notes, suggestions)
+        return suggestions, None
     
     @classmethod
     def generate_gift_suggestions(cls, friend_name: str, age: int, notes: Optional[str] = None) -> List[Dict]:
@@ -44,52 +176,7 @@ class AIService:
             List of gift suggestion dictionaries
         """
         try:
-            model = cls.get_model()
-            
-            # Build the prompt
-            prompt = f"""You are a thoughtful gift recommendation assistant. Based on the following information about a friend, suggest 5 personalized gift ideas for their upcoming birthday.
-
-Friend Details:
-- Name: {friend_name}
-- Age: {age} (turning {age + 1})
-- Relationship Context: {notes if notes else 'No additional context provided'}
-
-Requirements:
-1. Suggest gifts appropriate for their age and interests
-2. Include a mix of price ranges (budget-friendly to premium)
-3. Provide brief reasoning for each suggestion
-4. Format as JSON array with fields: title, description, reasoning, estimated_price_range
-
-Output ONLY valid JSON in this exact format:
-[
-  {{
-    "title": "Gift name",
-    "description": "Brief description",
-    "reasoning": "Why this gift fits",
-    "estimated_price_range": "$X-$Y"
-  }}
-]"""
-            
-            # Generate response
-            response = model.generate_content(prompt)
-            
-            # Parse JSON response
-            try:
-                # Extract JSON from response text
-                text = response.text.strip()
-                # Remove markdown code blocks if present
-                if text.startswith('```'):
-                    text = text.split('```')[1]
-                    if text.startswith('json'):
-                        text = text[4:]
-                    text = text.strip()
-                
-                suggestions = json.loads(text)
-                return suggestions[:5]  # Ensure max 5 suggestions
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse AI response as JSON: {response.text}")
-                return cls._get_fallback_gift_suggestions(age)
-                
+            return cls._generate('gifts', friend_name, age, notes)[0]
         except Exception as e:
             logger.error(f"Error generating gift suggestions: {e}")
             return cls._get_fallback_gift_suggestions(age)
@@ -108,57 +195,111 @@ Output ONLY valid JSON in this exact format:
             List of event suggestion dictionaries
         """
         try:
-            model = cls.get_model()
-            
-            # Build the prompt
-            prompt = f"""You are a creative event planning assistant. Based on the following information about a friend, suggest 5 small celebration or surprise ideas for their upcoming birthday.
-
-Friend Details:
-- Name: {friend_name}
-- Age: {age} (turning {age + 1})
-- Relationship Context: {notes if notes else 'No additional context provided'}
-
-Requirements:
-1. Suggest events ranging from intimate to small group activities
-2. Include both in-person and virtual options
-3. Consider age-appropriate activities
-4. Provide brief planning tips for each
-5. Format as JSON array with fields: title, description, planning_tips, estimated_budget
-
-Output ONLY valid JSON in this exact format:
-[
-  {{
-    "title": "Event name",
-    "description": "Brief description",
-    "planning_tips": "How to execute this",
-    "estimated_budget": "$X-$Y or Free"
-  }}
-]"""
-            
-            # Generate response
-            response = model.generate_content(prompt)
-            
-            # Parse JSON response
-            try:
-                # Extract JSON from response text
-                text = response.text.strip()
-                # Remove markdown code blocks if present
-                if text.startswith('```'):
-                    text = text.split('```')[1]
-                    if text.startswith('json'):
-                        text = text[4:]
-                    text = text.strip()
-                
-                suggestions = json.loads(text)
-                return suggestions[:5]  # Ensure max 5 suggestions
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse AI response as JSON: {response.text}")
-                return cls._get_fallback_event_suggestions(age)
-                
+            return cls._generate('events', friend_name, age, notes)[0]
         except Exception as e:
             logger.error(f"Error generating event suggestions: {e}")
             return cls._get_fallback_event_suggestions(age)
     
+    @classmethod
+    def _generate(cls, suggestion_type: str, friend_name: str, age: int,
+                  notes: Optional[str] = None) -> Tuple[List[Dict], ModelRoute]:
+        """
+        Ask the best available model for one suggestion type.
+        
+        Models are tried in ModelRouter's order; one that fails or returns
+        unparseable output is skipped for the next.
+        
+        Args:
+            suggestion_type: 'gifts' or 'events'
+            friend_name: Name of the friend
+            age: Current age (turning age+1)
+            notes: Optional relationship context
+        
+        Returns:
+            Tuple of (suggestion dictionaries, at most 5; route of the model that answered)
+        
+        Raises:
+            CircuitOpenError: If every model's circuit is open
+            Exception: If every model call failed or returned invalid JSON
+        """
+        router = cls.get_model()
+        
+        prompt, prompt_tokens, notes_truncated = PromptBuilder.build(suggestion_type, friend_name, age, notes)
+        
+        def handle(response, route: ModelRoute) -> Tuple[List[Dict], ModelRoute]:
+            cls._record_usage(suggestion_type, response, prompt_tokens, notes_truncated, route)
+            return cls._parse_suggestions(response), route
+        
+        # Models whose circuit is open are skipped; callers fall back or retry later
+        return router.generate(prompt, handle)
+    
+    @staticmethod
+    def _parse_suggestions(response) -> List[Dict]:
+        """
+        Parse a model response into suggestions.
+        
+        Raises:
+            json.JSONDecodeError: If the response is not a JSON array
+        """
+        try:
+            # Extract JSON from response text
+            text = response.text.strip()
+            # Remove markdown code blocks if present
+            if text.startswith('```'):
+                text = text.split('```')[1]
+                if text.startswith('json'):
+                    text = text[4:]
+                text = text.strip()
+            
+            suggestions = json.loads(text)
+            return suggestions[:5]  # Ensure max 5 suggestions
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse AI response as JSON: {response.text}")
+            raise
+    
+    @classmethod
+    def _record_usage(cls, suggestion_type: str, response, prompt_tokens: int, notes_truncated: bool,
+                      route: ModelRoute):
+        """
+        Record the prompt and response token counts of one call.
+        
+        Counts reported by the API are used when present, otherwise local estimates.
+        They are also charged to the model's cost budget.
+        """
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is not None and getattr(usage, 'prompt_token_count', None):
+            prompt_tokens = usage.prompt_token_count
+            response_tokens = usage.candidates_token_count
+        else:
+            response_tokens = count_tokens(response.text)
+        
+        with cls._usage_lock:
+            cls._usage['calls'] += 1
+            cls._usage['prompt_tokens'] += prompt_tokens
+            cls._usage['response_tokens'] += response_tokens
+            cls._usage['notes_truncated'] += int(notes_truncated)
+        ModelRouter.record_tokens(route, prompt_tokens + response_tokens)
+        
+        logger.info(f"{route.name} {suggestion_type} call: {prompt_tokens} prompt tokens, {response_tokens} response tokens")
+    
+    @classmethod
+    def get_usage_stats(cls) -> Dict[str, int]:
+        """
+        Get token usage counters for this worker.
+        
+        Returns:
+            Dictionary with calls, prompt_tokens, response_tokens and notes_truncated
+        """
+        with cls._usage_lock:
+            return dict(cls._usage)
+    
+    @classmethod
+    def _get_fallback_suggestions(cls, suggestion_type: str, age: int) -> List[Dict]:
+        """Fallback suggestions of the given type if AI fails."""
+        if suggestion_type == 'gifts':
+            return cls._get_fallback_gift_suggestions(age)
+        return cls._get_fallback_event_suggestions(age)
+    
     @staticmethod
     def _get_fallback_gift_suggestions(age: int) -> List[Dict]:
         """Fallback gift suggestions if AI fails."""
@@ -3,7 +3,9 @@ Birthday calculation service.
 Handles all birthday-related calculations including age, next birthday, and reminder status.
 """
 from datetime import datetime, date, timedelta
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+from app.models.friend import Friend, EnrichedFriend
 
 
 class BirthdayService:
@@ -12,18 +14,30 @@ class BirthdayService:
     # Number of days before birthday to trigger reminder
     REMINDER_DAYS = 2
     
+    # Non-leap reference year used for the stored day-of-year ordinal
+    ORDINAL_REFERENCE_YEAR = 2001
+    
+    # Birthday fields memoized per (month, day, year) for each current day.
+    # Users across timezones can be on up to three different dates at once,
+    # so that many day tables are kept; older days are dropped.
+    # Each table is bounded to every calendar day for 200 birth years.
+    MEMO_MAX_SIZE = 366 * 200
+    MEMO_MAX_DAYS = 3
+    _memos: Dict[date, Dict[Tuple[int, int, int], Tuple[int, date, int, bool]]] = {}
+    
     @staticmethod
-    def calculate_age(date_of_birth: date) -> int:
+    def calculate_age(date_of_birth: date, today: Optional[date] = None) -> int:
         """
         Calculate current age based on date of birth.
         
         Args:
             date_of_birth: Date of birth
+            today: Reference date (defaults to today)
             
         Returns:
             Current age in years
         """
-        today = date.today()
+        today = today or date.today()
         age = today.year - date_of_birth.year
         
         # Adjust if birthday hasn't occurred this year yet
@@ -33,17 +47,18 @@ class BirthdayService:
         return age
     
     @staticmethod
-    def calculate_next_birthday(date_of_birth: date) -> date:
+    def calculate_next_birthday(date_of_birth: date, today: Optional[date] = None) -> date:
         """
         Calculate the next occurrence of a birthday.
         
         Args:
             date_of_birth: Date of birth
+            today: Reference date (defaults to today)
             
         Returns:
             Date of next birthday
         """
-        today = date.today()
+        today = today or date.today()
         current_year = today.year
         
         # Try this year's birthday
@@ -64,17 +79,18 @@ class BirthdayService:
         return next_birthday
     
     @staticmethod
-    def calculate_days_until_birthday(next_birthday: date) -> int:
+    def calculate_days_until_birthday(next_birthday: date, today: Optional[date] = None) -> int:
         """
         Calculate days remaining until next birthday.
         
         Args:
             next_birthday: Date of next birthday
+            today: Reference date (defaults to today)
             
         Returns:
             Number of days until birthday
         """
-        today = date.today()
+        today = today or date.today()
         delta = next_birthday - today
         return delta.days
     
@@ -92,34 +108,220 @@ class BirthdayService:
         return 0 <= days_until_birthday <= BirthdayService.REMINDER_DAYS
     
     @staticmethod
-    def enrich_friend_data(friend_data: Dict) -> Dict:
+    def birthday_ordinal(month: int, day: int) -> int:
         """
-        Enrich friend data with calculated birthday fields.
+        Get the day-of-year ordinal (1-365) of a birthday.
+        
+        Ordinals are taken from a non-leap reference year, so Feb 29 maps
+        onto Feb 28 exactly as calculate_next_birthday celebrates it.
         
         Args:
-            friend_data: Dictionary containing at least 'date_of_birth'
-            
+            month: Birth month
+            day: Birth day
+        
+        Returns:
+            Day-of-year ordinal
+        """
+        if (month, day) == (2, 29):
+            day = 28
+        return date(BirthdayService.ORDINAL_REFERENCE_YEAR, month, day).timetuple().tm_yday
+    
+    @staticmethod
+    def get_birthday_columns(date_of_birth) -> Dict:
+        """
+        Build the denormalized birthday columns stored alongside date_of_birth.
+        
+        Args:
+            date_of_birth: Date of birth (date or YYYY-MM-DD string)
+        
         Returns:
-            Enriched dictionary with age, next_birthday, days_until_birthday, is_reminder_due
-        """
-        # Parse date_of_birth if it's a string
-        dob = friend_data['date_of_birth']
-        if isinstance(dob, str):
-            dob = datetime.strptime(dob, '%Y-%m-%d').date()
-        
-        # Calculate all birthday-related fields
-        age = BirthdayService.calculate_age(dob)
-        next_birthday = BirthdayService.calculate_next_birthday(dob)
-        days_until = BirthdayService.calculate_days_until_birthday(next_birthday)
-        reminder_due = BirthdayService.is_reminder_due(days_until)
-        
-        # Add calculated fields to friend data
-        enriched_data = friend_data.copy()
-        enriched_data.update({
-            'age': age,
-            'next_birthday': next_birthday.isoformat(),
-            'days_until_birthday': days_until,
-            'is_reminder_due': reminder_due
-        })
-        
-        return enriched_data
+            Dictionary with birth_month, birth_day and birth_doy
+        """
+        if isinstance(date_of_birth, str):
+            date_of_birth = datetime.strptime(date_of_birth, '%Y-%m-%d').date()
+        
+        return {
+            'birth_month': date_of_birth.month,
+            'birth_day': date_of_birth.day,
+            'birth_doy': BirthdayService.birthday_ordinal(date_of_birth.month, date_of_birth.day)
+        }
+    
+    @staticmethod
+    def get_ordinal_window(days: int, today: Optional[date] = None) -> List[Tuple[int, int]]:
+        """
+        Get the birth_doy ranges covering birthdays in the next `days` days.
+        
+        The window is widened by one day so leap-year offsets between the
+        reference ordinal and the real calendar never drop a birthday; callers
+        still filter on the exact days_until_birthday afterwards.
+        
+        Args:
+            days: Number of days ahead to cover
+            today: Reference date (defaults to today)
+        
+        Returns:
+            List of inclusive (start, end) ordinal ranges (two when wrapping the year end)
+        """
+        today = today or date.today()
+        start = BirthdayService.birthday_ordinal(today.month, today.day)
+        end = start + days + 1
+        
+        if days + 1 >= 365:
+            return [(1, 365)]
+        if end <= 365:
+            return [(start, end)]
+        return [(start, 365), (1, end - 365)]
+    
+    @staticmethod
+    def next_birthday_key(enriched: EnrichedFriend) -> Tuple[int, int, str, str]:
+        """
+        Get the sort key ordering friends by next birthday.
+        
+        Matches the database page order (birth_doy, birth_day, name, id): days
+        until the birthday only tie across dates for Feb 28 and Feb 29 outside
+        leap years, where the birth day decides as it does in the database.
+        
+        Args:
+            enriched: Friend enriched for the reference date
+        
+        Returns:
+            Tuple of (days_until_birthday, birth day, name, id)
+        """
+        return (
+            enriched.days_until_birthday,
+            enriched.date_of_birth.day,
+            enriched.name,
+            enriched.id or ''
+        )
+    
+    @staticmethod
+    def get_birthday_fields(date_of_birth: date, today: Optional[date] = None) -> Tuple[int, date, int, bool]:
+        """
+        Get all calculated birthday fields, memoized for the current day.
+        
+        Friends sharing a birth date reuse one computation; a day's memo is
+        dropped once newer days replace it.
+        
+        Args:
+            date_of_birth: Date of birth
+            today: Reference date (defaults to today)
+        
+        Returns:
+            Tuple of (age, next_birthday, days_until_birthday, is_reminder_due)
+        """
+        today = today or date.today()
+        
+        memo = BirthdayService._memos.get(today)
+        if memo is None:
+            memo = BirthdayService._new_memo(today)
+        
+        key = (date_of_birth.month, date_of_birth.day, date_of_birth.year)
+        fields = memo.get(key)
+        
+        if fields is None:
+            next_birthday = BirthdayService.calculate_next_birthday(date_of_birth, today)
+            days_until = BirthdayService.calculate_days_until_birthday(next_birthday, today)
+            fields = (
+                BirthdayService.calculate_age(date_of_birth, today),
+                next_birthday,
+                days_until,
+                BirthdayService.is_reminder_due(days_until)
+            )
+            if len(memo) < BirthdayService.MEMO_MAX_SIZE:
+                memo[key] = fields
+        
+        return fields
+    
+    @staticmethod
+    def _new_memo(today: date) -> Dict:
+        """Start the memo table for a day, keeping only the newest MEMO_MAX_DAYS days."""
+        memos = dict(BirthdayService._memos)
+        memos[today] = {}
+        for day in sorted(memos)[:-BirthdayService.MEMO_MAX_DAYS]:
+            del memos[day]
+        
+        # Swap in a new mapping so concurrent readers never see it mid-update
+        BirthdayService._memos = memos
+        return memos.get(today, {})
+    
+    @staticmethod
+    def enrich_friend(friend: Friend, today: Optional[date] = None) -> EnrichedFriend:
+        """
+        Enrich a Friend with calculated birthday fields.
+        
+        Args:
+            friend: Friend with a parsed date_of_birth
+            today: Reference date, e.g. today in the user's timezone (defaults to today)
+        
+        Returns:
+            EnrichedFriend referencing the original Friend
+        """
+        return EnrichedFriend(friend, *BirthdayService.get_birthday_fields(friend.date_of_birth, today))
+    
+    @staticmethod
+    def summarize(friends: Iterable[Friend], upcoming_days: int, next_count: int,
+                  today: Optional[date] = None) -> Tuple[Dict, List[EnrichedFriend]]:
+        """
+        Compute dashboard aggregates in one pass over a user's friends.
+        
+        Args:
+            friends: Friends with parsed dates of birth
+            upcoming_days: Days ahead counted as upcoming
+            next_count: Number of next birthdays to return
+            today: Reference date (defaults to today)
+        
+        Returns:
+            Tuple of (counts, next birthdays sorted by days until birthday) where
+            counts has total, birthdays_today, reminders_due, upcoming and
+            by_month (12 counts, January first)
+        """
+        today = today or date.today()
+        counts = {
+            'total': 0,
+            'birthdays_today': 0,
+            'reminders_due': 0,
+            'upcoming': 0,
+            'by_month': [0] * 12
+        }
+        
+        # Bounded heap of the soonest birthdays with the latest of them on top;
+        # the sequence number breaks ties without comparing friends
+        soonest = []
+        for seq, friend in enumerate(friends):
+            enriched = BirthdayService.enrich_friend(friend, today)
+            days_until = enriched.days_until_birthday
+            
+            counts['total'] += 1
+            counts['by_month'][friend.date_of_birth.month - 1] += 1
+            if days_until == 0:
+                counts['birthdays_today'] += 1
+            if enriched.is_reminder_due:
+                counts['reminders_due'] += 1
+            if days_until <= upcoming_days:
+                counts['upcoming'] += 1
+            
+            if next_count:
+                key = BirthdayService.next_birthday_key(enriched)
+                item = (_Reversed(key), seq, enriched)
+                if len(soonest) < next_count:
+                    heapq.heappush(soonest, item)
+                elif key < soonest[0][0].key:
+                    heapq.heapreplace(soonest, item)
+        
+        next_birthdays = [enriched for _, _, enriched in sorted(soonest, key=lambda item: item[0].key)]
+        return counts, next_birthdays
+
+
+class _Reversed:
+    """Wraps a sort key so heapq keeps the largest key on top."""
+    
+    __slots__ = ('key',)
+    
+    def __init__(self, key):
+        self.key = key
+    
+    def __lt__(self, other: '_Reversed') -> bool:
+        return self.key > other.key
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Reversed) and self.key == other.key
@@ -0,0 +1,376 @@
+"""
+Calendar feed module.
+Renders a user's friends as an iCalendar (RFC 5545) feed of yearly birthday
+events and caches the rendered feed per user until their friends change.
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+import base64
+import hashlib
+import hmac
+import threading
+import time
+import logging
+
+from app.models.friend import Friend
+from app.services.birthday_service import BirthdayService
+from app.services.shared_friend_cache import SharedFriendCache
+
+logger = logging.getLogger(__name__)
+
+PRODID = '-//Birthday Reminder//Birthdays//EN'
+
+# Bumped when the rendered format changes, so clients holding old ETags refetch
+FORMAT_VERSION = 1
+
+# Events per streamed chunk
+CHUNK_EVENTS = 100
+
+_EPOCH_STAMP = '19700101T000000Z'
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value."""
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 characters."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Back up to a character boundary (continuation bytes are 10xxxxxx)
+        while cut < len(encoded) and encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _stamp(timestamp: Optional[str]) -> str:
+    """Format a row timestamp as a UTC DATE-TIME (DTSTAMP)."""
+    if not timestamp:
+        return _EPOCH_STAMP
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return _EPOCH_STAMP
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_event(friend: Friend) -> str:
+    """
+    Render one friend's yearly birthday as a VEVENT.
+    
+    Feb 29 birthdays recur on the last day of February, matching the Feb 28
+    celebration BirthdayService uses in non-leap years.
+    
+    Args:
+        friend: Friend with a parsed date_of_birth
+    
+    Returns:
+        VEVENT block with CRLF line endings
+    """
+    dob = friend.date_of_birth
+    if (dob.month, dob.day) == (2, 29):
+        rule = 'FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=-1'
+    else:
+        rule = 'FREQ=YEARLY'
+    
+    name = escape_text(friend.name)
+    description = f'Born {dob.year}'
+    if friend.notes:
+        description += f'\n\n{friend.notes}'
+    
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{friend.id}@birthday-reminder',
+        f'DTSTAMP:{_stamp(friend.updated_at or friend.created_at)}',
+        f'DTSTART;VALUE=DATE:{dob.strftime("%Y%m%d")}',
+        f'RRULE:{rule}',
+        f"SUMMARY:{name}'s birthday",
+        f'DESCRIPTION:{escape_text(description)}',
+        'TRANSP:TRANSPARENT',
+        'BEGIN:VALARM',
+        'ACTION:DISPLAY',
+        f"DESCRIPTION:{name}'s birthday is coming up",
+        f'TRIGGER:-P{BirthdayService.REMINDER_DAYS}D',
+        'END:VALARM',
+        'END:VEVENT'
+    ]
+    return ''.join(fold_line(line) for line in lines)
+
+
+def render_feed(friends: List[Friend], refresh_seconds: int) -> Iterator[str]:
+    """
+    Render a calendar feed incrementally.
+    
+    Args:
+        friends: Friends to include
+        refresh_seconds: Polling interval suggested to clients
+    
+    Yields:
+        Chunks of the feed (header, events in batches, footer)
+    """
+    refresh = f'PT{max(refresh_seconds // 60, 1)}M'
+    yield ''.join(fold_line(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Birthdays',
+        f'REFRESH-INTERVAL;VALUE=DURATION:{refresh}',
+        f'X-PUBLISHED-TTL:{refresh}'
+    ])
+    
+    ordered = sorted(friends, key=lambda friend: (friend.date_of_birth.month, friend.date_of_birth.day, friend.name))
+    for start in range(0, len(ordered), CHUNK_EVENTS):
+        yield ''.join(render_event(friend) for friend in ordered[start:start + CHUNK_EVENTS])
+    
+    yield 'END:VCALENDAR\r\n'
+
+
+def feed_etag(friends: List[Friend]) -> str:
+    """
+    Compute the feed's ETag from the fields it renders, without rendering it.
+    
+    Args:
+        friends: Friends in the feed
+    
+    Returns:
+        Hex digest identifying the feed content
+    """
+    digest = hashlib.sha256(f'{FORMAT_VERSION}:{BirthdayService.REMINDER_DAYS}'.encode())
+    for friend in sorted(friends, key=lambda friend: friend.id or ''):
+        digest.update('\x1f'.join([
+            friend.id or '',
+            friend.name,
+            friend.date_of_birth.isoformat(),
+            friend.notes or '',
+            friend.updated_at or friend.created_at or ''
+        ]).encode())
+        digest.update(b'\x1e')
+    return digest.hexdigest()[:32]
+
+
+class _Feed:
+    """A rendered feed and the shared cache generation it was rendered from."""
+    
+    __slots__ = ('etag', 'body', 'generation', 'expires_at')
+    
+    def __init__(self, etag: str, body: bytes, generation: int, expires_at: float):
+        self.etag = etag
+        self.body = body
+        self.generation = generation
+        self.expires_at = expires_at
+
+
+class CalendarFeed:
+    """Per-worker cache of rendered calendar feeds, plus feed URL tokens."""
+    
+    # Configured from CALENDAR_FEED_* settings at startup
+    enabled = True
+    ttl_seconds = 3600
+    max_users = 1000
+    refresh_seconds = 3600
+    secret = b''
+    
+    _entries: 'OrderedDict[str, _Feed]' = OrderedDict()
+    _renders: Dict[str, List[int]] = {}  # user_id -> [writes seen, renders in progress], only while rendering
+    _lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'renders': 0}
+    
+    @classmethod
+    def configure(cls, enabled: bool, ttl_seconds: int, max_users: int, refresh_seconds: int, secret: str):
+        """Apply feed cache settings."""
+        cls.enabled = enabled
+        cls.ttl_seconds = ttl_seconds
+        cls.max_users = max_users
+        cls.refresh_seconds = refresh_seconds
+        cls.secret = secret.encode()
+    
+    @classmethod
+    def make_token(cls, user_id: str) -> str:
+        """
+        Build the secret token identifying a user's feed URL.
+        
+        Tokens do not expire; rotating CALENDAR_FEED_SECRET revokes all of them.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            "<user_id>.<signature>"
+        """
+        signature = hmac.new(cls.secret, user_id.encode(), hashlib.sha256).digest()
+        return f"{user_id}.{base64.urlsafe_b64encode(signature).decode().rstrip('=')}"
+    
+    @classmethod
+    def verify_token(cls, token: str) -> Optional[str]:
+        """
+        Check a feed URL token.
+        
+        Args:
+            token: Token from the feed URL
+        
+        Returns:
+            User ID, or None if the token is invalid
+        """
+        user_id, _, _ = token.partition('.')
+        if user_id and hmac.compare_digest(cls.make_token(user_id).encode(), token.encode()):
+            return user_id
+        return None
+    
+    @classmethod
+    def begin_render(cls, user_id: str) -> Tuple[int, int]:
+        """
+        Start tracking writes to a user's friends before reading them for a feed.
+        
+        Every begin_render must be paired with end_render.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Generation to pass to render: (this worker's writes seen, shared
+            cache generation for all workers)
+        """
+        with cls._lock:
+            state = cls._renders.setdefault(user_id, [0, 0])
+            state[1] += 1
+            version = state[0]
+        return version, SharedFriendCache.generation(user_id)
+    
+    @classmethod
+    def end_render(cls, user_id: str):
+        """Stop tracking writes for a render started with begin_render."""
+        with cls._lock:
+            state = cls._renders.get(user_id)
+            if state is not None:
+                state[1] -= 1
+                if state[1] <= 0:
+                    del cls._renders[user_id]
+    
+    @classmethod
+    def get_cached(cls, user_id: str) -> Optional[_Feed]:
+        """
+        Get a user's rendered feed if no friend write happened since it was rendered.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Cached feed, or None on a miss
+        """
+        if not cls.enabled:
+            return None
+        
+        generation = SharedFriendCache.generation(user_id)
+        with cls._lock:
+            entry = cls._entries.get(user_id)
+            if entry is None or entry.expires_at <= time.monotonic() or entry.generation != generation:
+                cls._entries.pop(user_id, None)
+                cls._stats['misses'] += 1
+                return None
+            cls._entries.move_to_end(user_id)
+            cls._stats['hits'] += 1
+            return entry
+    
+    @classmethod
+    def render(cls, user_id: str, friends: List[Friend], etag: str,
+               generation: Tuple[int, int], store: bool = True) -> Iterator[bytes]:
+        """
+        Stream a user's feed, caching it once fully rendered.
+        
+        Args:
+            user_id: User ID
+            friends: The user's friends
+            etag: feed_etag of friends
+            generation: begin_render's generation from before friends were
+                fetched; the feed is not cached if a write happened since
+            store: False to stream without caching (e.g. stale data)
+        
+        Yields:
+            Encoded chunks of the feed
+        """
+        cls._count('renders')
+        chunks = []
+        for chunk in render_feed(friends, cls.refresh_seconds):
+            data = chunk.encode('utf-8')
+            chunks.append(data)
+            yield data
+        
+        if not (store and cls.enabled):
+            return
+        version, shared_generation = generation
+        with cls._lock:
+            if cls._renders.get(user_id, [0])[0] != version or SharedFriendCache.generation(user_id) != shared_generation:
+                return
+            cls._entries[user_id] = _Feed(etag, b''.join(chunks), shared_generation, time.monotonic() + cls.ttl_seconds)
+            cls._entries.move_to_end(user_id)
+            while len(cls._entries) > cls.max_users:
+                cls._entries.popitem(last=False)
+    
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Drop a user's rendered feed after their friends changed."""
+        with cls._lock:
+            state = cls._renders.get(user_id)
+            if state is not None:
+                state[0] += 1
+            cls._entries.pop(user_id, None)
+    
+    @classmethod
+    def apply_change(cls, event):
+        """
+        Invalidate the feeds of users touched by a change feed event.
+        
+        Args:
+            event: ChangeEvent for the friends table
+        """
+        user_ids = {(record or {}).get('user_id') for record in (event.record, event.old_record)}
+        for user_id in user_ids - {None}:
+            cls.invalidate(user_id)
+    
+    @classmethod
+    def record_not_modified(cls):
+        """Count a poll answered with 304."""
+        cls._count('not_modified')
+    
+    @classmethod
+    def _count(cls, name: str):
+        with cls._lock:
+            cls._stats[name] += 1
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get feed cache counters for this worker.
+        
+        Returns:
+            Dictionary with hits, misses, not_modified, renders and cached users
+        """
+        with cls._lock:
+            return {**cls._stats, 'users': len(cls._entries)}
+    
+    @classmethod
+    def clear(cls):
+        """Drop all rendered feeds."""
+        with cls._lock:
+            cls._entries.clear()
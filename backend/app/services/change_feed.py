@@ -0,0 +1,259 @@
+"""
+Change feed module.
+Delivers insert/update/delete events for the friends table to in-process
+subscribers (caches and indexes), from Supabase Realtime or a local stand-in.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent:
+    """A row change on the friends table."""
+    
+    __slots__ = ('type', 'record', 'old_record')
+    
+    def __init__(self, type: str, record: Optional[Dict] = None, old_record: Optional[Dict] = None):
+        self.type = type  # 'INSERT', 'UPDATE' or 'DELETE'
+        self.record = record
+        self.old_record = old_record
+
+
+class LocalChangeSource:
+    """In-process change source for tests and local development."""
+    
+    def __init__(self, publish: Callable[[ChangeEvent], None], set_state: Callable[[str], None]):
+        self._publish = publish
+        self._set_state = set_state
+    
+    def start(self):
+        """Nothing to connect to: events flow as soon as they are emitted."""
+        self._set_state(ChangeFeed.SUBSCRIBED)
+    
+    def insert(self, record: Dict):
+        """Emit an INSERT event."""
+        self._publish(ChangeEvent('INSERT', record=record))
+    
+    def update(self, record: Dict, old_record: Optional[Dict] = None):
+        """Emit an UPDATE event."""
+        self._publish(ChangeEvent('UPDATE', record=record, old_record=old_record or {'id': record['id']}))
+    
+    def delete(self, old_record: Dict):
+        """Emit a DELETE event (old_record needs at least the id)."""
+        self._publish(ChangeEvent('DELETE', old_record=old_record))
+
+
+class SupabaseChangeSource:
+    """
+    Supabase Realtime subscription to postgres changes on the friends table.
+    
+    Realtime is async-only, so the subscription runs on its own event loop in a
+    daemon thread. Each worker process holds its own subscription. When the
+    channel fails, times out or closes, the feed is reported disconnected and
+    the channel is resubscribed with exponential backoff.
+    """
+    
+    # Seconds before the first resubscribe attempt, doubled per failure up to the maximum
+    retry_delay = 1.0
+    retry_max_delay = 30.0
+    
+    FAILED_STATUSES = ('CHANNEL_ERROR', 'TIMED_OUT', 'CLOSED')
+    
+    def __init__(self, publish: Callable[[ChangeEvent], None], set_state: Callable[[str], None],
+                 url: str, key: str):
+        self._publish = publish
+        self._set_state = set_state
+        self._url = url
+        self._key = key
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._channel = None
+        self._failures = 0
+        self._retry_pending = False
+    
+    def start(self):
+        """Start the subscription thread."""
+        self._set_state(ChangeFeed.CONNECTING)
+        self._thread = threading.Thread(target=self._run, name='friends-change-feed', daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._subscribe())
+        self._loop.run_forever()
+    
+    async def _subscribe(self):
+        """Subscribe to the friends channel, replacing a failed one. Never raises."""
+        try:
+            if self._client is None:
+                from supabase import acreate_client
+                
+                self._client = await acreate_client(self._url, self._key)
+            if self._channel is not None:
+                try:
+                    await self._client.remove_channel(self._channel)
+                except Exception as e:
+                    logger.debug(f"Removing failed change feed channel: {e}")
+            
+            self._channel = self._client.channel('friends-changes')
+            self._channel.on_postgres_changes('*', callback=self._on_change, table='friends', schema='public')
+            await self._channel.subscribe(self._on_status)
+        except Exception as e:
+            self._on_failure(f"subscribe failed: {e}")
+    
+    def _on_status(self, status: Any, error: Optional[Exception] = None):
+        """Channel status callback from Realtime."""
+        status = getattr(status, 'value', status)
+        if status == 'SUBSCRIBED':
+            self._failures = 0
+            self._set_state(ChangeFeed.SUBSCRIBED)
+            logger.info("Subscribed to friends change feed")
+        elif status in self.FAILED_STATUSES:
+            self._on_failure(f"{status}: {error}" if error else status)
+    
+    def _on_failure(self, reason: str):
+        """Report the feed disconnected and schedule one resubscribe attempt."""
+        self._set_state(ChangeFeed.DISCONNECTED)
+        if self._retry_pending:
+            return
+        
+        delay = min(self.retry_max_delay, self.retry_delay * 2 ** self._failures)
+        self._failures += 1
+        self._retry_pending = True
+        logger.warning(f"Change feed disconnected ({reason}); resubscribing in {delay:.0f}s")
+        self._loop.call_later(delay, self._retry)
+    
+    def _retry(self):
+        self._retry_pending = False
+        self._loop.create_task(self._subscribe())
+    
+    def _on_change(self, payload):
+        data = payload['data']
+        self._publish(ChangeEvent(data['type'], data.get('record'), data.get('old_record')))
+
+
+class ChangeFeed:
+    """Fans change events out to subscribers."""
+    
+    # Source connection states
+    STOPPED = 'stopped'
+    CONNECTING = 'connecting'
+    SUBSCRIBED = 'subscribed'
+    DISCONNECTED = 'disconnected'
+    
+    _handlers: List[Callable[[ChangeEvent], None]] = []
+    _reset_handlers: List[Callable[[], None]] = []
+    _source = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+    _state = STOPPED
+    _stats = {'events': 0, 'handler_errors': 0, 'disconnects': 0, 'resets': 0}
+    
+    @classmethod
+    def subscribe(cls, handler: Callable[[ChangeEvent], None], reset: Optional[Callable[[], None]] = None):
+        """
+        Register a handler called for every change event.
+        
+        Args:
+            handler: Callable taking a ChangeEvent
+            reset: Callable dropping everything the handler keeps fresh, called
+                whenever events may have been missed
+        """
+        if handler not in cls._handlers:
+            cls._handlers.append(handler)
+        if reset is not None and reset not in cls._reset_handlers:
+            cls._reset_handlers.append(reset)
+    
+    @classmethod
+    def set_state(cls, state: str):
+        """
+        Record the change source's connection state.
+        
+        Events are missed while disconnected, so subscribers are reset on every
+        failure (entries cached in between live at most until the next retry)
+        and again once subscribed.
+        
+        Args:
+            state: One of CONNECTING, SUBSCRIBED or DISCONNECTED
+        """
+        cls._state = state
+        if state == cls.DISCONNECTED:
+            cls._stats['disconnects'] += 1
+        if state not in (cls.SUBSCRIBED, cls.DISCONNECTED):
+            return
+        
+        cls._stats['resets'] += 1
+        for reset in cls._reset_handlers:
+            try:
+                reset()
+            except Exception as e:
+                cls._stats['handler_errors'] += 1
+                logger.error(f"Change feed reset {reset} failed: {e}")
+    
+    @classmethod
+    def publish(cls, event: ChangeEvent):
+        """
+        Deliver an event to all handlers.
+        
+        Args:
+            event: Change event
+        """
+        cls._stats['events'] += 1
+        for handler in cls._handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                cls._stats['handler_errors'] += 1
+                logger.error(f"Change feed handler {handler} failed: {e}")
+    
+    @classmethod
+    def ensure_started(cls, config) -> Optional[object]:
+        """
+        Start the configured change source once per process.
+        
+        Safe to call on every request: after a fork (e.g. gunicorn --preload)
+        the process id changes and the worker starts its own subscription.
+        
+        Args:
+            config: App config with CHANGE_FEED, SUPABASE_URL and SUPABASE_REALTIME_KEY
+            
+        Returns:
+            The running source, or None when the change feed is disabled
+        """
+        if cls._pid == os.getpid():
+            return cls._source
+        
+        with cls._lock:
+            if cls._pid == os.getpid():
+                return cls._source
+            
+            mode = config['CHANGE_FEED']
+            if mode == 'supabase':
+                cls._source = SupabaseChangeSource(
+                    cls.publish, cls.set_state, config['SUPABASE_URL'], config['SUPABASE_REALTIME_KEY']
+                )
+            elif mode == 'local':
+                cls._source = LocalChangeSource(cls.publish, cls.set_state)
+            else:
+                cls._source = None
+            
+            if cls._source is not None:
+                cls._source.start()
+            cls._pid = os.getpid()
+            return cls._source
+    
+    @classmethod
+    def get_source(cls):
+        """Get the running change source, if any."""
+        return cls._source
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Get event counters and the connection state for this worker."""
+        return {**cls._stats, 'state': cls._state}
@@ -0,0 +1,323 @@
+"""
+Friend cache module.
+Per-user in-process cache of friends with a birthday (day-of-year) index.
+Kept fresh by local writes and by the change feed.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import threading
+import time
+import logging
+
+from app.models.friend import Friend
+from app.services.birthday_service import BirthdayService
+
+logger = logging.getLogger(__name__)
+
+
+class _UserEntry:
+    """Cached friends of one user, indexed by id and by birthday ordinal."""
+    
+    __slots__ = ('friends', 'by_doy', 'expires_at')
+    
+    def __init__(self, expires_at: float):
+        self.friends: Dict[str, Friend] = {}
+        self.by_doy: Dict[int, Set[str]] = {}
+        self.expires_at = expires_at
+    
+    def add(self, friend: Friend):
+        self.discard(friend.id)
+        self.friends[friend.id] = friend
+        doy = BirthdayService.birthday_ordinal(friend.date_of_birth.month, friend.date_of_birth.day)
+        self.by_doy.setdefault(doy, set()).add(friend.id)
+    
+    def discard(self, friend_id: str):
+        friend = self.friends.pop(friend_id, None)
+        if friend is None:
+            return
+        doy = BirthdayService.birthday_ordinal(friend.date_of_birth.month, friend.date_of_birth.day)
+        ids = self.by_doy.get(doy)
+        if ids:
+            ids.discard(friend_id)
+            if not ids:
+                del self.by_doy[doy]
+
+
+class FriendCache:
+    """In-process per-user friend cache."""
+    
+    # Configured from FRIEND_CACHE_* settings at startup
+    enabled = False
+    ttl_seconds = 3600
+    max_users = 10000
+    
+    _entries: 'OrderedDict[str, _UserEntry]' = OrderedDict()
+    _owners: Dict[str, str] = {}  # friend_id -> user_id, for delete events without user_id
+    _fills: Dict[str, List[int]] = {}  # user_id -> [changes seen, fills in progress], only while filling
+    _lock = threading.RLock()
+    _stats = {'hits': 0, 'misses': 0, 'changes_applied': 0}
+    
+    @classmethod
+    def configure(cls, enabled: bool, ttl_seconds: int, max_users: int):
+        """Apply cache settings."""
+        cls.enabled = enabled
+        cls.ttl_seconds = ttl_seconds
+        cls.max_users = max_users
+    
+    @classmethod
+    def _get_entry(cls, user_id: str) -> Optional[_UserEntry]:
+        """Get a live entry, dropping it if expired. Caller holds the lock."""
+        entry = cls._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            cls._drop(user_id)
+            return None
+        cls._entries.move_to_end(user_id)
+        return entry
+    
+    @classmethod
+    def _drop(cls, user_id: str):
+        """Remove a user's entry. Caller holds the lock."""
+        entry = cls._entries.pop(user_id, None)
+        if entry:
+            for friend_id in entry.friends:
+                cls._owners.pop(friend_id, None)
+    
+    @classmethod
+    def get_friends(cls, user_id: str) -> Optional[List[Friend]]:
+        """
+        Get all cached friends of a user.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            List of friends, or None on a cache miss
+        """
+        if not cls.enabled:
+            return None
+        
+        with cls._lock:
+            entry = cls._get_entry(user_id)
+            if entry is None:
+                cls._stats['misses'] += 1
+                return None
+            cls._stats['hits'] += 1
+            return list(entry.friends.values())
+    
+    @classmethod
+    def get_friends_in_window(cls, user_id: str, ranges: List[Tuple[int, int]]) -> Optional[List[Friend]]:
+        """
+        Get cached friends whose birthday ordinal falls in the given ranges.
+        
+        Args:
+            user_id: User ID
+            ranges: Inclusive (start, end) birth_doy ranges
+        
+        Returns:
+            List of friends, or None on a cache miss
+        """
+        if not cls.enabled:
+            return None
+        
+        with cls._lock:
+            entry = cls._get_entry(user_id)
+            if entry is None:
+                cls._stats['misses'] += 1
+                return None
+            cls._stats['hits'] += 1
+            
+            friends = []
+            for start, end in ranges:
+                for doy in range(start, end + 1):
+                    for friend_id in entry.by_doy.get(doy, ()):
+                        friends.append(entry.friends[friend_id])
+            return friends
+    
+    @classmethod
+    def get_friend(cls, friend_id: str, user_id: str) -> Optional[Friend]:
+        """
+        Get a cached friend.
+        
+        Args:
+            friend_id: Friend ID
+            user_id: User ID (for authorization check)
+        
+        Returns:
+            Friend, or None if the user's friends are not cached or it does not exist
+        """
+        if not cls.enabled:
+            return None
+        
+        with cls._lock:
+            entry = cls._get_entry(user_id)
+            return entry.friends.get(friend_id) if entry else None
+    
+    @classmethod
+    def is_cached(cls, user_id: str) -> bool:
+        """Check whether a user's full friend list is cached."""
+        if not cls.enabled:
+            return False
+        with cls._lock:
+            return cls._get_entry(user_id) is not None
+    
+    @classmethod
+    def begin_fill(cls, user_id: str) -> int:
+        """
+        Start tracking changes to a user's friends before reading them from the database.
+        
+        Every begin_fill must be paired with end_fill.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Version to pass to set_friends
+        """
+        with cls._lock:
+            fill = cls._fills.setdefault(user_id, [0, 0])
+            fill[1] += 1
+            return fill[0]
+    
+    @classmethod
+    def end_fill(cls, user_id: str):
+        """Stop tracking changes for a fill started with begin_fill."""
+        with cls._lock:
+            fill = cls._fills.get(user_id)
+            if fill is not None:
+                fill[1] -= 1
+                if fill[1] <= 0:
+                    del cls._fills[user_id]
+    
+    @classmethod
+    def _touch(cls, user_id: Optional[str]):
+        """Count a change against fills in progress. Caller holds the lock."""
+        if user_id is None:
+            # Owner unknown: any fill in progress may have read the old row
+            for fill in cls._fills.values():
+                fill[0] += 1
+        elif user_id in cls._fills:
+            cls._fills[user_id][0] += 1
+    
+    @classmethod
+    def set_friends(cls, user_id: str, friends: List[Friend], version: Optional[int] = None):
+        """
+        Cache a user's complete friend list.
+        
+        Args:
+            user_id: User ID
+            friends: All of the user's friends
+            version: begin_fill's version from before the list was read; the list
+                is not cached if a change was applied since, since it may predate it
+        """
+        if not cls.enabled:
+            return
+        
+        with cls._lock:
+            if version is not None and cls._fills.get(user_id, [0])[0] != version:
+                return
+            cls._drop(user_id)
+            entry = _UserEntry(time.monotonic() + cls.ttl_seconds)
+            for friend in friends:
+                entry.add(friend)
+                cls._owners[friend.id] = user_id
+            cls._entries[user_id] = entry
+            
+            while len(cls._entries) > cls.max_users:
+                cls._drop(next(iter(cls._entries)))
+    
+    @classmethod
+    def upsert(cls, friend: Friend):
+        """
+        Apply a created or updated friend to its user's entry, if cached.
+        
+        Args:
+            friend: Friend as stored in the database
+        """
+        if not cls.enabled:
+            return
+        
+        with cls._lock:
+            cls._touch(friend.user_id)
+            entry = cls._entries.get(friend.user_id)
+            if entry is not None:
+                entry.add(friend)
+                cls._owners[friend.id] = friend.user_id
+    
+    @classmethod
+    def remove(cls, friend_id: str, user_id: Optional[str] = None):
+        """
+        Remove a deleted friend from its user's entry, if cached.
+        
+        Args:
+            friend_id: Friend ID
+            user_id: User ID, looked up from cached entries when not given
+        """
+        if not cls.enabled:
+            return
+        
+        with cls._lock:
+            user_id = user_id or cls._owners.get(friend_id)
+            cls._touch(user_id)
+            entry = cls._entries.get(user_id) if user_id else None
+            if entry is not None:
+                entry.discard(friend_id)
+            cls._owners.pop(friend_id, None)
+    
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Drop a user's cached friends."""
+        with cls._lock:
+            cls._touch(user_id)
+            cls._drop(user_id)
+    
+    @classmethod
+    def apply_change(cls, event):
+        """
+        Apply a change feed event.
+        
+        Args:
+            event: ChangeEvent for the friends table
+        """
+        if not cls.enabled:
+            return
+        
+        try:
+            if event.type == 'DELETE':
+                old = event.old_record or {}
+                cls.remove(old.get('id'), old.get('user_id'))
+            else:
+                friend = Friend.from_row(event.record)
+                # A friend moved to another user must leave the old user's entry
+                previous_owner = cls._owners.get(friend.id)
+                if previous_owner and previous_owner != friend.user_id:
+                    cls.remove(friend.id, previous_owner)
+                cls.upsert(friend)
+            
+            with cls._lock:
+                cls._stats['changes_applied'] += 1
+        except Exception as e:
+            # An event we cannot apply leaves the entry unreliable; refetch it instead
+            logger.error(f"Failed to apply change event to friend cache: {e}")
+            user_id = (event.record or event.old_record or {}).get('user_id')
+            if user_id:
+                cls.invalidate(user_id)
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get cache counters for this worker.
+        
+        Returns:
+            Dictionary with hits, misses, changes_applied and cached users
+        """
+        with cls._lock:
+            return {**cls._stats, 'users': len(cls._entries)}
+    
+    @classmethod
+    def clear(cls):
+        """Drop all cached entries."""
+        with cls._lock:
+            cls._entries.clear()
+            cls._owners.clear()
@@ -0,0 +1,181 @@
+"""
+Health monitor module.
+Probes dependencies from a background thread and tracks in-flight requests,
+so liveness and readiness checks only read cached results.
+"""
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import time
+import logging
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Per-worker dependency probes and request saturation."""
+    
+    # Configured from HEALTH_* and WORKER_CAPACITY settings at startup
+    probe_interval = 15.0
+    worker_capacity = 0  # 0 = saturation not measured
+    max_saturation = 0.9
+    
+    _app = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+    _results: Dict[str, Dict] = {}
+    _in_flight = 0
+    _in_flight_lock = threading.Lock()
+    
+    @classmethod
+    def init_app(cls, app):
+        """
+        Configure the monitor and count in-flight requests.
+        
+        Args:
+            app: Flask application
+        """
+        cls._app = app
+        cls.probe_interval = app.config['HEALTH_PROBE_INTERVAL']
+        cls.worker_capacity = app.config['WORKER_CAPACITY']
+        cls.max_saturation = app.config['HEALTH_MAX_SATURATION']
+        
+        @app.before_request
+        def count_request():
+            # Health checks are excluded so probing a busy worker does not change the answer
+            if request.blueprint != 'health':
+                g.health_counted = True
+                with cls._in_flight_lock:
+                    cls._in_flight += 1
+        
+        @app.teardown_request
+        def uncount_request(error=None):
+            if g.pop('health_counted', False):
+                with cls._in_flight_lock:
+                    cls._in_flight -= 1
+    
+    @classmethod
+    def ensure_started(cls):
+        """
+        Start the probe thread once per process.
+        
+        Safe to call on every health check: after a fork each worker starts its own.
+        """
+        if cls._pid == os.getpid():
+            return
+        
+        with cls._lock:
+            if cls._pid == os.getpid():
+                return
+            cls._results = {}
+            cls._pid = os.getpid()
+            threading.Thread(target=cls._run, name='health-probes', daemon=True).start()
+    
+    @classmethod
+    def _run(cls):
+        """Refresh probe results every probe_interval seconds."""
+        with cls._app.app_context():
+            while True:
+                cls.refresh()
+                time.sleep(cls.probe_interval)
+    
+    @classmethod
+    def refresh(cls):
+        """Run every probe now and store the results. Needs an app context."""
+        results = {name: cls._timed(probe) for name, probe in cls._probes().items()}
+        with cls._lock:
+            cls._results = results
+    
+    @staticmethod
+    def _probes():
+        """Probe name -> callable raising on failure."""
+        from app.services.job_queue import JobQueue
+        from app.services.supabase_service import SupabaseService
+        
+        return {
+            'supabase': lambda: SupabaseService.get_client().table('friends').select('id').limit(1).execute(),
+            'job_queue': JobQueue.get_stats
+        }
+    
+    @staticmethod
+    def _timed(probe) -> Dict:
+        """Run one probe, recording success, latency and the error if any."""
+        started = time.monotonic()
+        result = {'ok': True, 'error': None}
+        try:
+            detail = probe()
+            if isinstance(detail, dict):
+                result['detail'] = detail
+        except Exception as e:
+            result = {'ok': False, 'error': f'{type(e).__name__}: {e}'}
+        result['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+        result['checked_at'] = time.time()
+        return result
+    
+    @classmethod
+    def get_saturation(cls) -> Dict:
+        """
+        Get this worker's in-flight request load.
+        
+        Returns:
+            Dictionary with in_flight, capacity, saturation (0-1, None when
+            capacity is 0) and queued AI generations
+        """
+        from app.services.ai_service import AIService
+        
+        in_flight = cls._in_flight
+        return {
+            'in_flight': in_flight,
+            'capacity': cls.worker_capacity,
+            'saturation': round(min(1.0, in_flight / cls.worker_capacity), 3) if cls.worker_capacity else None,
+            'ai_queued': AIService.get_queued_generations()
+        }
+    
+    @classmethod
+    def get_readiness(cls) -> Tuple[str, List[str], Dict]:
+        """
+        Decide readiness from cached probe results.
+        
+        Not ready when Supabase is unreachable, its last probe is stale or
+        the worker is saturated. Degraded (still ready) when every model's
+        circuit is open or the job queue is unavailable, since requests
+        still succeed with fallbacks or synchronously.
+        
+        Returns:
+            Tuple of (status, reasons, checks) where status is 'ready', 'degraded',
+            'not_ready' or 'starting'
+        """
+        from app.services.ai_service import AIService
+        
+        with cls._lock:
+            results = {name: dict(result) for name, result in cls._results.items()}
+        
+        saturation = cls.get_saturation()
+        circuit = AIService.get_circuit_state()
+        checks = {**results, 'gemini': circuit, 'worker': saturation}
+        
+        if 'supabase' not in results:
+            return 'starting', ['probes have not run yet'], checks
+        
+        now = time.time()
+        for result in results.values():
+            result['age_seconds'] = round(now - result['checked_at'], 1)
+        
+        reasons = []
+        supabase = results['supabase']
+        if not supabase['ok']:
+            reasons.append('supabase unreachable')
+        elif supabase['age_seconds'] > cls.probe_interval * 3:
+            reasons.append('supabase probe is stale')
+        if saturation['saturation'] is not None and saturation['saturation'] >= cls.max_saturation:
+            reasons.append('worker saturated')
+        if reasons:
+            return 'not_ready', reasons, checks
+        
+        if circuit['state'] != 'closed':
+            reasons.append('model circuits open')
+        if not results.get('job_queue', {}).get('ok', True):
+            reasons.append('job queue unavailable')
+        return ('degraded' if reasons else 'ready'), reasons, checks
@@ -0,0 +1,125 @@
+"""
+Idempotency store module.
+Short-lived per-worker record of responses to requests sent with an
+Idempotency-Key, so retries replay the original response.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+def request_fingerprint(data: Any) -> str:
+    """Hash a JSON request body so a reused key with a different body can be detected."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class _Record:
+    """State of one idempotency key."""
+    
+    __slots__ = ('fingerprint', 'response', 'expires_at')
+    
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.response: Optional[Tuple[Any, int]] = None  # None while the first request is in progress
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """In-process idempotency key store (per worker; the database catches cross-worker retries)."""
+    
+    NEW = 'new'
+    REPLAY = 'replay'
+    IN_PROGRESS = 'in_progress'
+    MISMATCH = 'mismatch'
+    
+    # Configured from IDEMPOTENCY_* settings at startup
+    ttl_seconds = 3600
+    max_keys = 100000
+    
+    # Keys whose request never finished (e.g. the worker was killed) free up after this long
+    PENDING_TIMEOUT = 60
+    
+    _records: 'OrderedDict[Tuple[str, str], _Record]' = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {'replays': 0, 'conflicts': 0, 'mismatches': 0}
+    
+    @classmethod
+    def configure(cls, ttl_seconds: int, max_keys: int):
+        """Apply store settings."""
+        cls.ttl_seconds = ttl_seconds
+        cls.max_keys = max_keys
+    
+    @classmethod
+    def begin(cls, user_id: str, key: str, fingerprint: str) -> Tuple[str, Optional[Tuple[Any, int]]]:
+        """
+        Claim a key for a request, or find the response it already produced.
+        
+        Args:
+            user_id: Requesting user
+            key: Idempotency-Key header
+            fingerprint: request_fingerprint of the body
+        
+        Returns:
+            Tuple of (state, stored response) where state is NEW (proceed, then
+            complete or release), REPLAY (stored (body, status) returned),
+            IN_PROGRESS or MISMATCH (key reused with a different body)
+        """
+        now = time.monotonic()
+        
+        with cls._lock:
+            record = cls._records.get((user_id, key))
+            if record is not None and record.expires_at <= now:
+                del cls._records[(user_id, key)]
+                record = None
+            
+            if record is None:
+                cls._records[(user_id, key)] = _Record(fingerprint, now + cls.PENDING_TIMEOUT)
+                while len(cls._records) > cls.max_keys:
+                    cls._records.popitem(last=False)
+                return cls.NEW, None
+            
+            if record.fingerprint != fingerprint:
+                cls._stats['mismatches'] += 1
+                return cls.MISMATCH, None
+            if record.response is None:
+                cls._stats['conflicts'] += 1
+                return cls.IN_PROGRESS, None
+            
+            cls._stats['replays'] += 1
+            return cls.REPLAY, record.response
+    
+    @classmethod
+    def complete(cls, user_id: str, key: str, body: Any, status_code: int):
+        """Store the response of a request claimed with begin."""
+        with cls._lock:
+            record = cls._records.get((user_id, key))
+            if record is not None:
+                record.response = (body, status_code)
+                record.expires_at = time.monotonic() + cls.ttl_seconds
+                cls._records.move_to_end((user_id, key))
+    
+    @classmethod
+    def release(cls, user_id: str, key: str):
+        """Forget a key whose request failed, so the client can retry it."""
+        with cls._lock:
+            record = cls._records.get((user_id, key))
+            if record is not None and record.response is None:
+                del cls._records[(user_id, key)]
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get store counters for this worker.
+        
+        Returns:
+            Dictionary with replays, conflicts, mismatches and stored keys
+        """
+        with cls._lock:
+            return {**cls._stats, 'keys': len(cls._records)}
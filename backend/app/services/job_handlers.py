@@ -0,0 +1,75 @@
+"""
+Job handlers module.
+Work run by job worker processes; each handler takes a claimed job and
+returns a JSON-serializable result.
+"""
+from datetime import date
+from typing import Callable, Dict
+import logging
+
+from app.services.ai_service import AIService
+from app.services.birthday_service import BirthdayService
+from app.services.job_queue import PermanentJobError
+from app.services.supabase_service import SupabaseService
+
+logger = logging.getLogger(__name__)
+
+
+def generate_suggestions(job: Dict) -> Dict:
+    """
+    Generate AI suggestions for a friend.
+    
+    Gemini errors are retried; static fallback suggestions are only used on
+    the last attempt.
+    
+    Payload:
+        friend_id: Friend UUID
+        suggestion_type: 'gifts', 'events' or 'both'
+        today: ISO date of the request in the user's timezone
+    
+    Returns:
+        Same body as the synchronous suggestions endpoint
+    """
+    payload = job['payload']
+    friend = SupabaseService.get_friend_by_id(payload['friend_id'], job['user_id'])
+    if not friend:
+        raise PermanentJobError('Friend not found')
+    
+    enriched = BirthdayService.enrich_friend(friend, date.fromisoformat(payload['today']))
+    last_attempt = job['attempts'] >= job['max_attempts']
+    
+    return AIService.suggest_for_friend(enriched, payload['suggestion_type'], job['user_id'],
+                                        use_fallback=last_attempt)
+
+
+def import_friends(job: Dict) -> Dict:
+    """
+    Create a validated batch of friends.
+    
+    Rows are keyed by job ID and position, so a retry, or a second worker
+    running a job re-claimed after JOB_TIMEOUT, never inserts them twice.
+    
+    Payload:
+        friends: Friend data with date_of_birth as YYYY-MM-DD
+        today: ISO date of the request in the user's timezone
+    
+    Returns:
+        Same body as the synchronous bulk create endpoint
+    """
+    payload = job['payload']
+    today = date.fromisoformat(payload['today'])
+    created_friends = SupabaseService.create_friends_idempotent(
+        job['user_id'], payload['friends'], f"job:{job['id']}:"
+    )
+    
+    return {
+        'friends': [BirthdayService.enrich_friend(friend, today).to_dict() for friend in created_friends],
+        'count': len(created_friends)
+    }
+
+
+# Job type -> handler
+JOB_HANDLERS: Dict[str, Callable[[Dict], Dict]] = {
+    'suggestions': generate_suggestions,
+    'import_friends': import_friends
+}
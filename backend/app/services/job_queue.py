@@ -0,0 +1,318 @@
+"""
+Job queue module.
+Durable SQLite-backed queue for work that runs outside the request path,
+with retries, exponential backoff and per-user idempotency keys.
+"""
+from app.services.idempotency_store import IdempotencyKeyReused
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentJobError(Exception):
+    """Raised by job handlers for failures that retrying cannot fix."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    idempotency_key TEXT,
+    fingerprint TEXT,
+    run_at REAL NOT NULL,
+    locked_by TEXT,
+    locked_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_idempotency ON jobs (user_id, idempotency_key);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at);
+"""
+
+
+class JobQueue:
+    """SQLite job queue shared by API workers and job worker processes."""
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    
+    # Configured from JOB_* settings at startup
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'instance', 'jobs.sqlite3')
+    max_attempts = 3
+    retry_backoff = 5.0  # seconds before the first retry, doubled per attempt
+    job_timeout = 300  # running jobs not finished after this long are requeued
+    result_ttl = 24 * 3600  # finished jobs are purged after this long
+    
+    # One connection per thread and process; sqlite connections must not cross either
+    _local = threading.local()
+    
+    @classmethod
+    def configure(cls, path: str, max_attempts: int, retry_backoff: float, job_timeout: int, result_ttl: int):
+        """Apply queue settings."""
+        cls.path = path
+        cls.max_attempts = max_attempts
+        cls.retry_backoff = retry_backoff
+        cls.job_timeout = job_timeout
+        cls.result_ttl = result_ttl
+    
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        """Get this thread's connection, creating the database on first use."""
+        conn = getattr(cls._local, 'conn', None)
+        if conn is not None and cls._local.pid == os.getpid() and cls._local.path == cls.path:
+            return conn
+        
+        os.makedirs(os.path.dirname(cls.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(cls.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL lets API workers read job status while a worker process writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(_SCHEMA)
+        # Databases created before fingerprints were stored
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+        if 'fingerprint' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN fingerprint TEXT')
+        
+        cls._local.conn = conn
+        cls._local.pid = os.getpid()
+        cls._local.path = cls.path
+        return conn
+    
+    @classmethod
+    def enqueue(cls, job_type: str, user_id: str, payload: Dict[str, Any],
+                idempotency_key: Optional[str] = None, fingerprint: Optional[str] = None) -> Dict:
+        """
+        Add a job to the queue.
+        
+        Args:
+            job_type: Handler name (see job_handlers.JOB_HANDLERS)
+            user_id: Owner of the job
+            payload: JSON-serializable handler arguments
+            idempotency_key: Optional client key; reusing it returns the existing job
+            fingerprint: Hash of the request that created the job; a reused key
+                must come with the same job type and fingerprint
+        
+        Returns:
+            Job dictionary
+        
+        Raises:
+            IdempotencyKeyReused: If the key belongs to a different job type or request
+        """
+        conn = cls._connect()
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        
+        try:
+            conn.execute(
+                'INSERT INTO jobs (id, type, user_id, payload, status, max_attempts, idempotency_key, '
+                'fingerprint, run_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, job_type, user_id, json.dumps(payload), cls.QUEUED, cls.max_attempts,
+                 idempotency_key, fingerprint, now, now, now)
+            )
+        except sqlite3.IntegrityError:
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE user_id = ? AND idempotency_key = ?',
+                (user_id, idempotency_key)
+            ).fetchone()
+            # Jobs queued before fingerprints were stored are matched by type only
+            if row['type'] != job_type or row['fingerprint'] not in (None, fingerprint):
+                raise IdempotencyKeyReused(f"Idempotency key belongs to job {row['id']}")
+            logger.info(f"Reusing job {row['id']} for idempotency key")
+            return cls._to_dict(row)
+        
+        return cls.get(job_id, user_id)
+    
+    @classmethod
+    def get(cls, job_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get a job.
+        
+        Args:
+            job_id: Job ID
+            user_id: Owner to check (any owner when None)
+        
+        Returns:
+            Job dictionary, or None if not found
+        """
+        row = cls._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None or (user_id is not None and row['user_id'] != user_id):
+            return None
+        return cls._to_dict(row)
+    
+    @classmethod
+    def claim(cls, worker_id: str) -> Optional[Dict]:
+        """
+        Take the next due job and mark it running.
+        
+        Jobs left running past job_timeout (e.g. by a crashed worker) are
+        claimed again.
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+        
+        Returns:
+            Job dictionary including user_id and payload, or None if nothing is due
+        """
+        conn = cls._connect()
+        now = time.time()
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT * FROM jobs WHERE (status = ? AND run_at <= ?) OR (status = ? AND locked_at < ?) '
+                'ORDER BY run_at LIMIT 1',
+                (cls.QUEUED, now, cls.RUNNING, now - cls.job_timeout)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, locked_by = ?, locked_at = ?, '
+                'updated_at = ? WHERE id = ?',
+                (cls.RUNNING, worker_id, now, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        job = cls._to_dict(row)
+        job.update(status=cls.RUNNING, attempts=row['attempts'] + 1, locked_by=worker_id,
+                   user_id=row['user_id'], payload=json.loads(row['payload']))
+        return job
+    
+    @classmethod
+    def _owned(cls, job: Dict) -> Tuple[str, Tuple]:
+        """
+        WHERE clause matching a job only while this claim still holds it.
+        
+        A job re-claimed after job_timeout has a new attempt number, so the
+        earlier claim can no longer finish it.
+        """
+        return 'id = ? AND status = ? AND locked_by = ? AND attempts = ?', (
+            job['id'], cls.RUNNING, job['locked_by'], job['attempts']
+        )
+    
+    @classmethod
+    def complete(cls, job: Dict, result: Any) -> bool:
+        """
+        Mark a job succeeded with its result.
+        
+        Args:
+            job: Job dictionary returned by claim
+            result: JSON-serializable result
+        
+        Returns:
+            False if the claim was lost (the job was re-claimed) and nothing changed
+        """
+        where, params = cls._owned(job)
+        cursor = cls._connect().execute(
+            f'UPDATE jobs SET status = ?, result = ?, error = NULL, locked_by = NULL, updated_at = ? WHERE {where}',
+            (cls.SUCCEEDED, json.dumps(result), time.time(), *params)
+        )
+        return cls._check_owned(job, cursor)
+    
+    @staticmethod
+    def _check_owned(job: Dict, cursor: sqlite3.Cursor) -> bool:
+        """Log and report an update that matched no row because the claim was lost."""
+        if cursor.rowcount == 0:
+            logger.warning(f"Job {job['id']} attempt {job['attempts']} lost its claim; result discarded")
+            return False
+        return True
+    
+    @classmethod
+    def fail(cls, job: Dict, error: str, permanent: bool = False) -> bool:
+        """
+        Record a failed attempt, scheduling a retry with exponential backoff.
+        
+        Args:
+            job: Job dictionary returned by claim
+            error: Error message
+            permanent: Skip remaining retries
+        
+        Returns:
+            False if the claim was lost (the job was re-claimed) and nothing changed
+        """
+        now = time.time()
+        conn = cls._connect()
+        where, params = cls._owned(job)
+        
+        if permanent or job['attempts'] >= job['max_attempts']:
+            cursor = conn.execute(
+                f'UPDATE jobs SET status = ?, error = ?, locked_by = NULL, updated_at = ? WHERE {where}',
+                (cls.FAILED, error, now, *params)
+            )
+            return cls._check_owned(job, cursor)
+        
+        # Jitter spreads retries of jobs that failed together
+        delay = cls.retry_backoff * 2 ** (job['attempts'] - 1) * random.uniform(0.8, 1.2)
+        cursor = conn.execute(
+            f'UPDATE jobs SET status = ?, error = ?, run_at = ?, locked_by = NULL, updated_at = ? WHERE {where}',
+            (cls.QUEUED, error, now + delay, now, *params)
+        )
+        return cls._check_owned(job, cursor)
+    
+    @classmethod
+    def purge(cls) -> int:
+        """
+        Delete finished jobs older than result_ttl.
+        
+        Returns:
+            Number of jobs deleted
+        """
+        cursor = cls._connect().execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+            (cls.SUCCEEDED, cls.FAILED, time.time() - cls.result_ttl)
+        )
+        return cursor.rowcount
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get the number of jobs in each status.
+        
+        Returns:
+            Dictionary keyed by status
+        """
+        stats = {status: 0 for status in (cls.QUEUED, cls.RUNNING, cls.SUCCEEDED, cls.FAILED)}
+        for row in cls._connect().execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status'):
+            stats[row['status']] = row['count']
+        return stats
+    
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """Convert a job row to its API representation."""
+        def timestamp(value):
+            return datetime.fromtimestamp(value, timezone.utc).isoformat().replace('+00:00', 'Z')
+        
+        return {
+            'id': row['id'],
+            'type': row['type'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'max_attempts': row['max_attempts'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': timestamp(row['created_at']),
+            'updated_at': timestamp(row['updated_at'])
+        }
@@ -0,0 +1,95 @@
+"""
+Job worker module.
+Runs queued jobs in a pool of worker processes, separate from the API workers.
+"""
+from multiprocessing import Process
+from typing import List
+import os
+import signal
+import socket
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds between purges of old finished jobs
+PURGE_INTERVAL = 3600
+
+
+def run_worker(poll_interval: float):
+    """
+    Claim and run jobs until SIGTERM or SIGINT.
+    
+    Args:
+        poll_interval: Seconds to sleep when no job is due
+    """
+    from app import create_app
+    from app.services.job_handlers import JOB_HANDLERS
+    from app.services.job_queue import JobQueue, PermanentJobError
+    
+    stopping = False
+    
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    app = create_app()
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    next_purge = 0.0
+    logger.info(f"Job worker {worker_id} started")
+    
+    with app.app_context():
+        while not stopping:
+            if time.monotonic() >= next_purge:
+                JobQueue.purge()
+                next_purge = time.monotonic() + PURGE_INTERVAL
+            
+            job = JobQueue.claim(worker_id)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            
+            handler = JOB_HANDLERS.get(job['type'])
+            if handler is None:
+                JobQueue.fail(job, f"Unknown job type: {job['type']}", permanent=True)
+                continue
+            
+            try:
+                JobQueue.complete(job, handler(job))
+            except PermanentJobError as e:
+                JobQueue.fail(job, str(e), permanent=True)
+            except Exception as e:
+                logger.error(f"Job {job['id']} ({job['type']}) attempt {job['attempts']} failed: {e}")
+                JobQueue.fail(job, str(e))
+    
+    logger.info(f"Job worker {worker_id} stopped")
+
+
+def run_pool(processes: int, poll_interval: float):
+    """
+    Start worker processes and wait for them, forwarding SIGTERM/SIGINT.
+    
+    Args:
+        processes: Number of worker processes
+        poll_interval: Seconds each worker sleeps when no job is due
+    """
+    workers: List[Process] = [
+        Process(target=run_worker, args=(poll_interval,), name=f'job-worker-{i}')
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    
+    def stop(signum, frame):
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    for worker in workers:
+        worker.join()
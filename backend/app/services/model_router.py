@@ -0,0 +1,346 @@
+"""
+Model router module.
+Holds the configured suggestion models and picks one per call by measured
+latency, error rate and cost, falling back to the next model when a call
+fails or its circuit is open.
+"""
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import threading
+import time
+import logging
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Model name served by StubModel instead of Gemini
+STUB_MODEL = 'stub'
+
+# Weight of the newest call in the latency and error rate averages
+EWMA_ALPHA = 0.3
+
+# Floor for the success rate when estimating time to a good response
+MIN_SUCCESS_RATE = 0.05
+
+BUDGET_WINDOW = 3600  # seconds
+
+
+def parse_models(spec: str) -> List[Tuple[str, float]]:
+    """
+    Parse the AI_MODELS setting.
+    
+    Args:
+        spec: Comma-separated "name[:cost]" entries, cost in USD per million tokens
+    
+    Returns:
+        List of (model name, cost) in configured order
+    
+    Raises:
+        ValueError: If a cost is not a non-negative number or no model is given
+    """
+    models = []
+    for entry in spec.split(','):
+        name, _, cost = entry.strip().partition(':')
+        if not name:
+            continue
+        cost = float(cost) if cost else 0.0
+        if cost < 0:
+            raise ValueError(f'negative cost for model {name}')
+        models.append((name, cost))
+    if not models:
+        raise ValueError('AI_MODELS lists no models')
+    return models
+
+
+class StubModel:
+    """Local deterministic model: fixed, well-formed suggestions without network calls."""
+    
+    def generate_content(self, prompt: str):
+        if 'planning_tips' in prompt:
+            items = [
+                {
+                    'title': f'Celebration idea {i}',
+                    'description': 'A small get-together with close friends',
+                    'planning_tips': 'Pick a date early and invite people a week ahead',
+                    'estimated_budget': '$20-$50'
+                }
+                for i in range(1, 6)
+            ]
+        else:
+            items = [
+                {
+                    'title': f'Gift idea {i}',
+                    'description': 'Something thoughtful for their birthday',
+                    'reasoning': 'A safe choice for any age',
+                    'estimated_price_range': '$20-$50'
+                }
+                for i in range(1, 6)
+            ]
+        return SimpleNamespace(text=json.dumps(items))
+
+
+class ModelRoute:
+    """One configured model with its circuit breaker and measured performance."""
+    
+    def __init__(self, name: str, cost: float, failure_threshold: int, reset_timeout: float, model: Any = None):
+        """
+        Args:
+            name: Gemini model name, or STUB_MODEL
+            cost: USD per million prompt and response tokens
+            failure_threshold: Consecutive failures that open the model's circuit
+            reset_timeout: Seconds before a trial call is allowed again
+            model: Model instance; created by ModelRouter.init_models when None
+        """
+        self.name = name
+        self.cost = 0.0 if name == STUB_MODEL else cost
+        self.model = model
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency: Optional[float] = None  # moving average, seconds
+        self.error_rate = 0.0                 # moving average, 0-1
+        self.last_attempt = 0.0
+        self.stats = {'calls': 0, 'failures': 0, 'tokens': 0, 'cost': 0.0}
+    
+    def expected_seconds(self) -> float:
+        """Expected time to a good response, counting retries after failures."""
+        return (self.latency or 0.0) / max(1.0 - self.error_rate, MIN_SUCCESS_RATE)
+
+
+class ModelRouter:
+    """Per-worker routing of suggestion calls across the configured models."""
+    
+    # Configured from AI_* and GEMINI_CIRCUIT_* settings at startup
+    routes: List[ModelRoute] = [ModelRoute('gemini-pro', 0.0, 5, 30)]
+    cost_budget = 0.0
+    probe_interval = 60.0
+    failure_threshold = 5
+    reset_timeout = 30.0
+    
+    _lock = threading.Lock()
+    _init_lock = threading.Lock()
+    _window_start = 0.0
+    _window_cost = 0.0
+    
+    @classmethod
+    def configure(cls, models: List[Tuple[str, float]], cost_budget: float, probe_interval: float,
+                  failure_threshold: int, reset_timeout: float):
+        """
+        Replace the routes with the configured models.
+        
+        Args:
+            models: (name, cost) pairs from parse_models; the order breaks ties
+            cost_budget: USD per hour this worker may spend before preferring cheaper models (0 = no limit)
+            probe_interval: Seconds after which an unused model gets one call to re-measure it (0 = never)
+            failure_threshold: Consecutive failures that open a model's circuit
+            reset_timeout: Seconds before a trial call is allowed again
+        """
+        with cls._lock:
+            cls.cost_budget = cost_budget
+            cls.probe_interval = probe_interval
+            cls.failure_threshold = failure_threshold
+            cls.reset_timeout = reset_timeout
+            cls.routes = [ModelRoute(name, cost, failure_threshold, reset_timeout) for name, cost in models]
+            cls._window_start = cls._window_cost = 0.0
+    
+    @classmethod
+    def set_models(cls, models: Dict[str, Any]):
+        """
+        Route to the given model instances instead of the configured models.
+        
+        Args:
+            models: Model name -> object with generate_content(prompt), e.g. a fake in benchmarks
+        """
+        with cls._lock:
+            cls.routes = [
+                ModelRoute(name, 0.0, cls.failure_threshold, cls.reset_timeout, model)
+                for name, model in models.items()
+            ]
+    
+    @classmethod
+    def is_initialized(cls) -> bool:
+        """Whether every route has a model instance."""
+        return all(route.model is not None for route in cls.routes)
+    
+    @classmethod
+    def init_models(cls, api_key: str):
+        """
+        Create the model instances for routes that have none.
+        
+        Args:
+            api_key: Gemini API key
+        """
+        with cls._init_lock:
+            gemini = None
+            for route in cls.routes:
+                if route.model is not None:
+                    continue
+                if route.name == STUB_MODEL:
+                    route.model = StubModel()
+                    continue
+                if gemini is None:
+                    # Imported here: the SDK takes most of the app's cold-start time
+                    import google.generativeai as genai
+                    genai.configure(api_key=api_key)
+                    gemini = genai
+                route.model = gemini.GenerativeModel(route.name)
+    
+    @classmethod
+    def generate(cls, prompt: str, handle: Callable[[Any, ModelRoute], Any]) -> Any:
+        """
+        Send a prompt to the best available model, falling back to the others.
+        
+        Args:
+            prompt: Prompt text
+            handle: Turns a model response into the result; raising counts as a
+                failed call and moves on to the next model
+        
+        Returns:
+            Result of handle for the first model that answered usefully
+        
+        Raises:
+            CircuitOpenError: If every model's circuit is open
+            Exception: The last model's error when every attempted model failed
+        """
+        last_error = None
+        for route in cls._rank():
+            if not route.breaker.allow():
+                continue
+            
+            started = time.monotonic()
+            try:
+                response = route.model.generate_content(prompt)
+            except Exception as e:
+                route.breaker.record_failure()
+                cls._observe(route, time.monotonic() - started, False)
+                logger.warning(f"Model {route.name} failed: {e}")
+                last_error = e
+                continue
+            route.breaker.record_success()
+            elapsed = time.monotonic() - started
+            
+            try:
+                result = handle(response, route)
+            except Exception as e:
+                # Unusable output: try another model, but the service itself is up
+                cls._observe(route, elapsed, False)
+                last_error = e
+                continue
+            cls._observe(route, elapsed, True)
+            return result
+        
+        raise last_error or CircuitOpenError('every model circuit is open')
+    
+    @classmethod
+    def _rank(cls) -> List[ModelRoute]:
+        """
+        Order the routes for one call.
+        
+        Models not measured yet come first, then by expected time to a good
+        response; over budget, cheaper models come first. A model unused for
+        probe_interval is tried first once so a recovered model can win back
+        traffic. The stub model is never ranked against real models: its fixed
+        answers are always fast, so it only comes last, as a last resort.
+        """
+        now = time.monotonic()
+        with cls._lock:
+            over_budget = cls._over_budget(now)
+            order = {id(route): index for index, route in enumerate(cls.routes)}
+            ranked = sorted(cls.routes, key=lambda route: (
+                route.name == STUB_MODEL,
+                route.cost if over_budget else 0.0,
+                route.latency is not None,
+                route.expected_seconds(),
+                order[id(route)]
+            ))
+            
+            if cls.probe_interval > 0 and not over_budget:
+                for route in ranked[1:]:
+                    if route.name == STUB_MODEL:
+                        break
+                    if route.latency is not None and now - route.last_attempt >= cls.probe_interval:
+                        route.last_attempt = now  # one probe per interval, not one per request
+                        ranked.remove(route)
+                        ranked.insert(0, route)
+                        break
+            return ranked
+    
+    @classmethod
+    def _observe(cls, route: ModelRoute, elapsed: float, ok: bool):
+        """Fold one call into a route's moving averages."""
+        with cls._lock:
+            route.last_attempt = time.monotonic()
+            route.stats['calls'] += 1
+            if not ok:
+                route.stats['failures'] += 1
+            if route.latency is None:
+                route.latency = elapsed
+                route.error_rate = 0.0 if ok else 1.0
+            else:
+                route.latency += EWMA_ALPHA * (elapsed - route.latency)
+                route.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - route.error_rate)
+    
+    @classmethod
+    def record_tokens(cls, route: ModelRoute, tokens: int):
+        """
+        Charge a call's prompt and response tokens to its model and the hourly budget.
+        
+        Args:
+            route: Route that served the call
+            tokens: Prompt plus response tokens
+        """
+        cost = tokens * route.cost / 1_000_000
+        with cls._lock:
+            route.stats['tokens'] += tokens
+            route.stats['cost'] += cost
+            cls._over_budget(time.monotonic())
+            cls._window_cost += cost
+    
+    @classmethod
+    def _over_budget(cls, now: float) -> bool:
+        """Whether this hour's spend reached the budget. Caller holds the lock."""
+        if now - cls._window_start >= BUDGET_WINDOW:
+            cls._window_start = now
+            cls._window_cost = 0.0
+        return cls.cost_budget > 0 and cls._window_cost >= cls.cost_budget
+    
+    @classmethod
+    def get_circuit_state(cls) -> Dict:
+        """
+        Get the circuit state of the healthiest model.
+        
+        Returns:
+            Dictionary with state, consecutive_failures and retry_in_seconds of
+            the model closest to closed, plus each model's state under models
+        """
+        rank = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        states = {route.name: route.breaker.get_state() for route in cls.routes}
+        best = min(states.values(), key=lambda state: (rank[state['state']], state['retry_in_seconds']))
+        return {**best, 'models': {name: state['state'] for name, state in states.items()}}
+    
+    @classmethod
+    def get_stats(cls) -> Dict:
+        """
+        Get routing counters for this worker.
+        
+        Returns:
+            Dictionary with the hourly budget, this hour's spend, whether it is
+            exceeded, and per model calls, failures, tokens, cost, average
+            latency and error rate
+        """
+        with cls._lock:
+            over_budget = cls._over_budget(time.monotonic())
+            return {
+                'cost_budget': cls.cost_budget,
+                'cost_this_hour': round(cls._window_cost, 6),
+                'over_budget': over_budget,
+                'models': {
+                    route.name: {
+                        **route.stats,
+                        'cost': round(route.stats['cost'], 6),
+                        'latency_ms': round(route.latency * 1000, 1) if route.latency is not None else None,
+                        'error_rate': round(route.error_rate, 3)
+                    }
+                    for route in cls.routes
+                }
+            }
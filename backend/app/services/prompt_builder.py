@@ -0,0 +1,194 @@
+"""
+Prompt builder module.
+Precompiled Gemini prompt templates with a local token estimate and a
+token budget for free-text notes.
+"""
+from math import ceil
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Word runs and single punctuation marks, roughly how SentencePiece splits English
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r'(?<=[.!?;\n])\s+')
+
+# Average characters per token for words longer than one token
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARK = '...'
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text without calling the API.
+    
+    Args:
+        text: Text to count
+    
+    Returns:
+        Estimated token count
+    """
+    return sum(ceil(len(piece) / CHARS_PER_TOKEN) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> Tuple[str, bool]:
+    """
+    Shorten text to fit a token budget.
+    
+    Whole sentences are kept while they fit; a first sentence that is already
+    over budget is cut at a word boundary.
+    
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget
+    
+    Returns:
+        Tuple of (text, whether it was shortened)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text, False
+    
+    budget = max_tokens - count_tokens(TRUNCATION_MARK)
+    kept: List[str] = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        tokens = count_tokens(sentence)
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    
+    if not kept:
+        words = []
+        for word in text.split():
+            tokens = count_tokens(word)
+            if used + tokens > budget:
+                break
+            words.append(word)
+            used += tokens
+        # Text without usable word breaks is cut by characters
+        kept = [' '.join(words) or text[:budget * CHARS_PER_TOKEN]]
+    
+    return ' '.join(kept).rstrip() + TRUNCATION_MARK, True
+
+
+class PromptTemplate:
+    """A str.format template parsed once, with the token count of its fixed text."""
+    
+    def __init__(self, template: str):
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        ]
+        self.static_tokens = count_tokens(''.join(literal for literal, _ in self.parts))
+    
+    def render(self, values: Dict[str, str]) -> Tuple[str, int]:
+        """
+        Fill in the template.
+        
+        Args:
+            values: Field name to text mapping
+        
+        Returns:
+            Tuple of (prompt, estimated prompt tokens)
+        """
+        pieces = []
+        tokens = self.static_tokens
+        for literal, field in self.parts:
+            pieces.append(literal)
+            if field is not None:
+                value = values[field]
+                pieces.append(value)
+                tokens += count_tokens(value)
+        return ''.join(pieces), tokens
+
+
+GIFT_TEMPLATE = PromptTemplate("""You are a thoughtful gift recommendation assistant. Based on the following information about a friend, suggest 5 personalized gift ideas for their upcoming birthday.
+
+Friend Details:
+- Name: {name}
+- Age: {age} (turning {next_age})
+- Relationship Context: {notes}
+
+Requirements:
+1. Suggest gifts appropriate for their age and interests
+2. Include a mix of price ranges (budget-friendly to premium)
+3. Provide brief reasoning for each suggestion
+4. Format as JSON array with fields: title, description, reasoning, estimated_price_range
+
+Output ONLY valid JSON in this exact format:
+[
+  {{
+    "title": "Gift name",
+    "description": "Brief description",
+    "reasoning": "Why this gift fits",
+    "estimated_price_range": "$X-$Y"
+  }}
+]""")
+
+EVENT_TEMPLATE = PromptTemplate("""You are a creative event planning assistant. Based on the following information about a friend, suggest 5 small celebration or surprise ideas for their upcoming birthday.
+
+Friend Details:
+- Name: {name}
+- Age: {age} (turning {next_age})
+- Relationship Context: {notes}
+
+Requirements:
+1. Suggest events ranging from intimate to small group activities
+2. Include both in-person and virtual options
+3. Consider age-appropriate activities
+4. Provide brief planning tips for each
+5. Format as JSON array with fields: title, description, planning_tips, estimated_budget
+
+Output ONLY valid JSON in this exact format:
+[
+  {{
+    "title": "Event name",
+    "description": "Brief description",
+    "planning_tips": "How to execute this",
+    "estimated_budget": "$X-$Y or Free"
+  }}
+]""")
+
+
+class PromptBuilder:
+    """Builds suggestion prompts within the configured notes budget."""
+    
+    TEMPLATES = {
+        'gifts': GIFT_TEMPLATE,
+        'events': EVENT_TEMPLATE
+    }
+    
+    # Configured from PROMPT_NOTES_TOKEN_BUDGET at startup
+    notes_token_budget = 200
+    
+    @classmethod
+    def configure(cls, notes_token_budget: int):
+        """Apply prompt settings."""
+        cls.notes_token_budget = notes_token_budget
+    
+    @classmethod
+    def build(cls, suggestion_type: str, friend_name: str, age: int,
+              notes: Optional[str] = None) -> Tuple[str, int, bool]:
+        """
+        Build the prompt for a suggestion type.
+        
+        Args:
+            suggestion_type: 'gifts' or 'events'
+            friend_name: Name of the friend
+            age: Current age (turning age+1)
+            notes: Optional relationship context
+        
+        Returns:
+            Tuple of (prompt, estimated prompt tokens, whether notes were truncated)
+        """
+        truncated = False
+        if notes:
+            notes, truncated = truncate_to_budget(notes, cls.notes_token_budget)
+        
+        prompt, tokens = cls.TEMPLATES[suggestion_type].render({
+            'name': friend_name,
+            'age': str(age),
+            'next_age': str(age + 1),
+            'notes': notes if notes else 'No additional context provided'
+        })
+        return prompt, tokens, truncated
@@ -0,0 +1,410 @@
+"""
+Search index module.
+Per-user in-process inverted index over friend names and notes, with prefix
+matching on a sorted vocabulary and fuzzy matching through an index of each
+word's one-letter deletions (catches any single typo, including swapped letters).
+Built lazily on a user's first search and updated incrementally on writes.
+"""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import re
+import threading
+import time
+import unicodedata
+import logging
+
+from app.models.friend import Friend
+from app.services.shared_friend_cache import SharedFriendCache
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+
+# Token weights per field: a match in the name outranks one in the notes
+NAME_WEIGHT = 3.0
+NOTES_WEIGHT = 1.0
+
+# Match quality of a query token against a document token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+
+# Bonus when the whole query starts the friend's name
+NAME_PREFIX_BONUS = 2.0
+
+# Vocabulary tokens considered per query token for prefix matches
+MAX_PREFIX_TOKENS = 200
+
+# Shortest query token matched fuzzily
+MIN_FUZZY_LENGTH = 3
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so "José" matches "jose"."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized word tokens."""
+    return _WORD.findall(normalize(text)) if text else []
+
+
+def deletions(token: str) -> Set[str]:
+    """The token and every variant of it with one character removed."""
+    return {token} | {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Whether a and b differ by at most one insertion, deletion, substitution or adjacent swap."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    start = 0
+    while start < min(len(a), len(b)) and a[start] == b[start]:
+        start += 1
+    a, b = a[start:], b[start:]
+    return (
+        a[1:] == b[1:]                            # substitution (or equal)
+        or a[1:] == b or a == b[1:]               # deletion / insertion
+        or (a[:2] == b[1::-1] and a[2:] == b[2:])  # adjacent swap
+    )
+
+
+def rank(candidates: List[Tuple[Friend, str, float]], query_tokens: List[str],
+         limit: Optional[int] = None) -> List[Tuple[Friend, float]]:
+    """
+    Order matched friends best first.
+    
+    Args:
+        candidates: (friend, normalized name, match score) from _UserIndex.match
+        query_tokens: Tokens of the query
+        limit: Keep only the best limit results (None = all)
+    
+    Returns:
+        List of (friend, score)
+    """
+    prefix = ' '.join(query_tokens)
+    scored = [
+        (friend, score + NAME_PREFIX_BONUS if name.startswith(prefix) else score)
+        for friend, name, score in candidates
+    ]
+    key = lambda item: (-item[1], item[0].name, item[0].id)
+    if limit is not None and limit < len(scored):
+        return heapq.nsmallest(limit, scored, key=key)
+    return sorted(scored, key=key)
+
+
+class _UserIndex:
+    """Search structures over one user's friends."""
+    
+    __slots__ = ('friends', 'names', 'postings', 'doc_tokens', 'vocabulary', 'by_deletion',
+                 'generation', 'expires_at', 'lock')
+    
+    def __init__(self, generation: int, expires_at: float):
+        self.friends: Dict[str, Friend] = {}
+        self.names: Dict[str, str] = {}                    # friend_id -> normalized name
+        self.postings: Dict[str, Dict[str, float]] = {}    # token -> friend_id -> field weight
+        self.doc_tokens: Dict[str, Set[str]] = {}          # friend_id -> tokens
+        self.vocabulary: List[str] = []                    # sorted tokens, for prefix scans
+        self.by_deletion: Dict[str, Set[str]] = {}         # one-deletion variant -> tokens
+        self.generation = generation
+        self.expires_at = expires_at
+        self.lock = threading.Lock()  # held for reads and writes once the index is shared
+    
+    def add(self, friend: Friend):
+        self.discard(friend.id)
+        self.friends[friend.id] = friend
+        self.names[friend.id] = normalize(friend.name)
+        
+        weights: Dict[str, float] = {}
+        for token in tokenize(friend.notes):
+            weights[token] = NOTES_WEIGHT
+        for token in tokenize(friend.name):
+            weights[token] = NAME_WEIGHT
+        
+        self.doc_tokens[friend.id] = set(weights)
+        for token, weight in weights.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                self._add_token(token)
+            posting[friend.id] = weight
+    
+    def discard(self, friend_id: str):
+        if self.friends.pop(friend_id, None) is None:
+            return
+        del self.names[friend_id]
+        for token in self.doc_tokens.pop(friend_id):
+            posting = self.postings[token]
+            del posting[friend_id]
+            if not posting:
+                del self.postings[token]
+                self._remove_token(token)
+    
+    def _add_token(self, token: str):
+        insort(self.vocabulary, token)
+        for variant in deletions(token):
+            self.by_deletion.setdefault(variant, set()).add(token)
+    
+    def _remove_token(self, token: str):
+        del self.vocabulary[bisect_left(self.vocabulary, token)]
+        for variant in deletions(token):
+            tokens = self.by_deletion[variant]
+            tokens.discard(token)
+            if not tokens:
+                del self.by_deletion[variant]
+    
+    def match_token(self, query_token: str, fuzzy: bool, threshold: float) -> Dict[str, float]:
+        """Vocabulary tokens matching a query token, with their match scores."""
+        matches = {}
+        if query_token in self.postings:
+            matches[query_token] = EXACT_SCORE
+        
+        start = bisect_left(self.vocabulary, query_token)
+        for token in self.vocabulary[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(query_token):
+                break
+            if token != query_token:
+                # Closer to a whole-word match ranks higher
+                matches[token] = PREFIX_SCORE * (0.5 + 0.5 * len(query_token) / len(token))
+        
+        if fuzzy and len(query_token) >= MIN_FUZZY_LENGTH:
+            # Words one typo apart share a variant; some sharing one are two edits apart
+            for variant in deletions(query_token):
+                for token in self.by_deletion.get(variant, ()):
+                    if token in matches or not within_one_edit(query_token, token):
+                        continue
+                    similarity = 1 - 1 / max(len(query_token), len(token))
+                    if similarity >= threshold:
+                        matches[token] = FUZZY_SCORE * similarity
+        return matches
+    
+    def match(self, query_tokens: List[str], fuzzy: bool, threshold: float) -> List[Tuple[Friend, str, float]]:
+        """Friends matching every query token, with their normalized names and match scores (unordered)."""
+        if not query_tokens:
+            return []
+        
+        scores: Optional[Dict[str, float]] = None
+        for query_token in dict.fromkeys(query_tokens):
+            token_scores: Dict[str, float] = {}
+            for token, match_score in self.match_token(query_token, fuzzy, threshold).items():
+                for friend_id, weight in self.postings[token].items():
+                    score = match_score * weight
+                    if score > token_scores.get(friend_id, 0.0):
+                        token_scores[friend_id] = score
+            
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {friend_id: scores[friend_id] + score
+                          for friend_id, score in token_scores.items() if friend_id in scores}
+            if not scores:
+                return []
+        
+        return [(self.friends[friend_id], self.names[friend_id], score) for friend_id, score in scores.items()]
+
+
+class SearchIndex:
+    """In-process per-user friend search index."""
+    
+    # Configured from SEARCH_* settings at startup
+    enabled = True
+    ttl_seconds = 300
+    max_users = 1000
+    fuzzy_threshold = 0.5
+    
+    _entries: 'OrderedDict[str, _UserIndex]' = OrderedDict()
+    _builds: Dict[str, List[int]] = {}  # user_id -> [writes seen, builds in progress], only while building
+    _lock = threading.RLock()
+    _stats = {'hits': 0, 'builds': 0, 'updates': 0}
+    
+    @classmethod
+    def configure(cls, enabled: bool, ttl_seconds: int, max_users: int, fuzzy_threshold: float):
+        """Apply index settings."""
+        cls.enabled = enabled
+        cls.ttl_seconds = ttl_seconds
+        cls.max_users = max_users
+        cls.fuzzy_threshold = fuzzy_threshold
+    
+    @classmethod
+    def search(cls, user_id: str, query: str, load: Callable[[], List[Friend]],
+               fuzzy: bool = True, limit: Optional[int] = None) -> Tuple[List[Tuple[Friend, float]], int]:
+        """
+        Search a user's friends by name and notes.
+        
+        Every query word must match a word of the friend's name or notes
+        exactly, as a prefix or (with fuzzy) with one typo. Matching holds
+        only the user's own index lock; ranking holds no lock.
+        
+        Args:
+            user_id: User ID
+            query: Search text
+            load: Returns all of the user's friends; called when the index is not built
+            fuzzy: Also match misspelled words
+            limit: Rank only the best limit matches, e.g. offset + page size (None = all)
+        
+        Returns:
+            Tuple of (list of (friend, score), best match first; total number of matches)
+        """
+        generation = SharedFriendCache.generation(user_id)
+        query_tokens = tokenize(query)
+        
+        with cls._lock:
+            entry = cls._entries.get(user_id)
+            if entry is not None and (entry.expires_at <= time.monotonic() or entry.generation != generation):
+                del cls._entries[user_id]
+                entry = None
+            if entry is not None:
+                cls._entries.move_to_end(user_id)
+                cls._stats['hits'] += 1
+            else:
+                build = cls._builds.setdefault(user_id, [0, 0])
+                build[1] += 1
+                version = build[0]
+        
+        if entry is not None:
+            with entry.lock:
+                candidates = entry.match(query_tokens, fuzzy, cls.fuzzy_threshold)
+            return rank(candidates, query_tokens, limit), len(candidates)
+        
+        try:
+            entry = _UserIndex(generation, time.monotonic() + cls.ttl_seconds)
+            for friend in load():
+                entry.add(friend)
+            # Not shared yet, so no lock is needed
+            candidates = entry.match(query_tokens, fuzzy, cls.fuzzy_threshold)
+        finally:
+            with cls._lock:
+                build = cls._builds[user_id]
+                build[1] -= 1
+                if build[1] <= 0:
+                    del cls._builds[user_id]
+        
+        with cls._lock:
+            cls._stats['builds'] += 1
+            # Keep the index only if no write landed while friends were loading
+            if cls.enabled and build[0] == version:
+                cls._entries[user_id] = entry
+                while len(cls._entries) > cls.max_users:
+                    cls._entries.popitem(last=False)
+        return rank(candidates, query_tokens, limit), len(candidates)
+    
+    @classmethod
+    def upsert(cls, friend: Friend):
+        """
+        Apply a created or updated friend to its user's index, if built.
+        
+        Args:
+            friend: Friend as stored in the database
+        """
+        with cls._lock:
+            cls._bump(friend.user_id)
+            entry = cls._entries.get(friend.user_id)
+            if entry is not None:
+                with entry.lock:
+                    entry.add(friend)
+                cls._stats['updates'] += 1
+    
+    @classmethod
+    def remove(cls, friend_id: str, user_id: str):
+        """
+        Remove a deleted friend from its user's index, if built.
+        
+        Args:
+            friend_id: Friend ID
+            user_id: User ID
+        """
+        with cls._lock:
+            cls._bump(user_id)
+            entry = cls._entries.get(user_id)
+            if entry is not None:
+                with entry.lock:
+                    entry.discard(friend_id)
+                cls._stats['updates'] += 1
+    
+    @classmethod
+    def advance_generation(cls, user_id: str, generation: int):
+        """
+        Follow the shared cache generation bumped by this worker's own write.
+        
+        The write was already applied incrementally, so the index stays valid;
+        if other writes were skipped in between, it is dropped instead.
+        
+        Args:
+            user_id: User ID
+            generation: Generation after the write
+        """
+        with cls._lock:
+            entry = cls._entries.get(user_id)
+            if entry is None:
+                return
+            if entry.generation == generation - 1:
+                entry.generation = generation
+            elif entry.generation != generation:
+                del cls._entries[user_id]
+    
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Drop a user's index."""
+        with cls._lock:
+            cls._bump(user_id)
+            cls._entries.pop(user_id, None)
+    
+    @classmethod
+    def apply_change(cls, event):
+        """
+        Apply a change feed event.
+        
+        Args:
+            event: ChangeEvent for the friends table
+        """
+        try:
+            if event.type == 'DELETE':
+                old = event.old_record or {}
+                if old.get('user_id'):
+                    cls.remove(old.get('id'), old['user_id'])
+                else:
+                    # Without the owner every user's index might hold the friend
+                    with cls._lock:
+                        for user_id, entry in list(cls._entries.items()):
+                            if old.get('id') in entry.friends:
+                                cls.remove(old['id'], user_id)
+            else:
+                friend = Friend.from_row(event.record)
+                with cls._lock:
+                    # A friend moved to another user must leave the old user's index
+                    for user_id, entry in list(cls._entries.items()):
+                        if user_id != friend.user_id and friend.id in entry.friends:
+                            cls.remove(friend.id, user_id)
+                cls.upsert(friend)
+        except Exception as e:
+            logger.error(f"Failed to apply change event to search index: {e}")
+            user_id = (event.record or event.old_record or {}).get('user_id')
+            if user_id:
+                cls.invalidate(user_id)
+    
+    @classmethod
+    def _bump(cls, user_id: str):
+        """Count a local write against builds in progress. Caller holds the lock."""
+        build = cls._builds.get(user_id)
+        if build is not None:
+            build[0] += 1
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get index counters for this worker.
+        
+        Returns:
+            Dictionary with hits, builds, incremental updates and indexed users
+        """
+        with cls._lock:
+            return {**cls._stats, 'users': len(cls._entries)}
+    
+    @classmethod
+    def clear(cls):
+        """Drop all indexes."""
+        with cls._lock:
+            cls._entries.clear()
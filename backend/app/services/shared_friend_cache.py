@@ -0,0 +1,399 @@
+"""
+Shared friend cache module.
+Per-user friend lists serialized into a memory-mapped file that every worker
+process on the host maps, so a list fetched by one worker is a hit for all.
+
+File layout:
+    header       magic, version, slot count, slot size, generation count
+    generations  one counter per hashed user; bumped by writes to invalidate
+    slots        fixed-size slots holding one user's compressed friend list
+
+Reads take no lock: each slot carries a sequence number that writers make
+odd while writing (a seqlock) and a checksum, so a torn read is detected
+and treated as a miss. Writers serialize on an flock of the file.
+
+The layout is part of the file name (see layout_path), so a process with
+different settings maps its own file and never truncates one that other
+processes have mapped (shrinking a mapped file makes their reads SIGBUS).
+"""
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, the cache stays disabled
+    fcntl = None
+
+from app.models.friend import Friend
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BDFC'
+VERSION = 1
+
+# magic, version, slots, slot_size, generations
+_HEADER = struct.Struct('<4sIIII')
+HEADER_SIZE = 64
+
+# seq, user key, generation, expires_at, last_used, payload length, crc32
+_SLOT_HEADER = struct.Struct('<Q16sQddII')
+SLOT_HEADER_SIZE = 64
+
+_U64 = struct.Struct('<Q')
+_F64 = struct.Struct('<d')
+_LAST_USED_OFFSET = 40
+
+# Consecutive slots a user may occupy; eviction picks the least recently used of them
+PROBE_SLOTS = 8
+
+# Generation counters per slot (hash collisions only cause extra misses)
+GENERATIONS_PER_SLOT = 4
+
+
+def layout_path(path: str, slots: int, slot_size: int) -> str:
+    """
+    File name for one layout, e.g. friends.cache -> friends-v1-1024x65536.cache.
+    
+    Args:
+        path: Configured SHARED_CACHE_PATH
+        slots: Slot count
+        slot_size: Bytes per slot
+    
+    Returns:
+        Path of the file holding this layout
+    """
+    root, ext = os.path.splitext(path)
+    return f'{root}-v{VERSION}-{slots}x{slot_size}{ext}'
+
+
+def user_key(user_id: str) -> bytes:
+    """16-byte key identifying a user in slot headers."""
+    return hashlib.blake2b(user_id.encode(), digest_size=16).digest()
+
+
+class SharedFriendCache:
+    """Cross-process per-user friend list cache in a memory-mapped file."""
+    
+    # Configured from SHARED_CACHE_* settings at startup
+    enabled = False
+    path = None
+    slots = 1024
+    slot_size = 64 * 1024
+    ttl_seconds = 300
+    
+    _mm: Optional[mmap.mmap] = None
+    _fd: Optional[int] = None
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0, 'stores': 0, 'too_large': 0, 'stale_stores': 0, 'invalidations': 0}
+    
+    @classmethod
+    def configure(cls, enabled: bool, path: str, slots: int, slot_size: int, ttl_seconds: int):
+        """Apply cache settings. The file is mapped lazily in each process."""
+        if enabled and fcntl is None:
+            logger.warning("Shared friend cache needs fcntl (Unix); disabled")
+            enabled = False
+        cls.enabled = enabled
+        cls.slots = slots
+        cls.slot_size = max(slot_size, SLOT_HEADER_SIZE + 1024)
+        cls.path = layout_path(path, cls.slots, cls.slot_size)
+        cls.ttl_seconds = ttl_seconds
+        cls._pid = None
+    
+    @classmethod
+    def _generations(cls) -> int:
+        return cls.slots * GENERATIONS_PER_SLOT
+    
+    @classmethod
+    def _slots_offset(cls) -> int:
+        return HEADER_SIZE + cls._generations() * 8
+    
+    @classmethod
+    def _file_size(cls) -> int:
+        return cls._slots_offset() + cls.slots * cls.slot_size
+    
+    @classmethod
+    def _map(cls) -> mmap.mmap:
+        """
+        Get this process's mapping, creating the file if needed.
+        
+        Mapped once per pid: the flock is per open file, so forked workers
+        must not share the parent's descriptor. The file is only ever grown,
+        never truncated, because other processes may have it mapped.
+        """
+        if cls._pid == os.getpid() and cls._mm is not None:
+            return cls._mm
+        
+        with cls._lock:
+            if cls._pid == os.getpid() and cls._mm is not None:
+                return cls._mm
+            
+            os.makedirs(os.path.dirname(os.path.abspath(cls.path)), exist_ok=True)
+            fd = os.open(cls.path, os.O_RDWR | os.O_CREAT, 0o600)
+            size = cls._file_size()
+            expected = _HEADER.pack(MAGIC, VERSION, cls.slots, cls.slot_size, cls._generations())
+            
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < size:
+                    # New file: start empty (the file is sparse)
+                    os.ftruncate(fd, size)
+                if os.pread(fd, _HEADER.size, 0) != expected:
+                    os.pwrite(fd, expected, 0)
+                mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            
+            cls._mm, cls._fd, cls._pid = mm, fd, os.getpid()
+            return mm
+    
+    @classmethod
+    def _generation_offset(cls, key: bytes) -> int:
+        index = int.from_bytes(key[8:], 'little') % cls._generations()
+        return HEADER_SIZE + index * 8
+    
+    @classmethod
+    def _slot_offsets(cls, key: bytes) -> List[int]:
+        start = int.from_bytes(key[:8], 'little') % cls.slots
+        base = cls._slots_offset()
+        return [base + ((start + i) % cls.slots) * cls.slot_size for i in range(min(PROBE_SLOTS, cls.slots))]
+    
+    @classmethod
+    def generation(cls, user_id: str) -> int:
+        """
+        Get a user's generation, which changes whenever any worker writes their friends.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Current generation (always 0 when the cache is disabled)
+        """
+        if not cls.enabled:
+            return 0
+        try:
+            return _U64.unpack_from(cls._map(), cls._generation_offset(user_key(user_id)))[0]
+        except Exception as e:
+            logger.error(f"Shared friend cache read failed: {e}")
+            return 0
+    
+    @classmethod
+    def get(cls, user_id: str) -> Tuple[Optional[List[Friend]], int]:
+        """
+        Get a user's cached friends without locking.
+        
+        Args:
+            user_id: User ID
+        
+        Returns:
+            Tuple of (friends or None on a miss, current generation to pass to put)
+        """
+        if not cls.enabled:
+            return None, 0
+        
+        try:
+            mm = cls._map()
+            key = user_key(user_id)
+            generation = _U64.unpack_from(mm, cls._generation_offset(key))[0]
+            
+            for offset in cls._slot_offsets(key):
+                payload = cls._read_slot(mm, offset, key, generation)
+                if payload is not None:
+                    friends = [Friend.from_row(row) for row in json.loads(zlib.decompress(payload))]
+                    _F64.pack_into(mm, offset + _LAST_USED_OFFSET, time.time())
+                    cls._count('hits')
+                    return friends, generation
+        except Exception as e:
+            logger.error(f"Shared friend cache read failed: {e}")
+            return None, 0
+        
+        cls._count('misses')
+        return None, generation
+    
+    @staticmethod
+    def _read_slot(mm: mmap.mmap, offset: int, key: bytes, generation: int) -> Optional[bytes]:
+        """Read a slot's payload if it holds a live entry for key at generation."""
+        seq, slot_key, slot_generation, expires_at, _, length, crc = _SLOT_HEADER.unpack_from(mm, offset)
+        if seq & 1 or slot_key != key:
+            return None
+        if slot_generation != generation or expires_at <= time.time():
+            return None
+        
+        start = offset + SLOT_HEADER_SIZE
+        payload = mm[start:start + length]
+        
+        # A writer got in between: the data may be torn
+        if _U64.unpack_from(mm, offset)[0] != seq or zlib.crc32(payload) != crc:
+            return None
+        return payload
+    
+    @classmethod
+    def put(cls, user_id: str, friends: List[Friend], generation: int):
+        """
+        Cache a user's complete friend list.
+        
+        Skipped when the user's generation moved since get returned it, so a
+        list read before a write never replaces the invalidation.
+        
+        Args:
+            user_id: User ID
+            friends: All of the user's friends
+            generation: Generation returned by get before fetching the list
+        """
+        if not cls.enabled:
+            return
+        
+        payload = zlib.compress(
+            json.dumps([friend.to_dict() for friend in friends], separators=(',', ':')).encode(), 1
+        )
+        if len(payload) > cls.slot_size - SLOT_HEADER_SIZE:
+            cls._count('too_large')
+            return
+        
+        try:
+            mm = cls._map()
+            key = user_key(user_id)
+            
+            with cls._locked():
+                if _U64.unpack_from(mm, cls._generation_offset(key))[0] != generation:
+                    cls._count('stale_stores')
+                    return
+                
+                offset = cls._choose_slot(mm, key)
+                seq = _U64.unpack_from(mm, offset)[0]
+                now = time.time()
+                
+                # Odd sequence marks the slot as being written for lock-free readers
+                _U64.pack_into(mm, offset, seq + 1)
+                start = offset + SLOT_HEADER_SIZE
+                mm[start:start + len(payload)] = payload
+                _SLOT_HEADER.pack_into(
+                    mm, offset, seq + 1, key, generation, now + cls.ttl_seconds, now,
+                    len(payload), zlib.crc32(payload)
+                )
+                _U64.pack_into(mm, offset, seq + 2)
+            cls._count('stores')
+        except Exception as e:
+            logger.error(f"Shared friend cache write failed: {e}")
+    
+    @classmethod
+    def _choose_slot(cls, mm: mmap.mmap, key: bytes) -> int:
+        """Pick the user's slot, else an empty or expired one, else the least recently used. Caller holds the lock."""
+        now = time.time()
+        victim, victim_used = None, None
+        
+        for offset in cls._slot_offsets(key):
+            _, slot_key, _, expires_at, last_used, _, _ = _SLOT_HEADER.unpack_from(mm, offset)
+            if slot_key == key:
+                return offset
+            used = -1.0 if expires_at <= now else last_used
+            if victim is None or used < victim_used:
+                victim, victim_used = offset, used
+        return victim
+    
+    @classmethod
+    def invalidate(cls, user_id: str) -> int:
+        """
+        Bump a user's generation so every worker's cached list for them misses.
+        
+        Args:
+            user_id: User whose friends changed
+        
+        Returns:
+            The new generation (0 when the cache is disabled or unavailable)
+        """
+        if not cls.enabled:
+            return 0
+        
+        try:
+            mm = cls._map()
+            offset = cls._generation_offset(user_key(user_id))
+            with cls._locked():
+                generation = _U64.unpack_from(mm, offset)[0] + 1
+                _U64.pack_into(mm, offset, generation)
+            cls._count('invalidations')
+            return generation
+        except Exception as e:
+            logger.error(f"Shared friend cache invalidation failed: {e}")
+            return 0
+    
+    @classmethod
+    def apply_change(cls, event):
+        """
+        Invalidate the users touched by a change feed event.
+        
+        Args:
+            event: ChangeEvent for the friends table
+        """
+        user_ids = {(record or {}).get('user_id') for record in (event.record, event.old_record)}
+        for user_id in user_ids - {None}:
+            cls.invalidate(user_id)
+    
+    @classmethod
+    def _locked(cls):
+        """Exclusive lock across threads and processes for writers."""
+        return _FileLock(cls._lock, cls._fd)
+    
+    @classmethod
+    def _count(cls, name: str):
+        with cls._stats_lock:
+            cls._stats[name] += 1
+    
+    @classmethod
+    def get_stats(cls) -> Dict:
+        """
+        Get this worker's counters for the shared cache.
+        
+        Returns:
+            Dictionary with enabled, hits, misses, stores, too_large,
+            stale_stores, invalidations and the file size in bytes
+        """
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        return {'enabled': cls.enabled, **stats, 'size_bytes': cls._file_size() if cls.enabled else 0}
+    
+    @classmethod
+    def clear(cls):
+        """
+        Empty every slot for every process.
+        
+        Generations are kept: resetting them would let a put holding an old
+        generation match again and store a list read before the clear.
+        """
+        if not cls.enabled:
+            return
+        mm = cls._map()
+        base = cls._slots_offset()
+        with cls._locked():
+            for index in range(cls.slots):
+                offset = base + index * cls.slot_size
+                seq = _U64.unpack_from(mm, offset)[0]
+                # Same seqlock protocol as put, so concurrent readers see a miss
+                _U64.pack_into(mm, offset, seq + 1)
+                _SLOT_HEADER.pack_into(mm, offset, seq + 1, bytes(16), 0, 0.0, 0.0, 0, 0)
+                _U64.pack_into(mm, offset, seq + 2)
+
+
+class _FileLock:
+    """Holds a threading lock and an flock on the cache file."""
+    
+    def __init__(self, thread_lock: threading.Lock, fd: int):
+        self.thread_lock = thread_lock
+        self.fd = fd
+    
+    def __enter__(self):
+        self.thread_lock.acquire()
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+    
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.thread_lock.release()
@@ -0,0 +1,287 @@
+"""
+Suggestion cache module.
+Two-tier in-process cache of AI suggestions: an exact tier keyed on age and
+normalized notes, and a similarity tier that reuses suggestions generated for
+friends in the same age bracket with near-identical notes.
+"""
+from bisect import bisect_right
+from itertools import islice
+from collections import Counter, OrderedDict
+from math import sqrt
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Ages (being turned) where a new bracket starts; suggestions are only reused within a bracket
+AGE_BRACKETS = (4, 8, 13, 18, 22, 26, 31, 41, 51, 61, 71)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Words that carry no signal about interests ("loves X" and "likes X" are the same interest)
+_STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'at', 'for', 'from', 'has', 'her', 'his', 'in', 'into',
+    'is', 'of', 'on', 'or', 'she', 'he', 'the', 'their', 'they', 'to', 'very', 'with',
+    'who', 'really', 'love', 'loves', 'like', 'likes', 'enjoy', 'enjoys', 'big', 'fan'
+))
+
+
+def normalize_notes(notes: Optional[str]) -> str:
+    """
+    Normalize notes for the exact tier: lowercase words without punctuation.
+    
+    Args:
+        notes: Relationship context
+    
+    Returns:
+        Space-separated words
+    """
+    return ' '.join(_WORD_PATTERN.findall((notes or '').lower()))
+
+
+def note_features(normalized: str) -> Dict[str, int]:
+    """
+    Build the n-gram feature vector used for similarity.
+    
+    Words and the character trigrams of each word are counted, so
+    "loves hiking" and "likes hiking, coffee" score about 0.7.
+    
+    Args:
+        normalized: Output of normalize_notes
+    
+    Returns:
+        Feature to count mapping
+    """
+    features = Counter()
+    for word in normalized.split():
+        if word in _STOP_WORDS:
+            continue
+        features['w:' + word] += 1
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            features[padded[i:i + 3]] += 1
+    return dict(features)
+
+
+def cosine_similarity(a: Dict[str, int], b: Dict[str, int], norm_a: float, norm_b: float) -> float:
+    """
+    Cosine similarity of two sparse vectors.
+    
+    An empty vector (notes missing or made only of stop words) carries no
+    signal, so it matches nothing here; identical notes, empty ones included,
+    are matched by the exact tier instead.
+    """
+    if not norm_a or not norm_b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b.get(feature, 0) for feature, count in a.items()) / (norm_a * norm_b)
+
+
+def age_bracket(age: int) -> int:
+    """Get the bracket index of the age a friend is turning."""
+    return bisect_right(AGE_BRACKETS, age + 1)
+
+
+class _Entry:
+    """Cached suggestions with the features of the notes they were generated for."""
+    
+    __slots__ = ('suggestions', 'friend_name', 'features', 'norm', 'expires_at')
+    
+    def __init__(self, suggestions: List[Dict], friend_name: str, features: Dict[str, int], expires_at: float):
+        self.suggestions = suggestions
+        self.friend_name = friend_name
+        self.features = features
+        self.norm = sqrt(sum(count * count for count in features.values()))
+        self.expires_at = expires_at
+
+
+class SuggestionCache:
+    """In-process two-tier cache of AI suggestions."""
+    
+    EXACT = 'exact'
+    SIMILAR = 'similar'
+    
+    # Configured from SUGGESTION_CACHE_* settings at startup
+    enabled = False
+    ttl_seconds = 7 * 24 * 3600
+    max_entries = 5000
+    similarity_threshold = 0.85
+    shared = False
+    
+    # Most recently stored entries per bucket scanned by the similarity tier
+    MAX_BUCKET_SCAN = 256
+    
+    # Exact key (scope, type, age, notes) -> entry, in LRU order
+    _entries: 'OrderedDict[Tuple, _Entry]' = OrderedDict()
+    # Bucket (scope, type, age bracket) -> exact keys, in insertion order
+    _buckets: Dict[Tuple, 'OrderedDict[Tuple, None]'] = {}
+    _lock = threading.Lock()
+    _stats = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0}
+    
+    @classmethod
+    def configure(cls, enabled: bool, ttl_seconds: int, max_entries: int,
+                  similarity_threshold: float, shared: bool):
+        """Apply cache settings."""
+        cls.enabled = enabled
+        cls.ttl_seconds = ttl_seconds
+        cls.max_entries = max_entries
+        cls.similarity_threshold = similarity_threshold
+        cls.shared = shared
+    
+    @classmethod
+    def _scope(cls, user_id: Optional[str]) -> str:
+        """Entries are per user unless sharing across users is enabled."""
+        return '*' if cls.shared else (user_id or '')
+    
+    @classmethod
+    def lookup(cls, user_id: Optional[str], suggestion_type: str, friend_name: str,
+               age: int, notes: Optional[str]) -> Optional[Tuple[List[Dict], str]]:
+        """
+        Find cached suggestions, first by exact match, then by similar notes.
+        
+        Args:
+            user_id: Requesting user
+            suggestion_type: 'gifts' or 'events'
+            friend_name: Friend the suggestions are for
+            age: Current age (turning age+1)
+            notes: Relationship context
+        
+        Returns:
+            Tuple of (suggestions, tier) with the friend's name substituted, or None on a miss
+        """
+        if not cls.enabled:
+            return None
+        
+        scope = cls._scope(user_id)
+        normalized = normalize_notes(notes)
+        key = (scope, suggestion_type, age, normalized)
+        now = time.monotonic()
+        
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                cls._entries.move_to_end(key)
+                cls._stats['exact_hits'] += 1
+                return personalize(entry.suggestions, entry.friend_name, friend_name), cls.EXACT
+            
+            features = note_features(normalized)
+            norm = sqrt(sum(count * count for count in features.values()))
+            best, best_score = None, cls.similarity_threshold
+            
+            # Notes without features are only reused through the exact tier
+            bucket = cls._buckets.get((scope, suggestion_type, age_bracket(age)), {}) if norm else {}
+            for candidate_key in islice(reversed(bucket), cls.MAX_BUCKET_SCAN):
+                candidate = cls._entries.get(candidate_key)
+                if candidate is None or candidate.expires_at <= now or not candidate.norm:
+                    continue
+                score = cosine_similarity(features, candidate.features, norm, candidate.norm)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            
+            if best is None:
+                cls._stats['misses'] += 1
+                return None
+            cls._stats['similar_hits'] += 1
+        
+        logger.debug(f"Reusing {suggestion_type} suggestions (similarity {best_score:.2f})")
+        return personalize(best.suggestions, best.friend_name, friend_name), cls.SIMILAR
+    
+    @classmethod
+    def store(cls, user_id: Optional[str], suggestion_type: str, friend_name: str,
+              age: int, notes: Optional[str], suggestions: List[Dict]):
+        """
+        Cache suggestions generated by the model.
+        
+        Args:
+            user_id: Requesting user
+            suggestion_type: 'gifts' or 'events'
+            friend_name: Friend the suggestions were generated for
+            age: Current age (turning age+1)
+            notes: Relationship context
+            suggestions: Suggestions returned by the model
+        """
+        if not cls.enabled:
+            return
+        
+        scope = cls._scope(user_id)
+        normalized = normalize_notes(notes)
+        key = (scope, suggestion_type, age, normalized)
+        bucket_key = (scope, suggestion_type, age_bracket(age))
+        entry = _Entry(suggestions, friend_name, note_features(normalized),
+                       time.monotonic() + cls.ttl_seconds)
+        
+        with cls._lock:
+            cls._entries[key] = entry
+            cls._entries.move_to_end(key)
+            bucket = cls._buckets.setdefault(bucket_key, OrderedDict())
+            bucket[key] = None
+            bucket.move_to_end(key)
+            
+            while len(cls._entries) > cls.max_entries:
+                old_key, _ = cls._entries.popitem(last=False)
+                cls._discard_from_bucket(old_key)
+    
+    @classmethod
+    def _discard_from_bucket(cls, key: Tuple):
+        """Remove an exact key from its bucket. Caller holds the lock."""
+        scope, suggestion_type, age, _ = key
+        bucket_key = (scope, suggestion_type, age_bracket(age))
+        bucket = cls._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del cls._buckets[bucket_key]
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get cache counters for this worker.
+        
+        Returns:
+            Dictionary with exact_hits, similar_hits, misses and cached entries
+        """
+        with cls._lock:
+            return {**cls._stats, 'entries': len(cls._entries)}
+    
+    @classmethod
+    def clear(cls):
+        """Drop all cached entries."""
+        with cls._lock:
+            cls._entries.clear()
+            cls._buckets.clear()
+
+
+def personalize(suggestions: List[Dict], source_name: str, friend_name: str) -> List[Dict]:
+    """
+    Copy cached suggestions, replacing the name they were generated for.
+    
+    Args:
+        suggestions: Cached suggestions
+        source_name: Friend name the suggestions mention
+        friend_name: Friend name to substitute
+    
+    Returns:
+        New list of suggestion dictionaries
+    """
+    if not source_name or source_name == friend_name:
+        return [dict(suggestion) for suggestion in suggestions]
+    
+    # Full name first, then the first name on its own
+    names = [source_name]
+    first_name = source_name.split()[0]
+    if first_name != source_name:
+        names.append(first_name)
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(name) for name in names) + r')\b')
+    replacement = {source_name: friend_name, first_name: friend_name.split()[0] if friend_name else friend_name}
+    
+    return [
+        {
+            field: pattern.sub(lambda m: replacement[m.group(1)], value) if isinstance(value, str) else value
+            for field, value in suggestion.items()
+        }
+        for suggestion in suggestions
+    ]
@@ -2,21 +2,78 @@
 Supabase service module.
 Provides a wrapper around the Supabase client for database operations.
 """
-from supabase import create_client, Client
-from flask import current_app
-from typing import List, Dict, Optional
+from flask import current_app, g, has_request_context
+from app.services.birthday_service import BirthdayService
+from app.services.friend_cache import FriendCache
+from app.services.shared_friend_cache import SharedFriendCache
+from app.services.calendar_feed import CalendarFeed
+from app.services.search_index import SearchIndex
+from app.services.idempotency_store import IdempotencyKeyReused
+from app.models.friend import Friend
+from app.utils.hedging import hedged_call, DeadlineExceeded
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, List, Dict, Optional, Tuple, TYPE_CHECKING
+import os
+import threading
+import time
 import logging
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 
 class SupabaseService:
     """Service for interacting with Supabase database."""
     
-    _client: Optional[Client] = None
+    _client: Optional['Client'] = None
+    
+    # Configured from SUPABASE_* and STALE_* settings at startup
+    request_timeout = 10.0
+    read_deadline = 2.0
+    hedge_delay = 0.5
+    read_threads = 16
+    stale_enabled = True
+    stale_max_age = 900
+    stale_max_users = 10000
+    
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_pid: Optional[int] = None
+    _last_good: 'OrderedDict[str, Tuple[List[Friend], float, int]]' = OrderedDict()
+    _lock = threading.Lock()
+    _stats = {'reads': 0, 'hedges': 0, 'deadline_exceeded': 0, 'read_errors': 0, 'stale_serves': 0}
+    
+    @classmethod
+    def configure(cls, request_timeout: float, read_deadline: float, hedge_delay: float, read_threads: int,
+                  stale_enabled: bool, stale_max_age: int, stale_max_users: int):
+        """Apply timeout, hedging and stale fallback settings."""
+        cls.request_timeout = request_timeout
+        cls.read_deadline = read_deadline
+        cls.hedge_delay = hedge_delay
+        cls.read_threads = read_threads
+        cls.stale_enabled = stale_enabled
+        cls.stale_max_age = stale_max_age
+        cls.stale_max_users = stale_max_users
+    
+    @classmethod
+    def init_client(cls, url: str, key: str):
+        """
+        Create the shared Supabase client.
+        
+        Args:
+            url: Supabase project URL
+            key: Supabase API key
+        """
+        # Imported here so the SDK is only loaded when first needed
+        from supabase import create_client, ClientOptions
+        
+        cls._client = create_client(url, key, options=ClientOptions(postgrest_client_timeout=cls.request_timeout))
     
     @classmethod
-    def get_client(cls) -> Client:
+    def get_client(cls) -> 'Client':
         """
         Get or create Supabase client instance.
         
@@ -24,13 +81,143 @@ class SupabaseService:
             Supabase client instance
         """
         if cls._client is None:
-            url = current_app.config['SUPABASE_URL']
-            key = current_app.config['SUPABASE_KEY']
-            cls._client = create_client(url, key)
+            cls.init_client(current_app.config['SUPABASE_URL'], current_app.config['SUPABASE_KEY'])
         return cls._client
     
     @classmethod
-    def get_friends(cls, user_id: str, filters: Optional[Dict] = None) -> List[Dict]:
+    def _read(cls, query: Callable[[], Any]) -> Any:
+        """
+        Run an idempotent read within read_deadline, hedged after hedge_delay.
+        
+        Args:
+            query: Callable executing the read (must not need the app context)
+        
+        Returns:
+            The query's result
+        """
+        if cls.read_deadline <= 0:
+            return query()
+        
+        try:
+            result, attempts = hedged_call(query, cls.read_deadline, cls.hedge_delay, cls._get_executor())
+        except DeadlineExceeded:
+            cls._count('deadline_exceeded')
+            raise
+        except Exception:
+            cls._count('read_errors')
+            raise
+        
+        cls._count('reads')
+        if attempts > 1:
+            cls._count('hedges')
+        return result
+    
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Get this process's read pool (threads do not survive a fork)."""
+        if cls._executor_pid != os.getpid():
+            with cls._lock:
+                if cls._executor_pid != os.getpid():
+                    cls._executor = ThreadPoolExecutor(max_workers=cls.read_threads, thread_name_prefix='supabase-read')
+                    cls._executor_pid = os.getpid()
+        return cls._executor
+    
+    @classmethod
+    def _remember(cls, user_id: str, friends: List[Friend], generation: int):
+        """
+        Keep a user's last fetched friend list for stale fallbacks.
+        
+        Args:
+            user_id: User ID
+            friends: The user's friends
+            generation: Shared cache generation read before fetching them
+        """
+        if not cls.stale_enabled:
+            return
+        with cls._lock:
+            cls._last_good[user_id] = (friends, time.monotonic(), generation)
+            cls._last_good.move_to_end(user_id)
+            while len(cls._last_good) > cls.stale_max_users:
+                cls._last_good.popitem(last=False)
+    
+    @classmethod
+    def _changed(cls, user_id: str):
+        """
+        Invalidate everything derived from a user's friends after a write.
+        
+        Bumps the shared cache generation (other workers' lists, feeds and
+        search indexes), drops this worker's rendered calendar feed and the
+        last-known-good list, so stale reads never hide the user's own writes.
+        The local search index was already updated and follows the new generation.
+        """
+        SearchIndex.advance_generation(user_id, SharedFriendCache.invalidate(user_id))
+        CalendarFeed.invalidate(user_id)
+        with cls._lock:
+            cls._last_good.pop(user_id, None)
+    
+    @classmethod
+    def _stale_friends(cls, user_id: str) -> Optional[List[Friend]]:
+        """
+        Get the last-known-good friend list and mark the request as served stale.
+        
+        A list whose shared cache generation has moved on was changed by a
+        write on another worker, so it is dropped instead of served.
+        
+        Returns:
+            List of friends, or None when there is none younger than stale_max_age
+            and current with the shared generation
+        """
+        if not cls.stale_enabled:
+            return None
+        with cls._lock:
+            entry = cls._last_good.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > cls.stale_max_age:
+            return None
+        if entry[2] != SharedFriendCache.generation(user_id):
+            with cls._lock:
+                if cls._last_good.get(user_id) is entry:
+                    del cls._last_good[user_id]
+            return None
+        
+        cls._count('stale_serves')
+        if has_request_context():
+            g.supabase_stale = True
+        return entry[0]
+    
+    @staticmethod
+    def served_stale() -> bool:
+        """Check whether this request was answered from last-known-good data."""
+        return has_request_context() and g.get('supabase_stale', False)
+    
+    @classmethod
+    def _count(cls, name: str):
+        with cls._lock:
+            cls._stats[name] += 1
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        Get read counters for this worker.
+        
+        Returns:
+            Dictionary with reads, hedges, deadline_exceeded, read_errors,
+            stale_serves and users with a last-known-good list
+        """
+        with cls._lock:
+            return {**cls._stats, 'last_good_users': len(cls._last_good)}
+    
+    @staticmethod
+    def _in_window(friends: List[Friend], ranges: List[Tuple[int, int]]) -> List[Friend]:
+        """Filter friends to the given birth_doy ranges."""
+        in_window = []
+        for friend in friends:
+            doy = BirthdayService.birthday_ordinal(friend.date_of_birth.month, friend.date_of_birth.day)
+            if any(start <= doy <= end for start, end in ranges):
+                in_window.append(friend)
+        return in_window
+    
+    @classmethod
+    def get_friends(cls, user_id: str, filters: Optional[Dict] = None) -> List[Friend]:
         """
         Get all friends for a user with optional filters.
         
@@ -39,20 +226,223 @@ class SupabaseService:
             filters: Optional filters (upcoming, reminders)
             
         Returns:
-            List of friend dictionaries
+            List of friends; when Supabase is slow or failing, the last list
+            fetched by this worker (see served_stale)
         """
+        cached = FriendCache.get_friends(user_id)
+        if cached is not None:
+            return cached
+        
+        # Changes applied while the list is read must not be overwritten by it
+        version = FriendCache.begin_fill(user_id)
         try:
+            # Another worker on this host may have fetched the list already
+            shared, generation = SharedFriendCache.get(user_id)
+            if shared is not None:
+                FriendCache.set_friends(user_id, shared, version)
+                cls._remember(user_id, shared, generation)
+                return shared
+            
             client = cls.get_client()
             query = client.table('friends').select('*').eq('user_id', user_id)
             
-            response = query.execute()
-            return response.data
+            response = cls._read(query.execute)
+            friends = [Friend.from_row(row) for row in response.data]
+            FriendCache.set_friends(user_id, friends, version)
+            SharedFriendCache.put(user_id, friends, generation)
+            cls._remember(user_id, friends, generation)
+            return friends
         except Exception as e:
             logger.error(f"Error fetching friends: {e}")
+            stale = cls._stale_friends(user_id)
+            if stale is not None:
+                return stale
+            raise
+        finally:
+            FriendCache.end_fill(user_id)
+    
+    @classmethod
+    def get_friends_page(cls, user_id: str, offset: int, limit: int,
+                         today: date) -> Tuple[List[Friend], Optional[int]]:
+        """
+        Get one page of a user's friends in next-birthday order.
+        
+        Reads only the page, with range queries on the (user_id, birth_doy)
+        index: birthdays from today's ordinal to the year end, then the rest.
+        Rows are ordered as BirthdayService.next_birthday_key orders the full
+        list. When the full list is cached on this host, today is Feb 29 (where
+        ordinals and calendar days differ), or some of the user's rows have not
+        been backfilled with birthday columns, the full list is returned for the
+        caller to page instead.
+        
+        Args:
+            user_id: User ID from Supabase auth
+            offset: Number of friends to skip
+            limit: Page size
+            today: Reference date in the user's timezone
+        
+        Returns:
+            Tuple of (friends, total); total is None when friends is the full list
+        """
+        if (today.month, today.day) == (2, 29) or FriendCache.is_cached(user_id):
+            return cls.get_friends(user_id), None
+        if SharedFriendCache.get(user_id)[0] is not None:
+            return cls.get_friends(user_id), None
+        
+        start = BirthdayService.birthday_ordinal(today.month, today.day)
+        
+        try:
+            client = cls.get_client()
+            
+            def count(query) -> int:
+                return query.eq('user_id', user_id).execute().count or 0
+            
+            def rows(query, first: int, last: int) -> List[Dict]:
+                return (
+                    query.eq('user_id', user_id)
+                    .order('birth_doy').order('birth_day').order('name').order('id')
+                    .range(first, last)
+                    .execute()
+                ).data
+            
+            def query():
+                total = count(client.table('friends').select('id', count='exact', head=True))
+                missing = count(
+                    client.table('friends').select('id', count='exact', head=True).is_('birth_doy', 'null')
+                )
+                if missing:
+                    return None, total
+                ahead = count(
+                    client.table('friends').select('id', count='exact', head=True).gte('birth_doy', start)
+                )
+                end = min(offset + limit, total)
+                
+                page = []
+                if offset < ahead:
+                    # Birthdays still to come this year
+                    page += rows(
+                        client.table('friends').select('*').gte('birth_doy', start),
+                        offset, min(end, ahead) - 1
+                    )
+                if end > ahead:
+                    # Earlier in the year (next year's birthdays)
+                    page += rows(
+                        client.table('friends').select('*').lt('birth_doy', start),
+                        max(offset - ahead, 0), end - ahead - 1
+                    )
+                return page, total
+            
+            page, total = cls._read(query)
+            if page is None:
+                return cls.get_friends(user_id), None
+            return [Friend.from_row(row) for row in page], total
+        except Exception as e:
+            logger.error(f"Error fetching friends page: {e}")
+            stale = cls._stale_friends(user_id)
+            if stale is not None:
+                return stale, None
+            raise
+    
+    @classmethod
+    def get_friends_in_birthday_window(cls, user_id: str, days: int, today: Optional[date] = None) -> List[Friend]:
+        """
+        Get friends whose birthday falls within the next `days` days.
+        
+        Uses a range scan on the (user_id, birth_doy) index instead of
+        loading every friend of the user.
+        
+        Args:
+            user_id: User ID from Supabase auth
+            days: Number of days ahead to include
+            today: Reference date (defaults to today)
+        
+        Returns:
+            List of friends (callers filter on exact days_until_birthday)
+        """
+        ranges = BirthdayService.get_ordinal_window(days, today)
+        cached = FriendCache.get_friends_in_window(user_id, ranges)
+        if cached is not None:
+            return cached
+        
+        shared, _ = SharedFriendCache.get(user_id)
+        if shared is not None:
+            return cls._in_window(shared, ranges)
+        
+        try:
+            client = cls.get_client()
+            
+            def query():
+                rows = []
+                for start, end in ranges:
+                    response = (
+                        client.table('friends').select('*')
+                        .eq('user_id', user_id)
+                        .gte('birth_doy', start)
+                        .lte('birth_doy', end)
+                        .execute()
+                    )
+                    rows.extend(response.data)
+                return rows
+            
+            return [Friend.from_row(row) for row in cls._read(query)]
+        except Exception as e:
+            logger.error(f"Error fetching friends in birthday window: {e}")
+            stale = cls._stale_friends(user_id)
+            if stale is not None:
+                return cls._in_window(stale, ranges)
             raise
     
     @classmethod
-    def get_friend_by_id(cls, friend_id: str, user_id: str) -> Optional[Dict]:
+    def backfill_birthday_columns(cls, batch_size: int = 500) -> int:
+        """
+        Populate birthday columns for rows written before they existed.
+        
+        Rows with a NULL birth_doy are processed in batches in id order, so the
+        backfill can be interrupted and resumed safely. Each batch starts after
+        the last id seen, so rows whose update has no effect (e.g. blocked by
+        RLS without the service key) are skipped instead of fetched forever.
+        
+        Args:
+            batch_size: Number of rows fetched per batch
+        
+        Returns:
+            Number of rows updated
+        """
+        client = cls.get_client()
+        updated = 0
+        skipped = 0
+        last_id = None
+        
+        while True:
+            query = (
+                client.table('friends').select('id, date_of_birth')
+                .is_('birth_doy', 'null')
+                .order('id')
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            response = query.execute()
+            if not response.data:
+                break
+            
+            for row in response.data:
+                columns = BirthdayService.get_birthday_columns(row['date_of_birth'])
+                result = client.table('friends').update(columns).eq('id', row['id']).execute()
+                if result.data:
+                    updated += 1
+                else:
+                    skipped += 1
+            
+            last_id = response.data[-1]['id']
+            logger.info(f"Backfilled birthday columns for {updated} friends")
+        
+        if skipped:
+            logger.warning(f"{skipped} friends were not updated; check that SUPABASE_KEY is the service role key")
+        return updated
+    
+    @classmethod
+    def get_friend_by_id(cls, friend_id: str, user_id: str) -> Optional[Friend]:
         """
         Get a single friend by ID.
         
@@ -61,21 +451,49 @@ class SupabaseService:
             user_id: User ID (for authorization check)
             
         Returns:
-            Friend dictionary or None if not found
+            Friend or None if not found
         """
+        if FriendCache.is_cached(user_id):
+            return FriendCache.get_friend(friend_id, user_id)
+        
         try:
             client = cls.get_client()
-            response = client.table('friends').select('*').eq('id', friend_id).eq('user_id', user_id).execute()
+            query = client.table('friends').select('*').eq('id', friend_id).eq('user_id', user_id)
+            response = cls._read(query.execute)
             
             if response.data:
-                return response.data[0]
+                return Friend.from_row(response.data[0])
             return None
         except Exception as e:
             logger.error(f"Error fetching friend {friend_id}: {e}")
+            stale = cls._stale_friends(user_id)
+            if stale is not None:
+                return next((friend for friend in stale if friend.id == friend_id), None)
             raise
     
+    @staticmethod
+    def _to_row(friend_data: Dict) -> Dict:
+        """
+        Prepare friend data for writing, adding denormalized birthday columns.
+        
+        Args:
+            friend_data: Friend data; date_of_birth may be a date or YYYY-MM-DD string
+        
+        Returns:
+            Row dictionary with date_of_birth serialized
+        """
+        dob = friend_data.get('date_of_birth')
+        if not dob:
+            return friend_data
+        
+        return {
+            **friend_data,
+            'date_of_birth': dob.isoformat() if isinstance(dob, date) else dob,
+            **BirthdayService.get_birthday_columns(dob)
+        }
+    
     @classmethod
-    def create_friend(cls, user_id: str, friend_data: Dict) -> Dict:
+    def create_friend(cls, user_id: str, friend_data: Dict) -> Friend:
         """
         Create a new friend record.
         
@@ -84,7 +502,7 @@ class SupabaseService:
             friend_data: Friend data (name, date_of_birth, notes)
             
         Returns:
-            Created friend dictionary
+            Created friend
         """
         try:
             client = cls.get_client()
@@ -92,17 +510,180 @@ class SupabaseService:
             # Add user_id to friend data
             data_to_insert = {
                 'user_id': user_id,
-                **friend_data
+                **cls._to_row(friend_data)
             }
             
             response = client.table('friends').insert(data_to_insert).execute()
-            return response.data[0]
+            friend = Friend.from_row(response.data[0], cls._parsed_dob(friend_data))
+            FriendCache.upsert(friend)
+            SearchIndex.upsert(friend)
+            cls._changed(user_id)
+            return friend
         except Exception as e:
             logger.error(f"Error creating friend: {e}")
             raise
     
     @classmethod
-    def update_friend(cls, friend_id: str, user_id: str, friend_data: Dict) -> Optional[Dict]:
+    def create_friend_idempotent(cls, user_id: str, friend_data: Dict, idempotency_key: str,
+                                 fingerprint: str) -> Tuple[Optional[Friend], bool]:
+        """
+        Create a friend once per idempotency key.
+        
+        Upserts on (user_id, idempotency_key) and ignores conflicts, so a
+        retried request returns the row created by the first attempt. The
+        row stores the request's fingerprint, so a key reused with another
+        body is detected on any worker. Requires migrations 003 and 004.
+        
+        Args:
+            user_id: User ID from Supabase auth
+            friend_data: Friend data (name, date_of_birth, notes)
+            idempotency_key: Client-supplied Idempotency-Key
+            fingerprint: request_fingerprint of the request body
+        
+        Returns:
+            Tuple of (friend, whether it was created by this call); friend is
+            None if the original row was deleted after the conflict
+        
+        Raises:
+            IdempotencyKeyReused: If the original row came from a different body
+        """
+        try:
+            client = cls.get_client()
+            
+            row = {
+                'user_id': user_id,
+                'idempotency_key': idempotency_key,
+                'request_fingerprint': fingerprint,
+                **cls._to_row(friend_data)
+            }
+            
+            response = client.table('friends').upsert(
+                row,
+                on_conflict='user_id,idempotency_key',
+                ignore_duplicates=True
+            ).execute()
+            
+            if response.data:
+                friend = Friend.from_row(response.data[0], cls._parsed_dob(friend_data))
+                FriendCache.upsert(friend)
+                SearchIndex.upsert(friend)
+                cls._changed(user_id)
+                return friend, True
+            
+            # Conflict: the key was used before, return the original row
+            response = (
+                client.table('friends')
+                .select('*')
+                .eq('user_id', user_id)
+                .eq('idempotency_key', idempotency_key)
+                .execute()
+            )
+            if not response.data:
+                return None, False
+            original = response.data[0]
+            # Rows created before migration 004 have no fingerprint to compare
+            if original.get('request_fingerprint') not in (None, fingerprint):
+                raise IdempotencyKeyReused(f"Idempotency key belongs to friend {original['id']}")
+            return Friend.from_row(original), False
+        except IdempotencyKeyReused:
+            raise
+        except Exception as e:
+            logger.error(f"Error creating friend with idempotency key: {e}")
+            raise
+    
+    @classmethod
+    def create_friends(cls, user_id: str, friends_data: List[Dict]) -> List[Friend]:
+        """
+        Create many friend records with a single insert.
+        
+        Args:
+            user_id: User ID from Supabase auth
+            friends_data: List of friend data (name, date_of_birth, notes)
+        
+        Returns:
+            Created friends, in input order
+        """
+        try:
+            client = cls.get_client()
+            
+            rows = [{'user_id': user_id, **cls._to_row(friend_data)} for friend_data in friends_data]
+            response = client.table('friends').insert(rows).execute()
+            
+            friends = [
+                Friend.from_row(row, cls._parsed_dob(friend_data))
+                for row, friend_data in zip(response.data, friends_data)
+            ]
+            for friend in friends:
+                FriendCache.upsert(friend)
+                SearchIndex.upsert(friend)
+            cls._changed(user_id)
+            return friends
+        except Exception as e:
+            logger.error(f"Error creating {len(friends_data)} friends: {e}")
+            raise
+    
+    @classmethod
+    def create_friends_idempotent(cls, user_id: str, friends_data: List[Dict], key_prefix: str) -> List[Friend]:
+        """
+        Create many friends once per key prefix.
+        
+        Each row gets the idempotency key "<key_prefix><index>", so running
+        the same batch again (e.g. a retried job) inserts only the rows the
+        earlier run did not. Requires migrations/003_add_friend_idempotency_key.sql.
+        
+        Args:
+            user_id: User ID from Supabase auth
+            friends_data: List of friend data (name, date_of_birth, notes)
+            key_prefix: Prefix unique to the batch, e.g. derived from a job ID
+        
+        Returns:
+            The batch's friends, in input order
+        """
+        try:
+            client = cls.get_client()
+            
+            rows = [
+                {'user_id': user_id, 'idempotency_key': f'{key_prefix}{index}', **cls._to_row(friend_data)}
+                for index, friend_data in enumerate(friends_data)
+            ]
+            response = client.table('friends').upsert(
+                rows,
+                on_conflict='user_id,idempotency_key',
+                ignore_duplicates=True
+            ).execute()
+            
+            inserted = [Friend.from_row(row) for row in response.data]
+            for friend in inserted:
+                FriendCache.upsert(friend)
+                SearchIndex.upsert(friend)
+            if inserted:
+                cls._changed(user_id)
+            if len(inserted) == len(rows):
+                by_key = {row['idempotency_key']: row for row in response.data}
+            else:
+                # Some rows came from an earlier run: read the whole batch back
+                response = (
+                    client.table('friends')
+                    .select('*')
+                    .eq('user_id', user_id)
+                    .like('idempotency_key', f'{key_prefix}%')
+                    .execute()
+                )
+                by_key = {row['idempotency_key']: row for row in response.data}
+            
+            return [Friend.from_row(by_key[row['idempotency_key']]) for row in rows if row['idempotency_key'] in by_key]
+        except Exception as e:
+            logger.error(f"Error creating {len(friends_data)} friends with key prefix {key_prefix}: {e}")
+            raise
+    
+    @staticmethod
+    def _parsed_dob(friend_data: Dict) -> Optional[date]:
+        """Return date_of_birth if the caller already parsed it."""
+        dob = friend_data.get('date_of_birth')
+        return dob if isinstance(dob, date) else None
+    
+    @classmethod
+    def update_friend(cls, friend_id: str, user_id: str, friend_data: Dict) -> Optional[Friend]:
         """
         Update an existing friend record.
         
@@ -112,15 +693,20 @@ class SupabaseService:
             friend_data: Updated friend data
             
         Returns:
-            Updated friend dictionary or None if not found
+            Updated friend or None if not found
         """
         try:
             client = cls.get_client()
             
-            response = client.table('friends').update(friend_data).eq('id', friend_id).eq('user_id', user_id).execute()
+            # Keep denormalized birthday columns in sync with date_of_birth
+            response = client.table('friends').update(cls._to_row(friend_data)).eq('id', friend_id).eq('user_id', user_id).execute()
             
             if response.data:
-                return response.data[0]
+                friend = Friend.from_row(response.data[0], cls._parsed_dob(friend_data))
+                FriendCache.upsert(friend)
+                SearchIndex.upsert(friend)
+                cls._changed(user_id)
+                return friend
             return None
         except Exception as e:
             logger.error(f"Error updating friend {friend_id}: {e}")
@@ -143,6 +729,9 @@ class SupabaseService:
             
             response = client.table('friends').delete().eq('id', friend_id).eq('user_id', user_id).execute()
             
+            FriendCache.remove(friend_id, user_id)
+            SearchIndex.remove(friend_id, user_id)
+            cls._changed(user_id)
             return len(response.data) > 0
         except Exception as e:
             logger.error(f"Error deleting friend {friend_id}: {e}")
@@ -0,0 +1,71 @@
+"""
+Hedged call utilities.
+Runs an idempotent call under a deadline, starting one duplicate attempt when
+the first is slow or fails so a single slow upstream request does not set
+the latency.
+"""
+from concurrent.futures import Executor, Future, FIRST_COMPLETED, wait
+from typing import Any, Callable, Set, Tuple
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no attempt finished before the deadline."""
+
+
+def _cancel(futures: Set[Future]):
+    """Cancel attempts that have not started, e.g. queued behind a busy executor."""
+    for future in futures:
+        future.cancel()
+
+
+def hedged_call(fn: Callable[[], Any], deadline: float, hedge_delay: float,
+                executor: Executor) -> Tuple[Any, int]:
+    """
+    Call fn, starting a second attempt after hedge_delay seconds (or as soon
+    as the first fails) and returning whichever succeeds first.
+    
+    Pending attempts are cancelled once the call returns or times out. An
+    attempt already running cannot be interrupted and is abandoned, so fn
+    must be safe to run twice and to finish late.
+    
+    Args:
+        fn: Idempotent call
+        deadline: Seconds to wait in total
+        hedge_delay: Seconds before the second attempt starts; 0 disables hedging
+        executor: Executor the attempts run on
+    
+    Returns:
+        Tuple of (result, attempts started)
+    
+    Raises:
+        DeadlineExceeded: If no attempt succeeded in time
+        Exception: The last attempt's error when every attempt failed
+    """
+    started = time.monotonic()
+    pending = {executor.submit(fn)}
+    attempts = 1
+    last_error = None
+    
+    while True:
+        elapsed = time.monotonic() - started
+        remaining = deadline - elapsed
+        if remaining <= 0:
+            _cancel(pending)
+            raise DeadlineExceeded(f'no response within {deadline}s')
+        
+        can_hedge = attempts == 1 and hedge_delay > 0
+        timeout = min(remaining, max(0.0, hedge_delay - elapsed)) if can_hedge else remaining
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        
+        for future in done:
+            if future.exception() is None:
+                _cancel(pending)
+                return future.result(), attempts
+            last_error = future.exception()
+        
+        if can_hedge and (last_error is not None or time.monotonic() - started >= hedge_delay):
+            pending.add(executor.submit(fn))
+            attempts += 1
+        elif not pending:
+            raise last_error
@@ -0,0 +1,72 @@
+"""
+Startup profiling utilities.
+Measures where application cold-start time goes using Python's -X importtime.
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Code profiled in a fresh interpreter so already-imported modules don't hide costs
+_STARTUP_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "from app import create_app; create_app(); "
+    "print(round((time.perf_counter() - t) * 1000, 1))"
+)
+
+
+def profile_startup() -> Tuple[float, List[Tuple[str, int, int]]]:
+    """
+    Run create_app() in a fresh interpreter with -X importtime.
+    
+    Returns:
+        Tuple of (total startup time in ms, list of (module, self_us, cumulative_us))
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _STARTUP_SNIPPET],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    
+    total_ms = float(result.stdout.strip().splitlines()[-1])
+    return total_ms, modules
+
+
+def format_startup_report(total_ms: float, modules: List[Tuple[str, int, int]], top: int = 20) -> str:
+    """
+    Format a startup profile as a readable report.
+    
+    Args:
+        total_ms: Total startup time in milliseconds
+        modules: Output of profile_startup()
+        top: Number of slowest top-level packages to list
+        
+    Returns:
+        Report text
+    """
+    # Attribute self time to top-level packages
+    packages: Dict[str, int] = {}
+    for name, self_us, _ in modules:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    
+    lines = [
+        f"create_app() startup: {total_ms:.1f} ms",
+        "",
+        f"{'package':<40}{'import ms':>12}",
+        '-' * 52
+    ]
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{package:<40}{self_us / 1000:>12.1f}")
+    
+    return '\n'.join(lines)
@@ -0,0 +1,87 @@
+"""
+Timezone utilities.
+Resolves "today" in a user's timezone, caching each zone's current day boundaries.
+"""
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+# Header the frontend sets to the browser's IANA timezone (e.g. "Asia/Kolkata")
+TIMEZONE_HEADER = 'X-Timezone'
+
+# Zone name -> (day start UTC timestamp, next day start UTC timestamp, local date)
+_day_boundaries: Dict[str, Tuple[float, float, date]] = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=512)
+def get_zone(name: str) -> Optional[ZoneInfo]:
+    """
+    Look up an IANA timezone.
+    
+    Args:
+        name: Timezone name
+        
+    Returns:
+        ZoneInfo, or None if the name is unknown
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def local_today(tz_name: Optional[str]) -> date:
+    """
+    Get the current date in a timezone.
+    
+    The local day's UTC boundaries are cached per zone, so until the zone's
+    next midnight this is a timestamp comparison rather than timezone math.
+    
+    Args:
+        tz_name: IANA timezone name; unknown or missing names use server-local time
+        
+    Returns:
+        Today's date in that timezone
+    """
+    zone = get_zone(tz_name) if tz_name else None
+    if zone is None:
+        return date.today()
+    
+    now = time.time()
+    cached = _day_boundaries.get(tz_name)
+    if cached and cached[0] <= now < cached[1]:
+        return cached[2]
+    
+    local_now = datetime.fromtimestamp(now, zone)
+    today = local_now.date()
+    start = datetime.combine(today, datetime.min.time(), zone).astimezone(timezone.utc)
+    end = datetime.combine(today + timedelta(days=1), datetime.min.time(), zone).astimezone(timezone.utc)
+    
+    with _lock:
+        _day_boundaries[tz_name] = (start.timestamp(), end.timestamp(), today)
+    
+    return today
+
+
+def get_request_today() -> date:
+    """
+    Get today's date for the user making the current request.
+    
+    Computed once per request from the X-Timezone header and reused by
+    validation, enrichment and filtering.
+    
+    Returns:
+        Today's date in the user's timezone (server-local without a header)
+    """
+    if not has_request_context():
+        return date.today()
+    
+    if 'today' not in g:
+        g.today = local_today(request.headers.get(TIMEZONE_HEADER))
+    return g.today
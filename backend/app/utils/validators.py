@@ -3,42 +3,62 @@ Input validation utilities.
 Provides functions to validate user inputs for the birthday reminder application.
 """
 import re
-from datetime import datetime
-from typing import Tuple, Optional
+from datetime import date
+from typing import Any, Dict, List, Tuple, Optional
 
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
 
-def validate_date_format(date_string: str) -> Tuple[bool, Optional[str]]:
+# Maximum number of friends accepted in one bulk request
+MAX_BATCH_SIZE = 1000
+
+
+def parse_date_of_birth(date_string: str, today: Optional[date] = None) -> Tuple[Optional[date], Optional[str]]:
     """
-    Validate that a date string is in YYYY-MM-DD format and represents a valid date.
+    Validate and parse a YYYY-MM-DD date of birth.
     
     Args:
         date_string: Date string to validate
+        today: Reference date for the future check (defaults to today)
         
     Returns:
-        Tuple of (is_valid, error_message)
+        Tuple of (parsed_date, error_message)
     """
     if not date_string:
-        return False, "Date is required"
+        return None, "Date is required"
     
     # Check format with regex
-    if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_string):
-        return False, "Date must be in YYYY-MM-DD format"
+    if not isinstance(date_string, str) or not DATE_PATTERN.match(date_string):
+        return None, "Date must be in YYYY-MM-DD format"
     
-    # Try to parse the date
+    # Try to parse the date (the pattern guarantees three integer fields)
     try:
-        date_obj = datetime.strptime(date_string, '%Y-%m-%d').date()
+        date_obj = date(int(date_string[:4]), int(date_string[5:7]), int(date_string[8:]))
     except ValueError:
-        return False, "Invalid date (e.g., 2023-02-30 is not valid)"
+        return None, "Invalid date (e.g., 2023-02-30 is not valid)"
     
     # Check if date is in the future
-    if date_obj > datetime.now().date():
-        return False, "Date of birth cannot be in the future"
+    if date_obj > (today or date.today()):
+        return None, "Date of birth cannot be in the future"
     
     # Check if date is too far in the past (e.g., before 1900)
     if date_obj.year < 1900:
-        return False, "Date of birth must be after 1900"
+        return None, "Date of birth must be after 1900"
     
-    return True, None
+    return date_obj, None
+
+
+def validate_date_format(date_string: str) -> Tuple[bool, Optional[str]]:
+    """
+    Validate that a date string is in YYYY-MM-DD format and represents a valid date.
+    
+    Args:
+        date_string: Date string to validate
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    _, error = parse_date_of_birth(date_string)
+    return error is None, error
 
 
 def validate_name(name: str) -> Tuple[bool, Optional[str]]:
@@ -85,6 +105,98 @@ def validate_notes(notes: Optional[str]) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def _clean_name(value: Any, today: date) -> Tuple[Any, Optional[str]]:
+    """Validate and strip a name."""
+    if value is not None and not isinstance(value, str):
+        return None, "Name must be a string"
+    is_valid, error = validate_name(value)
+    if not is_valid:
+        return None, error
+    return value.strip(), None
+
+
+def _clean_notes(value: Any, today: date) -> Tuple[Any, Optional[str]]:
+    """Validate notes, storing empty notes as None."""
+    if value is not None and not isinstance(value, str):
+        return None, "Notes must be a string"
+    is_valid, error = validate_notes(value)
+    if not is_valid:
+        return None, error
+    return (value.strip() or None) if value else None, None
+
+
+# Friend payload schema: field -> (required on create, missing-field error, cleaner)
+# Fields are checked in this order, so the first error matches the old behaviour.
+FRIEND_SCHEMA = (
+    ('name', True, "Name is required", _clean_name),
+    ('date_of_birth', True, "Date of birth is required", parse_date_of_birth),
+    ('notes', False, None, _clean_notes),
+)
+
+
+def validate_friend_payload(data: dict, is_update: bool = False,
+                            today: Optional[date] = None) -> Tuple[Dict, Dict[str, str]]:
+    """
+    Validate a friend payload in one pass, collecting every field error.
+    
+    Args:
+        data: Dictionary containing friend data
+        is_update: If True, all fields are optional (for updates)
+        today: Reference date shared by all dates of the request
+        
+    Returns:
+        Tuple of (cleaned_data, errors). cleaned_data holds stripped strings and
+        date_of_birth as a parsed date; errors maps field names to messages.
+    """
+    if not isinstance(data, dict):
+        return {}, {'friend': "Friend must be a JSON object"}
+    
+    today = today or date.today()
+    cleaned = {}
+    errors = {}
+    
+    for field, required, missing_error, clean in FRIEND_SCHEMA:
+        if field not in data:
+            if required and not is_update:
+                errors[field] = missing_error
+            continue
+        
+        value, error = clean(data[field], today)
+        if error:
+            errors[field] = error
+        else:
+            cleaned[field] = value
+    
+    return cleaned, errors
+
+
+def validate_friend_batch(items: List[dict], is_update: bool = False,
+                          today: Optional[date] = None) -> Tuple[List[Dict], Dict[int, Dict[str, str]]]:
+    """
+    Validate a list of friend payloads with a single shared "today".
+    
+    Args:
+        items: List of friend payloads
+        is_update: If True, all fields are optional (for updates)
+        today: Reference date for the future check (defaults to today)
+        
+    Returns:
+        Tuple of (cleaned_items, errors_by_index)
+    """
+    today = today or date.today()
+    cleaned_items = []
+    errors_by_index = {}
+    
+    for index, data in enumerate(items):
+        cleaned, errors = validate_friend_payload(data, is_update, today)
+        if errors:
+            errors_by_index[index] = errors
+        else:
+            cleaned_items.append(cleaned)
+    
+    return cleaned_items, errors_by_index
+
+
 def validate_friend_data(data: dict, is_update: bool = False) -> Tuple[bool, Optional[str]]:
     """
     Validate friend data for create/update operations.
@@ -96,29 +208,7 @@ def validate_friend_data(data: dict, is_update: bool = False) -> Tuple[bool, Opt
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not is_update:
-        # For create operations, name and date_of_birth are required
-        if 'name' not in data:
-            return False, "Name is required"
-        if 'date_of_birth' not in data:
-            return False, "Date of birth is required"
-    
-    # Validate name if provided
-    if 'name' in data:
-        is_valid, error = validate_name(data['name'])
-        if not is_valid:
-            return False, error
-    
-    # Validate date_of_birth if provided
-    if 'date_of_birth' in data:
-        is_valid, error = validate_date_format(data['date_of_birth'])
-        if not is_valid:
-            return False, error
-    
-    # Validate notes if provided
-    if 'notes' in data:
-        is_valid, error = validate_notes(data['notes'])
-        if not is_valid:
-            return False, error
-    
+    _, errors = validate_friend_payload(data, is_update)
+    if errors:
+        return False, next(iter(errors.values()))
     return True, None
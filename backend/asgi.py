@@ -0,0 +1,17 @@
+"""
+ASGI entry point.
+Run this module under an ASGI server to serve the Flask app:
+
+    uvicorn asgi:asgi_app --workers 4
+
+Flask is synchronous, so each request runs on a thread from a pool of
+ASGI_THREADS (default 32) per worker process; that many Supabase and Gemini
+calls can be in flight per worker at once. run.py remains the WSGI entry point.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+
+app = create_app()
+asgi_app = WSGIMiddleware(app, workers=int(os.getenv('ASGI_THREADS', 32)))
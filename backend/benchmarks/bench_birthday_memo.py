@@ -0,0 +1,65 @@
+"""
+Benchmark for memoized birthday enrichment.
+Compares computing birthday fields per friend against the per-day memo.
+
+    python benchmarks/bench_birthday_memo.py [--friends 5000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.friend import Friend
+from app.services.birthday_service import BirthdayService
+
+
+def make_friends(count: int):
+    """Friends with birth dates spread like a real contact list (ages 5-90)."""
+    rng = random.Random(42)
+    today = date.today()
+    friends = []
+    for i in range(count):
+        dob = date.fromordinal(today.toordinal() - rng.randint(5 * 365, 90 * 365))
+        friends.append(Friend(str(i), 'user', f'Friend {i}', dob))
+    return friends
+
+
+def enrich_uncached(friends):
+    """Enrichment without the memo: every field recomputed for every friend."""
+    for friend in friends:
+        dob = friend.date_of_birth
+        next_birthday = BirthdayService.calculate_next_birthday(dob)
+        days_until = BirthdayService.calculate_days_until_birthday(next_birthday)
+        BirthdayService.calculate_age(dob)
+        BirthdayService.is_reminder_due(days_until)
+
+
+def enrich_memoized(friends):
+    """Enrichment through the per-day memo."""
+    for friend in friends:
+        BirthdayService.enrich_friend(friend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark birthday memoization')
+    parser.add_argument('--friends', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    friends = make_friends(args.friends)
+    uncached = min(timeit.repeat(lambda: enrich_uncached(friends), number=1, repeat=args.repeat))
+    memoized = min(timeit.repeat(lambda: enrich_memoized(friends), number=1, repeat=args.repeat))
+    
+    print(f"friends:        {args.friends}")
+    print(f"memo entries:   {sum(len(memo) for memo in BirthdayService._memos.values())}")
+    print(f"uncached:       {uncached * 1000:.2f} ms")
+    print(f"memoized:       {memoized * 1000:.2f} ms")
+    print(f"speedup:        {uncached / memoized:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Fake Supabase and Gemini backends for offline load tests.
+In-memory stand-ins for the parts of the SDKs the services use, with
+configurable latency so capacity numbers reflect time spent waiting on them.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+
+class LatencyModel:
+    """Log-normal latency around a median, plus a cost per row returned."""
+    
+    def __init__(self, median_ms: float, sigma: float = 0.5, per_row_us: float = 0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.per_row_us = per_row_us
+        self._rng = random.Random()
+    
+    def sleep(self, rows: int = 0):
+        if self.median_ms <= 0 and not rows:
+            return
+        delay = self.median_ms * math.exp(self._rng.gauss(0, self.sigma)) / 1000 if self.median_ms > 0 else 0
+        time.sleep(delay + rows * self.per_row_us / 1e6)
+
+
+class _Query:
+    """Subset of the postgrest query builder used by SupabaseService."""
+    
+    def __init__(self, db: 'FakeSupabaseClient', op: str, payload=None):
+        self.db = db
+        self.op = op
+        self.payload = payload
+        self.filters = []
+        self.user_id = None
+        self.row_limit = None
+    
+    def select(self, *args, **kwargs):
+        return self
+    
+    def eq(self, column, value):
+        if column == 'user_id':
+            self.user_id = value
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+    
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+    
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+    
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+    
+    def limit(self, count):
+        self.row_limit = count
+        return self
+    
+    def execute(self):
+        with self.db.lock:
+            data = self._apply()
+        self.db.latency.sleep(len(data))
+        return SimpleNamespace(data=data)
+    
+    def _candidates(self):
+        if self.user_id is not None:
+            return list(self.db.rows_by_user.get(self.user_id, {}).values())
+        return [row for rows in self.db.rows_by_user.values() for row in rows.values()]
+    
+    def _apply(self):
+        if self.op == 'insert':
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return [dict(self.db.add_row(row)) for row in rows]
+        
+        matched = [row for row in self._candidates() if all(f(row) for f in self.filters)]
+        if self.row_limit is not None:
+            matched = matched[:self.row_limit]
+        
+        if self.op == 'update':
+            for row in matched:
+                row.update(self.payload)
+        elif self.op == 'delete':
+            for row in matched:
+                del self.db.rows_by_user[row['user_id']][row['id']]
+        return [dict(row) for row in matched]
+
+
+class _Table:
+    def __init__(self, db: 'FakeSupabaseClient'):
+        self.db = db
+    
+    def select(self, *args, **kwargs):
+        return _Query(self.db, 'select')
+    
+    def insert(self, payload):
+        return _Query(self.db, 'insert', payload)
+    
+    def update(self, payload):
+        return _Query(self.db, 'update', payload)
+    
+    def delete(self):
+        return _Query(self.db, 'delete')
+
+
+class FakeSupabaseClient:
+    """In-memory friends table indexed by user."""
+    
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.rows_by_user = {}
+    
+    def table(self, name: str) -> _Table:
+        return _Table(self)
+    
+    def add_row(self, row: dict) -> dict:
+        """Insert a row, filling server-side defaults. Caller holds the lock (or is seeding)."""
+        now = datetime.utcnow().isoformat()
+        row = {'id': str(uuid.uuid4()), 'notes': None, 'created_at': now, 'updated_at': now, **row}
+        self.rows_by_user.setdefault(row['user_id'], {})[row['id']] = row
+        return row
+    
+    def friend_ids(self, user_id: str):
+        with self.lock:
+            return list(self.rows_by_user.get(user_id, {}))
+
+
+class FakeGeminiModel:
+    """Returns well-formed suggestion JSON after a simulated generation delay."""
+    
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+        self.calls = 0
+    
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        self.latency.sleep()
+        if 'planning_tips' in prompt:
+            items = [{'title': f'Celebration {i}', 'description': 'A small get-together',
+                      'planning_tips': 'Book early', 'estimated_budget': '$20-$50'} for i in range(5)]
+        else:
+            items = [{'title': f'Gift {i}', 'description': 'Something thoughtful',
+                      'reasoning': 'Matches their interests', 'estimated_price_range': '$20-$50'} for i in range(5)]
+        return SimpleNamespace(text=json.dumps(items))
+
+
+def make_fake_auth(latency: LatencyModel):
+    """
+    Build a replacement for auth.get_user_from_token.
+    
+    Tokens are the user ID itself ("Authorization: Bearer <user_id>"); the
+    latency stands in for Supabase's token verification call.
+    """
+    from flask import request
+    
+    def get_user_from_token():
+        parts = request.headers.get('Authorization', '').split()
+        if len(parts) != 2 or parts[0].lower() != 'bearer':
+            return None
+        latency.sleep()
+        return parts[1]
+    
+    return get_user_from_token
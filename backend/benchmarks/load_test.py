@@ -0,0 +1,303 @@
+"""
+Load test for the friends API.
+Serves the app over HTTP in-process against fake Supabase and Gemini backends,
+drives a weighted mix of friends and suggestions requests at a target rate
+and reports throughput and latency percentiles. Runs fully offline.
+
+    python benchmarks/load_test.py [--users 200] [--friends lognormal:40:1.0]
+                                   [--rps 100] [--duration 30] [--concurrency 64]
+                                   [--mix list=55,upcoming=15,get=10,create=6,update=6,delete=3,suggest=5]
+                                   [--max-p95 250] [--json]
+
+Latency is measured from each request's scheduled start, so time spent
+waiting for a free client thread counts (no coordinated omission).
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_backends import FakeGeminiModel, FakeSupabaseClient, LatencyModel, make_fake_auth
+
+DEFAULT_MIX = 'list=55,upcoming=15,get=10,create=6,update=6,delete=3,suggest=5'
+
+FIRST_NAMES = ['Ava', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farah', 'Gus', 'Hana', 'Ivan', 'Jade', 'Kofi', 'Lena']
+LAST_NAMES = ['Lee', 'Patel', 'Smith', 'Garcia', 'Kim', 'Nguyen', 'Okafor', 'Rossi', 'Silva', 'Weber']
+INTERESTS = ['hiking', 'coffee', 'board games', 'painting', 'jazz', 'cooking', 'yoga', 'football',
+             'sci-fi novels', 'gardening', 'photography', 'travel', 'chess', 'baking']
+RELATIONS = ['college roommate', 'coworker', 'sister', 'cousin', 'neighbor', 'old school friend']
+
+
+def parse_distribution(spec: str, rng: random.Random, cap: int):
+    """
+    Build a friend-list size sampler.
+    
+    Specs: fixed:N, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA
+    """
+    kind, *args = spec.split(':')
+    values = [float(arg) for arg in args]
+    if kind == 'fixed':
+        return lambda: min(cap, int(values[0]))
+    if kind == 'uniform':
+        return lambda: min(cap, rng.randint(int(values[0]), int(values[1])))
+    if kind == 'lognormal':
+        return lambda: min(cap, max(0, int(values[0] * math.exp(rng.gauss(0, values[1])))))
+    raise ValueError(f'Unknown distribution: {spec}')
+
+
+def parse_mix(spec: str):
+    """Parse "op=weight,..." into parallel operation and weight lists."""
+    pairs = [item.split('=') for item in spec.split(',') if item]
+    unknown = {op for op, _ in pairs} - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    return [op for op, _ in pairs], [float(weight) for _, weight in pairs]
+
+
+def random_friend(rng: random.Random) -> dict:
+    """A friend payload with an age of 1-90 and short notes."""
+    dob = date.today() - timedelta(days=rng.randint(365, 90 * 365))
+    notes = None
+    if rng.random() < 0.7:
+        notes = f"{rng.choice(RELATIONS)}, loves {' and '.join(rng.sample(INTERESTS, rng.randint(1, 3)))}"
+    return {
+        'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'date_of_birth': dob.isoformat(),
+        'notes': notes
+    }
+
+
+def seed(client: FakeSupabaseClient, users: int, sampler, rng: random.Random):
+    """Create synthetic users and their friends directly in the fake database."""
+    from app.services.supabase_service import SupabaseService
+    
+    user_ids = [f'loadtest-user-{i}' for i in range(users)]
+    total = 0
+    for user_id in user_ids:
+        for _ in range(sampler()):
+            client.add_row({'user_id': user_id, **SupabaseService._to_row(random_friend(rng))})
+            total += 1
+    return user_ids, total
+
+
+# Operation -> function(rng, user_id, client) returning (method, path, body) or None to skip
+OPERATIONS = {
+    'list': lambda rng, user, db: ('GET', '/api/v1/friends', None),
+    'upcoming': lambda rng, user, db: ('GET', '/api/v1/friends?upcoming=true', None),
+    'get': lambda rng, user, db: _with_friend(rng, user, db, lambda fid: ('GET', f'/api/v1/friends/{fid}', None)),
+    'create': lambda rng, user, db: ('POST', '/api/v1/friends', random_friend(rng)),
+    'update': lambda rng, user, db: _with_friend(
+        rng, user, db, lambda fid: ('PUT', f'/api/v1/friends/{fid}', {'notes': random_friend(rng)['notes'] or 'n/a'})),
+    'delete': lambda rng, user, db: _with_friend(rng, user, db, lambda fid: ('DELETE', f'/api/v1/friends/{fid}', None)),
+    'suggest': lambda rng, user, db: _with_friend(
+        rng, user, db, lambda fid: ('POST', f'/api/v1/friends/{fid}/suggestions',
+                                    {'suggestion_type': rng.choice(['gifts', 'events'])}))
+}
+
+
+def _with_friend(rng, user_id, db, build):
+    friend_ids = db.friend_ids(user_id)
+    return build(rng.choice(friend_ids)) if friend_ids else None
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def start_server(app):
+    """Serve the app on a free local port in a background thread (HTTP/1.1 keep-alive)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    
+    class Handler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(args) -> dict:
+    """Set up the app and fakes, run the load and return the report."""
+    # Settings read when app.config is imported
+    os.environ.setdefault('SUPABASE_URL', 'http://fake-supabase.local')
+    os.environ.setdefault('SUPABASE_KEY', 'loadtest')
+    os.environ.setdefault('GEMINI_API_KEY', 'loadtest')
+    os.environ['PRELOAD_CLIENTS'] = 'false'
+    os.environ['CHANGE_FEED'] = 'none'
+    os.environ['RATE_LIMIT_ENABLED'] = 'true' if args.rate_limits else 'false'
+    os.environ['JOB_QUEUE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'jobs.sqlite3')
+    
+    import logging
+    import app.middleware.auth as auth
+    from app import create_app
+    from app.services.model_router import ModelRouter
+    from app.services.supabase_service import SupabaseService
+    
+    rng = random.Random(args.seed)
+    db = FakeSupabaseClient(LatencyModel(args.db_latency, per_row_us=args.db_row_us))
+    model = FakeGeminiModel(LatencyModel(args.ai_latency, sigma=0.3))
+    auth.get_user_from_token = make_fake_auth(LatencyModel(args.auth_latency))
+    
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    SupabaseService._client = db
+    ModelRouter.set_models({'fake-gemini': model})
+    
+    user_ids, friend_count = seed(db, args.users, parse_distribution(args.friends, rng, args.max_friends), rng)
+    operations, weights = parse_mix(args.mix)
+    server = start_server(app)
+    port = server.server_port
+    
+    local = threading.local()
+    results = {op: [] for op in operations}
+    errors = {op: 0 for op in operations}
+    results_lock = threading.Lock()
+    
+    def connection():
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        return conn
+    
+    def send(op, request, user_id, scheduled):
+        method, path, body = request
+        headers = {'Authorization': f'Bearer {user_id}', 'Accept-Encoding': 'identity'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        ok = False
+        try:
+            conn = connection()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 500
+        except Exception:
+            local.conn = None
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with results_lock:
+            results[op].append(elapsed)
+            if not ok:
+                errors[op] += 1
+    
+    skipped = 0
+    pool = ThreadPoolExecutor(max_workers=args.concurrency)
+    start = time.perf_counter()
+    next_at = start
+    end = start + args.duration
+    
+    # Open loop: Poisson arrivals at the target rate regardless of response times
+    while next_at < end:
+        now = time.perf_counter()
+        if next_at > now:
+            time.sleep(next_at - now)
+        op = rng.choices(operations, weights)[0]
+        user_id = rng.choice(user_ids)
+        request = OPERATIONS[op](rng, user_id, db)
+        if request is None:
+            skipped += 1
+        else:
+            pool.submit(send, op, request, user_id, next_at)
+        next_at += rng.expovariate(args.rps)
+    
+    pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    
+    def summarize(values, error_count):
+        values = sorted(values)
+        return {
+            'requests': len(values),
+            'errors': error_count,
+            'p50_ms': round(percentile(values, 50), 1),
+            'p90_ms': round(percentile(values, 90), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+            'max_ms': round(values[-1], 1) if values else 0.0
+        }
+    
+    all_latencies = [value for values in results.values() for value in values]
+    return {
+        'config': {
+            'users': args.users, 'friends': friend_count, 'target_rps': args.rps,
+            'duration_s': args.duration, 'concurrency': args.concurrency, 'mix': args.mix,
+            'db_latency_ms': args.db_latency, 'ai_latency_ms': args.ai_latency, 'auth_latency_ms': args.auth_latency
+        },
+        'throughput_rps': round(len(all_latencies) / elapsed, 1),
+        'skipped': skipped,
+        'gemini_calls': model.calls,
+        'overall': summarize(all_latencies, sum(errors.values())),
+        'operations': {op: summarize(results[op], errors[op]) for op in operations}
+    }
+
+
+def print_report(report: dict):
+    """Print the report as a table."""
+    config = report['config']
+    print(f"{config['users']} users, {config['friends']} friends, target {config['target_rps']} rps "
+          f"for {config['duration_s']}s with {config['concurrency']} clients")
+    print(f"Throughput: {report['throughput_rps']} rps, Gemini calls: {report['gemini_calls']}, "
+          f"skipped: {report['skipped']}\n")
+    header = f"{'operation':<10} {'requests':>8} {'errors':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['operations'].items()) + [('overall', report['overall'])]
+    for op, stats in rows:
+        print(f"{op:<10} {stats['requests']:>8} {stats['errors']:>6} {stats['p50_ms']:>8} {stats['p90_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for the friends API')
+    parser.add_argument('--users', type=int, default=200, help='Synthetic users')
+    parser.add_argument('--friends', default='lognormal:40:1.0',
+                        help='Friends per user: fixed:N, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--max-friends', type=int, default=5000, help='Cap on friends per user')
+    parser.add_argument('--rps', type=float, default=100, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--concurrency', type=int, default=64, help='Client threads')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Operation weights')
+    parser.add_argument('--db-latency', type=float, default=15, help='Median Supabase latency (ms)')
+    parser.add_argument('--db-row-us', type=float, default=5, help='Supabase cost per returned row (us)')
+    parser.add_argument('--ai-latency', type=float, default=1500, help='Median Gemini latency (ms)')
+    parser.add_argument('--auth-latency', type=float, default=10, help='Median token verification latency (ms)')
+    parser.add_argument('--rate-limits', action='store_true', help='Keep per-user rate limiting on')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--max-p95', type=float, help='Exit with status 1 if overall p95 (ms) exceeds this')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Exit with status 1 above this error rate')
+    args = parser.parse_args()
+    
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    
+    overall = report['overall']
+    error_rate = overall['errors'] / overall['requests'] if overall['requests'] else 0
+    if (args.max_p95 is not None and overall['p95_ms'] > args.max_p95) or error_rate > args.max_error_rate:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
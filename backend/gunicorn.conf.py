@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration.
+Selects the serving mode from environment variables:
+
+    SERVER_MODE=sync    one request per worker process (default, current behaviour)
+    SERVER_MODE=async   gevent workers multiplexing many in-flight requests per process
+
+Set PRELOAD_APP=true to build the app before workers fork.
+
+Run with: gunicorn -c gunicorn.conf.py run:app
+"""
+import multiprocessing
+import os
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'sync').lower()
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Load the app (and its shared clients, see PRELOAD_CLIENTS) once in the master
+# process so forked workers start warm and share the imported code pages
+preload_app = os.getenv('PRELOAD_APP', 'false').lower() == 'true'
+
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+if SERVER_MODE == 'async':
+    # Supabase (httpx) and Gemini (gRPC) calls yield to other requests while waiting
+    worker_class = 'gevent'
+    worker_connections = int(os.getenv('WORKER_CONNECTIONS', 500))
+    # I/O-bound workers gain nothing from one process per core beyond the first
+    workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() + 1))
+else:
+    worker_class = 'sync'
+
+
+def post_worker_init(worker):
+    """Make gRPC cooperative so Gemini calls do not block the gevent hub."""
+    if worker_class == 'gevent':
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
@@ -0,0 +1,18 @@
+-- Denormalized birthday columns for index-friendly birthday window queries.
+-- birth_doy is the day-of-year ordinal in a non-leap reference year
+-- (Feb 29 is stored as Feb 28, matching how next birthdays are celebrated).
+
+ALTER TABLE friends
+    ADD COLUMN IF NOT EXISTS birth_month SMALLINT,
+    ADD COLUMN IF NOT EXISTS birth_day SMALLINT,
+    ADD COLUMN IF NOT EXISTS birth_doy SMALLINT;
+
+ALTER TABLE friends
+    ADD CONSTRAINT valid_birth_month CHECK (birth_month BETWEEN 1 AND 12),
+    ADD CONSTRAINT valid_birth_day CHECK (birth_day BETWEEN 1 AND 31),
+    ADD CONSTRAINT valid_birth_doy CHECK (birth_doy BETWEEN 1 AND 365);
+
+CREATE INDEX IF NOT EXISTS idx_friends_user_doy ON friends(user_id, birth_doy);
+
+-- After deploying, backfill existing rows:
+--   python migrations/backfill_birthday_columns.py
@@ -0,0 +1,6 @@
+-- Publish friends row changes to Supabase Realtime (used by CHANGE_FEED=supabase).
+ALTER PUBLICATION supabase_realtime ADD TABLE friends;
+
+-- Include every column of deleted rows in DELETE events, so caches can find
+-- the owning user without a lookup.
+ALTER TABLE friends REPLICA IDENTITY FULL;
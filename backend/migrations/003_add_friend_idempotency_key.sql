@@ -0,0 +1,9 @@
+-- Client-supplied Idempotency-Key of the POST /friends request that created a row.
+-- The unique index makes retried creates upsert onto the original row instead
+-- of inserting duplicates (NULL keys never conflict, so keyless creates are unaffected).
+
+ALTER TABLE friends
+    ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_friends_user_idempotency_key
+    ON friends(user_id, idempotency_key);
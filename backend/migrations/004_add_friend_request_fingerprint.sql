@@ -0,0 +1,6 @@
+-- Fingerprint (SHA-256 of the JSON body) of the POST /friends request that created a row.
+-- A retry that reaches another worker compares it to detect an Idempotency-Key reused
+-- with a different body. Rows without one (created before this migration) are not checked.
+
+ALTER TABLE friends
+    ADD COLUMN IF NOT EXISTS request_fingerprint TEXT;
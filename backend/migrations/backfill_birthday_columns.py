@@ -0,0 +1,31 @@
+"""
+Backfill denormalized birthday columns.
+Run this once after applying 001_add_birthday_columns.sql.
+
+SUPABASE_KEY must be a service role key so row level security
+does not hide other users' friends.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.supabase_service import SupabaseService
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill birth_month, birth_day and birth_doy')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows fetched per batch')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        updated = SupabaseService.backfill_birthday_columns(batch_size=args.batch_size)
+    
+    print(f"Backfilled {updated} friends")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,23 @@
 """
 Application entry point.
 Run this file to start the Flask development server.
+
+    python run.py                   # development server
+    python run.py --startup-report  # print a cold-start import time breakdown
 """
+import argparse
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    parser = argparse.ArgumentParser(description='Birthday Reminder API')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='Profile create_app() imports and exit')
+    args = parser.parse_args()
+    
+    if args.startup_report:
+        from app.utils.startup import profile_startup, format_startup_report
+        print(format_startup_report(*profile_startup()))
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,33 @@
+"""
+Shared pytest fixtures.
+Run from backend/: pytest tests/ -v
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.idempotency_store import IdempotencyStore
+from app.services.model_router import ModelRouter
+from app.services.search_index import SearchIndex
+
+
+@pytest.fixture(autouse=True)
+def reset_services():
+    """Give each test fresh class-level service state and restore it afterwards."""
+    router = (ModelRouter.routes, ModelRouter.cost_budget, ModelRouter.probe_interval)
+    store = (IdempotencyStore.ttl_seconds, IdempotencyStore.max_keys)
+    index = (SearchIndex.enabled, SearchIndex.ttl_seconds, SearchIndex.max_users, SearchIndex.fuzzy_threshold)
+    
+    IdempotencyStore._records.clear()
+    SearchIndex.clear()
+    yield
+    
+    ModelRouter.routes, ModelRouter.cost_budget, ModelRouter.probe_interval = router
+    ModelRouter._window_start = ModelRouter._window_cost = 0.0
+    IdempotencyStore.configure(*store)
+    IdempotencyStore._records.clear()
+    SearchIndex.configure(*index)
+    SearchIndex.clear()
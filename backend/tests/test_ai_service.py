@@ -0,0 +1,54 @@
+"""Tests for caching generated AI suggestions."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.model_router import STUB_MODEL, ModelRouter, StubModel
+from app.services.suggestion_cache import SuggestionCache
+
+GIFTS = [
+    {'title': 'Trail map', 'description': 'For hikes', 'reasoning': 'Loves hiking', 'estimated_price_range': '$20'}
+]
+
+
+class FakeModel:
+    """Model double that answers with fixed gift suggestions."""
+    
+    def generate_content(self, prompt):
+        return SimpleNamespace(text=json.dumps(GIFTS))
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    SuggestionCache.configure(True, 3600, 100, 0.85, False)
+    SuggestionCache.clear()
+    yield
+    SuggestionCache.clear()
+    SuggestionCache.configure(False, 7 * 24 * 3600, 5000, 0.85, False)
+
+
+def get_gifts():
+    return AIService.get_suggestions('gifts', 'Anna', 30, 'loves hiking', 'user-1')
+
+
+def test_model_output_is_cached():
+    ModelRouter.set_models({'gemini-pro': FakeModel()})
+    
+    assert get_gifts() == (GIFTS, None)
+    
+    suggestions, tier = get_gifts()
+    assert tier == SuggestionCache.EXACT
+    assert suggestions[0]['title'] == 'Trail map'
+
+
+def test_stub_output_is_not_cached():
+    ModelRouter.set_models({STUB_MODEL: StubModel()})
+    
+    suggestions, tier = get_gifts()
+    
+    assert tier is None
+    assert suggestions[0]['title'] == 'Gift idea 1'
+    assert get_gifts()[1] is None
+    assert SuggestionCache.get_stats()['entries'] == 0
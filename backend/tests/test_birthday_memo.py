@@ -0,0 +1,59 @@
+"""Tests for the per-day memo of birthday fields."""
+from datetime import date
+
+import pytest
+
+from app.services.birthday_service import BirthdayService
+
+
+@pytest.fixture(autouse=True)
+def memos(monkeypatch):
+    monkeypatch.setattr(BirthdayService, '_memos', {})
+
+
+def test_fields_match_the_uncached_calculation():
+    today = date(2026, 10, 19)
+    dob = date(1990, 10, 21)
+    
+    assert BirthdayService.get_birthday_fields(dob, today) == (35, date(2026, 10, 21), 2, True)
+    assert BirthdayService.get_birthday_fields(dob, today) == (35, date(2026, 10, 21), 2, True)
+
+
+def test_same_birth_date_is_computed_once(monkeypatch):
+    today = date(2026, 10, 19)
+    calls = []
+    calculate = BirthdayService.calculate_next_birthday
+    monkeypatch.setattr(BirthdayService, 'calculate_next_birthday',
+                        staticmethod(lambda *args: calls.append(args) or calculate(*args)))
+    
+    for _ in range(3):
+        BirthdayService.get_birthday_fields(date(1990, 1, 5), today)
+    BirthdayService.get_birthday_fields(date(1991, 1, 5), today)
+    
+    assert len(calls) == 2
+
+
+def test_feb_29_is_celebrated_on_feb_28_outside_leap_years():
+    _, next_birthday, days_until, _ = BirthdayService.get_birthday_fields(date(1992, 2, 29), date(2026, 2, 1))
+    assert (next_birthday, days_until) == (date(2026, 2, 28), 27)
+    
+    _, next_birthday, _, _ = BirthdayService.get_birthday_fields(date(1992, 2, 29), date(2027, 3, 1))
+    assert next_birthday == date(2028, 2, 29)
+
+
+def test_only_the_newest_days_are_kept():
+    for day in range(1, 6):
+        BirthdayService.get_birthday_fields(date(1990, 1, 1), date(2026, 10, day))
+    
+    assert sorted(BirthdayService._memos) == [date(2026, 10, day) for day in range(3, 6)]
+
+
+def test_memo_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(BirthdayService, 'MEMO_MAX_SIZE', 2)
+    today = date(2026, 10, 19)
+    
+    for day in range(1, 5):
+        fields = BirthdayService.get_birthday_fields(date(1990, 1, day), today)
+        assert fields[1] == date(2027, 1, day)
+    
+    assert len(BirthdayService._memos[today]) == 2
@@ -0,0 +1,205 @@
+"""Tests for birthday ordinals, ordinal windows, backfill and paged reads."""
+from collections import OrderedDict
+from datetime import date
+
+import pytest
+
+from app.models.friend import Friend
+from app.services.birthday_service import BirthdayService
+from app.services.supabase_service import SupabaseService
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Just enough of the PostgREST query builder for the friends table."""
+    
+    def __init__(self, rows, payload=None):
+        self.rows = rows
+        self.payload = payload
+        self.filters = []
+        self.orders = []
+        self.head = False
+        self.bounds = None
+    
+    def select(self, columns, count=None, head=False):
+        self.head = head
+        return self
+    
+    def _filter(self, test):
+        self.filters.append(test)
+        return self
+    
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value)
+    
+    def gt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+    
+    def gte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] >= value)
+    
+    def lt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] < value)
+    
+    def is_(self, column, value):
+        return self._filter(lambda row: row.get(column) is None)
+    
+    def order(self, column):
+        self.orders.append(column)
+        return self
+    
+    def limit(self, count):
+        self.bounds = (0, count - 1)
+        return self
+    
+    def range(self, first, last):
+        self.bounds = (first, last)
+        return self
+    
+    def execute(self):
+        matched = [row for row in self.rows if all(test(row) for test in self.filters)]
+        if self.payload is not None:
+            for row in matched:
+                row.update(self.payload)
+            return FakeResponse([dict(row) for row in matched])
+        if self.head:
+            return FakeResponse([], len(matched))
+        
+        matched.sort(key=lambda row: tuple(row[column] for column in self.orders))
+        if self.bounds:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+        return FakeResponse([dict(row) for row in matched], len(matched))
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def select(self, columns, **kwargs):
+        return FakeQuery(self.rows).select(columns, **kwargs)
+    
+    def update(self, payload):
+        return FakeQuery(self.rows, payload)
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def table(self, name):
+        return FakeTable(self.rows)
+
+
+def row(friend_id, name, dob, backfilled=True):
+    data = {'id': friend_id, 'user_id': 'user-1', 'name': name, 'date_of_birth': dob,
+            'birth_month': None, 'birth_day': None, 'birth_doy': None}
+    if backfilled:
+        data.update(BirthdayService.get_birthday_columns(dob))
+    return data
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient([])
+    monkeypatch.setattr(SupabaseService, '_client', client)
+    monkeypatch.setattr(SupabaseService, '_last_good', OrderedDict())
+    return client
+
+
+def test_birthday_ordinal():
+    assert BirthdayService.birthday_ordinal(1, 1) == 1
+    assert BirthdayService.birthday_ordinal(3, 1) == 60
+    assert BirthdayService.birthday_ordinal(12, 31) == 365
+
+
+def test_feb_29_shares_the_feb_28_ordinal():
+    assert BirthdayService.birthday_ordinal(2, 29) == BirthdayService.birthday_ordinal(2, 28) == 59
+
+
+def test_birthday_columns_from_string_and_date():
+    expected = {'birth_month': 2, 'birth_day': 29, 'birth_doy': 59}
+    
+    assert BirthdayService.get_birthday_columns('2000-02-29') == expected
+    assert BirthdayService.get_birthday_columns(date(2000, 2, 29)) == expected
+
+
+def test_ordinal_window_within_the_year():
+    assert BirthdayService.get_ordinal_window(30, date(2026, 3, 1)) == [(60, 91)]
+
+
+def test_ordinal_window_wraps_the_year_end():
+    assert BirthdayService.get_ordinal_window(7, date(2026, 12, 28)) == [(362, 365), (1, 5)]
+
+
+def test_ordinal_window_covering_the_whole_year():
+    assert BirthdayService.get_ordinal_window(364, date(2026, 6, 1)) == [(1, 365)]
+
+
+def test_ordinal_window_covers_every_birthday_in_range():
+    today = date(2027, 12, 20)
+    ranges = BirthdayService.get_ordinal_window(30, today)
+    
+    # Includes Feb 29 birthdays around a leap year and dates across the year end
+    for dob in (date(1990, 12, 20), date(1990, 1, 1), date(1992, 1, 19)):
+        columns = BirthdayService.get_birthday_columns(dob)
+        assert any(start <= columns['birth_doy'] <= end for start, end in ranges)
+
+
+def test_next_birthday_key_orders_feb_28_before_feb_29():
+    today = date(2026, 3, 1)
+    feb_29 = BirthdayService.enrich_friend(Friend('1', 'user-1', 'Anna', date(2000, 2, 29)), today)
+    feb_28 = BirthdayService.enrich_friend(Friend('2', 'user-1', 'Zoe', date(2000, 2, 28)), today)
+    
+    # Both are celebrated on Feb 28 next year; the birth day decides as in the database
+    assert feb_29.days_until_birthday == feb_28.days_until_birthday
+    assert BirthdayService.next_birthday_key(feb_28) < BirthdayService.next_birthday_key(feb_29)
+
+
+def test_backfill_fills_missing_columns(client):
+    client.rows.extend([
+        row('1', 'Anna', '1992-02-29', backfilled=False),
+        row('2', 'Ben', '1985-12-31', backfilled=False),
+        row('3', 'Cleo', '1970-01-01'),
+    ])
+    
+    assert SupabaseService.backfill_birthday_columns(batch_size=1) == 2
+    assert [r['birth_doy'] for r in client.rows] == [59, 365, 1]
+    assert SupabaseService.backfill_birthday_columns() == 0
+
+
+def test_page_order_matches_the_full_list(client):
+    client.rows.extend(
+        row(str(i), name, dob) for i, (name, dob) in enumerate([
+            ('Anna', '2000-02-29'), ('Ben', '1990-02-28'), ('Cleo', '1980-03-01'),
+            ('Dan', '1970-06-15'), ('Eve', '1995-06-15'), ('Finn', '1988-01-10'),
+            ('Gus', '1999-12-31'), ('Hana', '2001-03-02'),
+        ])
+    )
+    today = date(2026, 3, 2)
+    
+    full = sorted(
+        (BirthdayService.enrich_friend(friend, today) for friend in SupabaseService.get_friends('user-1')),
+        key=BirthdayService.next_birthday_key
+    )
+    
+    paged = []
+    for offset in range(0, len(client.rows), 3):
+        page, total = SupabaseService.get_friends_page('user-1', offset, 3, today)
+        assert total == len(client.rows)
+        paged += [friend.name for friend in page]
+    
+    assert paged == [enriched.name for enriched in full]
+
+
+def test_page_falls_back_to_the_full_list_before_backfill(client):
+    client.rows.extend([row('1', 'Anna', '1990-05-01'), row('2', 'Ben', '1990-04-01', backfilled=False)])
+    
+    friends, total = SupabaseService.get_friends_page('user-1', 0, 1, date(2026, 3, 2))
+    
+    assert total is None
+    assert {friend.name for friend in friends} == {'Anna', 'Ben'}
@@ -0,0 +1,59 @@
+"""Tests for the one-pass dashboard summary."""
+from datetime import date
+
+from app.models.friend import Friend
+from app.services.birthday_service import BirthdayService
+
+TODAY = date(2026, 10, 19)
+
+FRIENDS = [
+    Friend('1', 'user-1', 'Anna', date(1990, 10, 19)),   # today
+    Friend('2', 'user-1', 'Ben', date(1985, 10, 21)),    # in 2 days, reminder due
+    Friend('3', 'user-1', 'Cleo', date(2000, 11, 10)),   # in 22 days
+    Friend('4', 'user-1', 'Dan', date(1970, 10, 18)),    # in 364 days
+    Friend('5', 'user-1', 'Abe', date(1995, 10, 21)),    # same day as Ben
+]
+
+
+def test_counts():
+    counts, _ = BirthdayService.summarize(FRIENDS, 30, 5, TODAY)
+    
+    assert counts['total'] == 5
+    assert counts['birthdays_today'] == 1
+    assert counts['reminders_due'] == 3
+    assert counts['upcoming'] == 4
+    assert counts['by_month'][9] == 4
+    assert counts['by_month'][10] == 1
+    assert sum(counts['by_month']) == 5
+
+
+def test_next_birthdays_match_the_full_sort():
+    expected = sorted(
+        (BirthdayService.enrich_friend(friend, TODAY) for friend in FRIENDS),
+        key=BirthdayService.next_birthday_key
+    )
+    
+    for next_count in range(len(FRIENDS) + 2):
+        _, next_birthdays = BirthdayService.summarize(FRIENDS, 30, next_count, TODAY)
+        assert [e.name for e in next_birthdays] == [e.name for e in expected[:next_count]]
+
+
+def test_ties_are_broken_by_name():
+    _, next_birthdays = BirthdayService.summarize(FRIENDS, 30, 3, TODAY)
+    
+    assert [e.name for e in next_birthdays] == ['Anna', 'Abe', 'Ben']
+    assert next_birthdays[0].days_until_birthday == 0
+
+
+def test_empty_list():
+    counts, next_birthdays = BirthdayService.summarize([], 30, 5, TODAY)
+    
+    assert counts == {'total': 0, 'birthdays_today': 0, 'reminders_due': 0, 'upcoming': 0, 'by_month': [0] * 12}
+    assert next_birthdays == []
+
+
+def test_accepts_a_generator():
+    counts, next_birthdays = BirthdayService.summarize(iter(FRIENDS), 30, 1, TODAY)
+    
+    assert counts['total'] == 5
+    assert [e.name for e in next_birthdays] == ['Anna']
@@ -0,0 +1,121 @@
+"""Tests for the iCalendar feed."""
+from datetime import date
+
+import pytest
+from flask import Flask
+
+from app.models.friend import Friend
+from app.routes.calendar import calendar_bp
+from app.services.calendar_feed import CalendarFeed, feed_etag, fold_line, render_event
+from app.services.supabase_service import SupabaseService
+
+FRIENDS = [
+    Friend('f-1', 'user-1', 'Anna', date(1992, 2, 29), 'Likes tea, cake; and jazz', '2026-01-01T00:00:00Z'),
+    Friend('f-2', 'user-1', 'Ben', date(1990, 5, 1)),
+]
+
+
+def test_short_lines_are_not_folded():
+    assert fold_line('SUMMARY:Anna') == 'SUMMARY:Anna\r\n'
+
+
+def test_long_lines_fold_at_75_octets():
+    folded = fold_line('DESCRIPTION:' + 'x' * 200)
+    lines = folded[:-2].split('\r\n')
+    
+    assert all(len(line.encode()) <= 75 for line in lines)
+    assert all(line.startswith(' ') for line in lines[1:])
+    assert ''.join(line[1:] if i else line for i, line in enumerate(lines)) == 'DESCRIPTION:' + 'x' * 200
+
+
+def test_folding_never_splits_a_utf8_character():
+    line = 'SUMMARY:' + 'é' * 100
+    lines = fold_line(line)[:-2].split('\r\n')
+    
+    assert all(len(part.encode()) <= 75 for part in lines)
+    assert ''.join(part[1:] if i else part for i, part in enumerate(lines)) == line
+
+
+def test_feb_29_recurs_on_the_last_day_of_february():
+    event = render_event(FRIENDS[0])
+    
+    assert 'DTSTART;VALUE=DATE:19920229\r\n' in event
+    assert 'RRULE:FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=-1\r\n' in event
+    assert 'RRULE:FREQ=YEARLY\r\n' in render_event(FRIENDS[1])
+
+
+def test_event_text_is_escaped():
+    event = render_event(FRIENDS[0])
+    
+    assert 'DESCRIPTION:Born 1992\\n\\nLikes tea\\, cake\\; and jazz\r\n' in event
+    assert 'DTSTAMP:20260101T000000Z\r\n' in event
+
+
+def test_etag_changes_with_rendered_fields():
+    renamed = [Friend('f-1', 'user-1', 'Anne', date(1992, 2, 29)), FRIENDS[1]]
+    
+    assert feed_etag(FRIENDS) == feed_etag(list(reversed(FRIENDS)))
+    assert feed_etag(FRIENDS) != feed_etag(renamed)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    CalendarFeed.configure(True, 3600, 100, 3600, 'feed-secret')
+    CalendarFeed.clear()
+    reads = []
+    monkeypatch.setattr(SupabaseService, 'get_friends', classmethod(lambda cls, user_id: reads.append(user_id) or FRIENDS))
+    monkeypatch.setattr(SupabaseService, 'served_stale', classmethod(lambda cls: False))
+    
+    app = Flask(__name__)
+    app.config['RATE_LIMIT_ENABLED'] = False
+    app.register_blueprint(calendar_bp, url_prefix='/api/v1')
+    client = app.test_client()
+    client.reads = reads
+    yield client
+    CalendarFeed.clear()
+    CalendarFeed.configure(True, 3600, 1000, 3600, '')
+
+
+def feed_url(user_id='user-1'):
+    return f'/api/v1/calendar/{CalendarFeed.make_token(user_id)}.ics'
+
+
+def test_feed_is_served_then_revalidated(client):
+    response = client.get(feed_url())
+    body = response.get_data(as_text=True)
+    etag, _ = response.get_etag()
+    # The server closes the streamed body, which ends the render
+    response.close()
+    assert CalendarFeed._renders == {}
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/calendar'
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert body.count('BEGIN:VEVENT') == 2
+    assert etag == feed_etag(FRIENDS)
+    
+    response = client.get(feed_url(), headers={'If-None-Match': f'"{etag}"'})
+    
+    assert response.status_code == 304
+    assert response.get_etag() == (etag, False)
+    assert client.reads == ['user-1']
+
+
+def test_uncached_poll_with_a_current_etag_gets_304(client):
+    response = client.get(feed_url(), headers={'If-None-Match': f'"{feed_etag(FRIENDS)}-gzip"'})
+    
+    assert response.status_code == 304
+    assert response.get_etag()[0] == f'{feed_etag(FRIENDS)}-gzip'
+
+
+def test_outdated_etag_gets_the_feed(client):
+    response = client.get(feed_url(), headers={'If-None-Match': '"outdated"'})
+    
+    assert response.status_code == 200
+
+
+def test_invalid_token_is_not_found(client):
+    token = CalendarFeed.make_token('user-1')
+    
+    assert client.get(f'/api/v1/calendar/user-2.{token.partition(".")[2]}.ics').status_code == 404
+    assert client.get('/api/v1/calendar/user-1.ics').status_code == 404
@@ -0,0 +1,131 @@
+"""Tests for the change feed and the friend cache it keeps fresh."""
+
+import pytest
+
+from app.models.friend import Friend
+from app.services.change_feed import ChangeEvent, ChangeFeed, LocalChangeSource, SupabaseChangeSource
+from app.services.friend_cache import FriendCache
+
+
+def record(friend_id, name='Anna', user_id='user-1', dob='1990-05-01'):
+    return {'id': friend_id, 'user_id': user_id, 'name': name, 'date_of_birth': dob}
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(ChangeFeed, '_handlers', [])
+    monkeypatch.setattr(ChangeFeed, '_reset_handlers', [])
+    monkeypatch.setattr(ChangeFeed, '_stats', {'events': 0, 'handler_errors': 0, 'disconnects': 0, 'resets': 0})
+    monkeypatch.setattr(ChangeFeed, '_state', ChangeFeed.STOPPED)
+    
+    FriendCache.configure(True, 3600, 100)
+    FriendCache.clear()
+    FriendCache.set_friends('user-1', [Friend.from_row(record('1'))])
+    ChangeFeed.subscribe(FriendCache.apply_change, FriendCache.clear)
+    yield
+    FriendCache.clear()
+    FriendCache.configure(False, 3600, 10000)
+
+
+def names(user_id='user-1'):
+    return sorted(friend.name for friend in FriendCache.get_friends(user_id) or [])
+
+
+def test_insert_update_and_delete_are_applied():
+    source = LocalChangeSource(ChangeFeed.publish, ChangeFeed.set_state)
+    
+    source.insert(record('2', 'Ben'))
+    source.update(record('1', 'Anne'))
+    assert names() == ['Anne', 'Ben']
+    
+    source.delete({'id': '2'})
+    assert names() == ['Anne']
+    assert FriendCache.get_stats()['changes_applied'] == 3
+
+
+def test_update_moves_the_birthday_index():
+    ChangeFeed.publish(ChangeEvent('UPDATE', record('1', dob='1990-12-24')))
+    
+    assert FriendCache.get_friends_in_window('user-1', [(121, 121)]) == []
+    assert [f.name for f in FriendCache.get_friends_in_window('user-1', [(358, 358)])] == ['Anna']
+
+
+def test_friend_moved_to_another_user_leaves_the_old_entry():
+    FriendCache.set_friends('user-2', [])
+    
+    ChangeFeed.publish(ChangeEvent('UPDATE', record('1', user_id='user-2')))
+    
+    assert names('user-1') == []
+    assert names('user-2') == ['Anna']
+
+
+def test_events_for_uncached_users_are_ignored():
+    ChangeFeed.publish(ChangeEvent('INSERT', record('9', user_id='user-9')))
+    
+    assert not FriendCache.is_cached('user-9')
+
+
+def test_unreadable_event_drops_the_users_entry():
+    ChangeFeed.publish(ChangeEvent('UPDATE', {'id': '1', 'user_id': 'user-1', 'name': 'Anna', 'date_of_birth': 'bad'}))
+    
+    assert not FriendCache.is_cached('user-1')
+    assert ChangeFeed.get_stats()['handler_errors'] == 0
+
+
+def test_change_during_a_fill_keeps_the_fill_out_of_the_cache():
+    FriendCache.invalidate('user-1')
+    version = FriendCache.begin_fill('user-1')
+    ChangeFeed.publish(ChangeEvent('DELETE', old_record={'id': '1', 'user_id': 'user-1'}))
+    FriendCache.set_friends('user-1', [Friend.from_row(record('1'))], version)
+    FriendCache.end_fill('user-1')
+    
+    assert not FriendCache.is_cached('user-1')
+
+
+def test_disconnect_clears_caches_and_is_reported():
+    ChangeFeed.set_state(ChangeFeed.DISCONNECTED)
+    
+    assert not FriendCache.is_cached('user-1')
+    stats = ChangeFeed.get_stats()
+    assert (stats['state'], stats['disconnects']) == ('disconnected', 1)
+    
+    FriendCache.set_friends('user-1', [Friend.from_row(record('1'))])
+    ChangeFeed.set_state(ChangeFeed.SUBSCRIBED)
+    
+    # Filled while disconnected: may have missed events, so dropped again
+    assert not FriendCache.is_cached('user-1')
+    assert ChangeFeed.get_stats()['state'] == 'subscribed'
+
+
+def test_connecting_keeps_caches():
+    ChangeFeed.set_state(ChangeFeed.CONNECTING)
+    
+    assert FriendCache.is_cached('user-1')
+
+
+class FakeLoop:
+    def __init__(self):
+        self.scheduled = []
+    
+    def call_later(self, delay, callback):
+        self.scheduled.append(delay)
+
+
+def test_failed_channel_is_retried_with_backoff():
+    source = SupabaseChangeSource(ChangeFeed.publish, ChangeFeed.set_state, 'https://x.supabase.co', 'key')
+    source._loop = FakeLoop()
+    
+    for status in ('CHANNEL_ERROR', 'CLOSED'):
+        source._on_status(status, RuntimeError('socket closed'))
+    # One retry is scheduled for both statuses of the same failure
+    assert source._loop.scheduled == [1.0]
+    
+    for _ in range(6):
+        source._retry_pending = False
+        source._on_status('TIMED_OUT')
+    assert source._loop.scheduled == [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+    assert ChangeFeed.get_stats()['disconnects'] == 8
+    
+    source._on_status('SUBSCRIBED')
+    assert source._failures == 0
+    assert ChangeFeed.get_stats()['state'] == 'subscribed'
@@ -0,0 +1,63 @@
+"""Tests for the consecutive-failure circuit breaker."""
+import time
+
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker('upstream', failure_threshold=3, reset_timeout=30)
+    
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    
+    breaker.record_failure()
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker('upstream', failure_threshold=2, reset_timeout=30)
+    
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    
+    assert breaker.allow()
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker('upstream', failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_circuit():
+    breaker = CircuitBreaker('upstream', failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    
+    assert breaker.allow()
+    breaker.record_success()
+    
+    assert breaker.get_state()['state'] == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_circuit():
+    breaker = CircuitBreaker('upstream', failure_threshold=5, reset_timeout=0.01)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.02)
+    
+    assert breaker.allow()
+    breaker.record_failure()
+    
+    assert breaker.get_state()['state'] == CircuitBreaker.OPEN
+    assert not breaker.allow()
@@ -0,0 +1,71 @@
+"""Tests for response compression."""
+import builtins
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+from werkzeug.datastructures import Accept
+
+from app.middleware import compression
+from app.middleware.compression import choose_encoding, init_compression
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(compression, '_get_brotli', lambda: None)
+    app = Flask(__name__)
+    app.config.update(COMPRESS_ENABLED=True, COMPRESS_MIN_SIZE=100, COMPRESS_LEVEL=6,
+                      COMPRESS_BROTLI_QUALITY=4)
+    init_compression(app)
+    
+    @app.route('/items')
+    def items():
+        response = jsonify({'items': ['birthday'] * 100})
+        response.set_etag('abc')
+        return response
+    
+    return app
+
+
+def test_choose_encoding_prefers_brotli_when_available():
+    accept = Accept([('gzip', 1), ('br', 1)])
+    
+    assert choose_encoding(accept, True) == 'br'
+    assert choose_encoding(accept, False) == 'gzip'
+    assert choose_encoding(Accept([('identity', 1)]), True) is None
+
+
+def test_response_is_gzipped_with_a_distinct_etag(app):
+    response = app.test_client().get('/items', headers={'Accept-Encoding': 'gzip'})
+    
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.get_etag() == ('abc-gzip', False)
+    assert b'birthday' in gzip.decompress(response.get_data())
+
+
+def test_uncompressed_without_accept_encoding(app):
+    response = app.test_client().get('/items', headers={'Accept-Encoding': ''})
+    
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_etag() == ('abc', False)
+
+
+def test_missing_brotli_is_looked_up_once(monkeypatch):
+    compression._get_brotli.cache_clear()
+    imports = []
+    real_import = builtins.__import__
+    
+    def fake_import(name, *args, **kwargs):
+        if name == 'brotli':
+            imports.append(name)
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, '__import__', fake_import)
+    try:
+        assert compression._get_brotli() is None
+        assert compression._get_brotli() is None
+        assert imports == ['brotli']
+    finally:
+        compression._get_brotli.cache_clear()
@@ -0,0 +1,63 @@
+"""Tests for the Friend and EnrichedFriend models."""
+from datetime import date
+
+import pytest
+
+from app.models.friend import EnrichedFriend, Friend, compact_date
+from app.services.birthday_service import BirthdayService
+
+ROW = {
+    'id': 'f-1', 'user_id': 'user-1', 'name': 'Anna', 'date_of_birth': '1990-05-01',
+    'notes': None, 'created_at': '2026-01-01T00:00:00', 'updated_at': None,
+    'birth_month': 5, 'birth_day': 1, 'birth_doy': 121,
+}
+
+
+def test_from_row_parses_the_date_of_birth():
+    friend = Friend.from_row(ROW)
+    
+    assert friend.date_of_birth == date(1990, 5, 1)
+    assert friend.birth_doy == 121
+
+
+def test_from_row_round_trips_through_to_dict():
+    assert Friend.from_row(ROW).to_dict() == ROW
+
+
+def test_from_row_uses_an_already_parsed_date():
+    friend = Friend.from_row(dict(ROW, date_of_birth='not parsed'), date_of_birth=date(1990, 5, 1))
+    
+    assert friend.date_of_birth == date(1990, 5, 1)
+
+
+def test_slots_reject_unknown_attributes():
+    with pytest.raises(AttributeError):
+        Friend.from_row(ROW).nickname = 'Annie'
+
+
+def test_compact_dict_omits_nulls_and_derived_columns():
+    assert Friend.from_row(ROW).to_compact_dict() == {'id': 'f-1', 'name': 'Anna', 'date_of_birth': '19900501'}
+    assert compact_date(None) is None
+
+
+def test_enriched_friend_delegates_to_the_friend():
+    friend = Friend.from_row(ROW)
+    enriched = BirthdayService.enrich_friend(friend, date(2026, 4, 29))
+    
+    assert isinstance(enriched, EnrichedFriend)
+    assert enriched.friend is friend
+    assert enriched.name == 'Anna'
+    assert (enriched.age, enriched.days_until_birthday, enriched.is_reminder_due) == (35, 2, True)
+
+
+def test_enriched_friend_dicts():
+    enriched = BirthdayService.enrich_friend(Friend.from_row(ROW), date(2026, 5, 10))
+    
+    data = enriched.to_dict()
+    assert data['next_birthday'] == '2027-05-01'
+    assert data['days_until_birthday'] == 356
+    assert data['is_reminder_due'] is False
+    
+    compact = enriched.to_compact_dict()
+    assert compact['next_birthday'] == '20270501'
+    assert 'is_reminder_due' not in compact
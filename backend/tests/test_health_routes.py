@@ -0,0 +1,45 @@
+"""Tests for the health check endpoints."""
+import pytest
+from flask import Flask
+
+from app.routes.health import health_bp
+from app.services.health_monitor import HealthMonitor
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(HealthMonitor, 'ensure_started', classmethod(lambda cls: None))
+    monkeypatch.setattr(HealthMonitor, 'get_readiness', classmethod(
+        lambda cls: ('not_ready', ['supabase: unreachable'], {'supabase': {'ok': False}})
+    ))
+    app = Flask(__name__)
+    app.config['HEALTH_STATS_TOKEN'] = 'monitoring-token'
+    app.register_blueprint(health_bp, url_prefix='/api/v1')
+    return app.test_client()
+
+
+def test_public_endpoints_only_report_status(client):
+    for path, status in (('/api/v1/health', 200), ('/api/v1/health/live', 200), ('/api/v1/health/ready', 503)):
+        response = client.get(path)
+        assert response.status_code == status
+        assert set(response.get_json()) == {'status', 'timestamp'}
+
+
+def test_stats_require_the_token(client):
+    assert client.get('/api/v1/health/stats').status_code == 401
+    assert client.get('/api/v1/health/stats', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    
+    response = client.get('/api/v1/health/stats', headers={'Authorization': 'Bearer monitoring-token'})
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['reasons'] == ['supabase: unreachable']
+    assert 'friend_cache' in data and 'change_feed' in data
+
+
+def test_stats_are_disabled_without_a_token(client):
+    client.application.config['HEALTH_STATS_TOKEN'] = None
+    
+    response = client.get('/api/v1/health/stats', headers={'Authorization': 'Bearer '})
+    
+    assert response.status_code == 404
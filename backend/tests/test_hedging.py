@@ -0,0 +1,82 @@
+"""Tests for hedged calls."""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+
+from app.utils.hedging import hedged_call, DeadlineExceeded
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def test_fast_call_is_not_hedged(executor):
+    result, attempts = hedged_call(lambda: 'ok', deadline=1, hedge_delay=0.5, executor=executor)
+    
+    assert result == 'ok'
+    assert attempts == 1
+
+
+def test_slow_first_attempt_is_hedged(executor):
+    calls = []
+    lock = threading.Lock()
+    
+    def fn():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(0.5 if first else 0)
+        return 'slow' if first else 'fast'
+    
+    result, attempts = hedged_call(fn, deadline=2, hedge_delay=0.05, executor=executor)
+    
+    assert result == 'fast'
+    assert attempts == 2
+
+
+def test_failure_starts_hedge_immediately(executor):
+    calls = []
+    
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError('reset')
+        return 'ok'
+    
+    started = time.monotonic()
+    result, attempts = hedged_call(fn, deadline=2, hedge_delay=1, executor=executor)
+    
+    assert result == 'ok'
+    assert attempts == 2
+    assert time.monotonic() - started < 0.5
+
+
+def test_every_attempt_failing_raises_last_error(executor):
+    def fn():
+        raise ValueError('bad response')
+    
+    with pytest.raises(ValueError):
+        hedged_call(fn, deadline=1, hedge_delay=0.05, executor=executor)
+
+
+def test_deadline_cancels_pending_attempts():
+    pool = ThreadPoolExecutor(max_workers=1)
+    calls = []
+    
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+    
+    try:
+        with pytest.raises(DeadlineExceeded):
+            hedged_call(fn, deadline=0.1, hedge_delay=0.02, executor=pool)
+    finally:
+        pool.shutdown(wait=True)
+    
+    # The hedge queued behind the busy worker never ran
+    assert len(calls) == 1
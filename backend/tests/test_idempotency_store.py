@@ -0,0 +1,68 @@
+"""Tests for the per-worker idempotency key store."""
+from app.services.idempotency_store import IdempotencyStore, request_fingerprint
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({'a': 1, 'b': 2}) == request_fingerprint({'b': 2, 'a': 1})
+    assert request_fingerprint({'a': 1}) != request_fingerprint({'a': 2})
+
+
+def test_new_key_then_replay():
+    fingerprint = request_fingerprint({'name': 'Ann'})
+    
+    state, stored = IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    assert state == IdempotencyStore.NEW
+    assert stored is None
+    
+    IdempotencyStore.complete('user-1', 'key-1', {'id': 'f1'}, 201)
+    
+    state, stored = IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    assert state == IdempotencyStore.REPLAY
+    assert stored == ({'id': 'f1'}, 201)
+
+
+def test_in_progress_and_mismatch():
+    IdempotencyStore.begin('user-1', 'key-1', request_fingerprint({'name': 'Ann'}))
+    
+    state, _ = IdempotencyStore.begin('user-1', 'key-1', request_fingerprint({'name': 'Ann'}))
+    assert state == IdempotencyStore.IN_PROGRESS
+    
+    state, _ = IdempotencyStore.begin('user-1', 'key-1', request_fingerprint({'name': 'Bob'}))
+    assert state == IdempotencyStore.MISMATCH
+
+
+def test_keys_are_per_user():
+    fingerprint = request_fingerprint({'name': 'Ann'})
+    IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    
+    state, _ = IdempotencyStore.begin('user-2', 'key-1', fingerprint)
+    assert state == IdempotencyStore.NEW
+
+
+def test_release_allows_retry():
+    fingerprint = request_fingerprint({'name': 'Ann'})
+    IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    IdempotencyStore.release('user-1', 'key-1')
+    
+    state, _ = IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    assert state == IdempotencyStore.NEW
+
+
+def test_release_keeps_completed_response():
+    fingerprint = request_fingerprint({'name': 'Ann'})
+    IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    IdempotencyStore.complete('user-1', 'key-1', {'id': 'f1'}, 201)
+    IdempotencyStore.release('user-1', 'key-1')
+    
+    state, _ = IdempotencyStore.begin('user-1', 'key-1', fingerprint)
+    assert state == IdempotencyStore.REPLAY
+
+
+def test_oldest_keys_are_evicted():
+    IdempotencyStore.configure(ttl_seconds=3600, max_keys=2)
+    fingerprint = request_fingerprint({})
+    for key in ('a', 'b', 'c'):
+        IdempotencyStore.begin('user-1', key, fingerprint)
+    
+    state, _ = IdempotencyStore.begin('user-1', 'a', fingerprint)
+    assert state == IdempotencyStore.NEW
@@ -0,0 +1,127 @@
+"""Tests for the SQLite job queue."""
+import pytest
+
+from app.services import job_queue
+from app.services.idempotency_store import IdempotencyKeyReused
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture(autouse=True)
+def queue(tmp_path, monkeypatch):
+    settings = (JobQueue.path, JobQueue.max_attempts, JobQueue.retry_backoff, JobQueue.job_timeout,
+                JobQueue.result_ttl)
+    JobQueue.configure(str(tmp_path / 'jobs.sqlite3'), 3, 5.0, 300, 3600)
+    monkeypatch.setattr(job_queue.random, 'uniform', lambda low, high: 1.0)
+    yield
+    JobQueue.configure(*settings)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(job_queue.time, 'time', lambda: clock[0])
+    return clock
+
+
+def test_claim_runs_jobs_in_order(now):
+    first = JobQueue.enqueue('import_friends', 'user-1', {'friends': []})
+    now[0] += 1
+    JobQueue.enqueue('import_friends', 'user-1', {'friends': [{'name': 'Anna'}]})
+    
+    job = JobQueue.claim('worker-1')
+    
+    assert job['id'] == first['id']
+    assert (job['status'], job['attempts'], job['locked_by']) == ('running', 1, 'worker-1')
+    assert job['payload'] == {'friends': []}
+    assert JobQueue.claim('worker-2')['payload'] == {'friends': [{'name': 'Anna'}]}
+    assert JobQueue.claim('worker-3') is None
+
+
+def test_complete_stores_the_result(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    job = JobQueue.claim('worker-1')
+    
+    assert JobQueue.complete(job, {'created': 2})
+    
+    stored = JobQueue.get(job['id'], 'user-1')
+    assert (stored['status'], stored['result']) == ('succeeded', {'created': 2})
+    assert JobQueue.get(job['id'], 'user-2') is None
+
+
+def test_failed_attempts_are_retried_with_backoff(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    
+    job = JobQueue.claim('worker-1')
+    assert JobQueue.fail(job, 'timeout')
+    assert JobQueue.claim('worker-1') is None
+    
+    now[0] += 5
+    job = JobQueue.claim('worker-1')
+    assert job['attempts'] == 2
+    JobQueue.fail(job, 'timeout')
+    
+    now[0] += 9.9
+    assert JobQueue.claim('worker-1') is None
+    now[0] += 0.1
+    job = JobQueue.claim('worker-1')
+    JobQueue.fail(job, 'timeout')
+    
+    stored = JobQueue.get(job['id'])
+    assert (stored['status'], stored['attempts'], stored['error']) == ('failed', 3, 'timeout')
+
+
+def test_permanent_failures_are_not_retried(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    job = JobQueue.claim('worker-1')
+    
+    JobQueue.fail(job, 'bad payload', permanent=True)
+    
+    assert JobQueue.get(job['id'])['status'] == 'failed'
+    assert JobQueue.get_stats() == {'queued': 0, 'running': 0, 'succeeded': 0, 'failed': 1}
+
+
+def test_timed_out_jobs_are_reclaimed_and_the_old_claim_is_lost(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    stale = JobQueue.claim('worker-1')
+    
+    now[0] += 301
+    job = JobQueue.claim('worker-2')
+    assert (job['attempts'], job['locked_by']) == (2, 'worker-2')
+    
+    assert not JobQueue.complete(stale, {'created': 1})
+    assert not JobQueue.fail(stale, 'late failure')
+    assert JobQueue.get(job['id'])['status'] == 'running'
+    
+    assert JobQueue.complete(job, {'created': 1})
+
+
+def test_same_worker_cannot_finish_an_earlier_attempt(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    first = JobQueue.claim('worker-1')
+    now[0] += 301
+    second = JobQueue.claim('worker-1')
+    
+    assert not JobQueue.complete(first, None)
+    assert JobQueue.complete(second, None)
+
+
+def test_idempotency_key_returns_the_existing_job(now):
+    job = JobQueue.enqueue('import_friends', 'user-1', {}, 'key-1', 'abc')
+    
+    assert JobQueue.enqueue('import_friends', 'user-1', {}, 'key-1', 'abc')['id'] == job['id']
+    assert JobQueue.enqueue('import_friends', 'user-2', {}, 'key-1', 'abc')['id'] != job['id']
+    
+    with pytest.raises(IdempotencyKeyReused):
+        JobQueue.enqueue('import_friends', 'user-1', {}, 'key-1', 'def')
+    with pytest.raises(IdempotencyKeyReused):
+        JobQueue.enqueue('export_friends', 'user-1', {}, 'key-1', 'abc')
+
+
+def test_purge_deletes_old_finished_jobs(now):
+    JobQueue.enqueue('import_friends', 'user-1', {})
+    JobQueue.complete(JobQueue.claim('worker-1'), None)
+    queued = JobQueue.enqueue('import_friends', 'user-1', {})
+    
+    now[0] += 3601
+    assert JobQueue.purge() == 1
+    assert JobQueue.get(queued['id'])['status'] == 'queued'
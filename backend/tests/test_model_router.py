@@ -0,0 +1,143 @@
+"""Tests for routing suggestion calls across models."""
+import pytest
+
+from app.services.model_router import ModelRouter, StubModel, STUB_MODEL, parse_models
+from app.utils.circuit_breaker import CircuitOpenError
+
+
+class FakeModel:
+    """Model double that answers with its name or raises."""
+    
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.calls = 0
+    
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(f'{self.name} unavailable')
+        return self.name
+
+
+def use_models(*models):
+    """Route to the given models, disabling probes so the order is deterministic."""
+    ModelRouter.set_models({model.name: model for model in models})
+    ModelRouter.probe_interval = 0
+    ModelRouter.cost_budget = 0.0
+
+
+def route(name):
+    return next(route for route in ModelRouter.routes if route.name == name)
+
+
+def test_parse_models():
+    assert parse_models('gemini-1.5-flash:0.3, gemini-pro:1.5') == [('gemini-1.5-flash', 0.3), ('gemini-pro', 1.5)]
+    assert parse_models('gemini-pro') == [('gemini-pro', 0.0)]
+    with pytest.raises(ValueError):
+        parse_models('')
+    with pytest.raises(ValueError):
+        parse_models('gemini-pro:-1')
+
+
+def test_unmeasured_models_are_tried_in_configured_order():
+    use_models(FakeModel('a'), FakeModel('b'))
+    
+    assert [route.name for route in ModelRouter._rank()] == ['a', 'b']
+
+
+def test_faster_model_ranks_first():
+    use_models(FakeModel('slow'), FakeModel('fast'))
+    ModelRouter._observe(route('slow'), 2.0, True)
+    ModelRouter._observe(route('fast'), 0.2, True)
+    
+    assert ModelRouter._rank()[0].name == 'fast'
+
+
+def test_failures_count_against_expected_time():
+    use_models(FakeModel('flaky'), FakeModel('steady'))
+    for ok in (False, False, True):
+        ModelRouter._observe(route('flaky'), 0.5, ok)
+    ModelRouter._observe(route('steady'), 0.8, True)
+    
+    assert ModelRouter._rank()[0].name == 'steady'
+
+
+def test_generate_falls_back_to_next_model():
+    down, up = FakeModel('down', fail=True), FakeModel('up')
+    use_models(down, up)
+    
+    result = ModelRouter.generate('prompt', lambda response, route: response)
+    
+    assert result == 'up'
+    assert down.calls == 1
+    assert route('down').stats['failures'] == 1
+
+
+def test_unusable_output_tries_next_model():
+    use_models(FakeModel('a'), FakeModel('b'))
+    
+    def handle(response, route):
+        if response == 'a':
+            raise ValueError('unparseable')
+        return response
+    
+    assert ModelRouter.generate('prompt', handle) == 'b'
+
+
+def test_every_model_failing_raises_last_error():
+    use_models(FakeModel('a', fail=True), FakeModel('b', fail=True))
+    
+    with pytest.raises(ConnectionError, match='b unavailable'):
+        ModelRouter.generate('prompt', lambda response, route: response)
+
+
+def test_open_circuits_raise_circuit_open_error():
+    use_models(FakeModel('a'))
+    for _ in range(route('a').breaker.failure_threshold):
+        route('a').breaker.record_failure()
+    
+    with pytest.raises(CircuitOpenError):
+        ModelRouter.generate('prompt', lambda response, route: response)
+
+
+def test_over_budget_prefers_cheaper_model():
+    use_models(FakeModel('cheap'), FakeModel('premium'))
+    route('cheap').cost, route('premium').cost = 0.1, 10.0
+    ModelRouter._observe(route('cheap'), 2.0, True)
+    ModelRouter._observe(route('premium'), 0.1, True)
+    ModelRouter.cost_budget = 1.0
+    assert ModelRouter._rank()[0].name == 'premium'
+    
+    ModelRouter.record_tokens(route('premium'), 200_000)
+    
+    assert ModelRouter._rank()[0].name == 'cheap'
+
+
+def test_stub_is_ranked_last_despite_its_latency():
+    stub = StubModel()
+    ModelRouter.set_models({STUB_MODEL: stub, 'gemini': FakeModel('gemini')})
+    ModelRouter.probe_interval = 0
+    ModelRouter._observe(route(STUB_MODEL), 0.001, True)
+    ModelRouter._observe(route('gemini'), 3.0, True)
+    
+    assert [route.name for route in ModelRouter._rank()] == ['gemini', STUB_MODEL]
+
+
+def test_stub_is_used_when_real_models_fail():
+    ModelRouter.set_models({'gemini': FakeModel('gemini', fail=True), STUB_MODEL: StubModel()})
+    ModelRouter.probe_interval = 0
+    
+    result = ModelRouter.generate('gift prompt', lambda response, route: route.name)
+    
+    assert result == STUB_MODEL
+
+
+def test_stub_is_never_probed():
+    ModelRouter.set_models({'gemini': FakeModel('gemini'), STUB_MODEL: StubModel()})
+    ModelRouter.probe_interval = 0.001
+    ModelRouter._observe(route('gemini'), 1.0, True)
+    ModelRouter._observe(route(STUB_MODEL), 0.001, True)
+    route(STUB_MODEL).last_attempt = 0.0
+    
+    assert ModelRouter._rank()[0].name == 'gemini'
@@ -0,0 +1,60 @@
+"""Tests for the rate limiter's token bucket stores."""
+import sys
+
+from flask import Flask
+
+from app.middleware import rate_limit
+from app.middleware.rate_limit import MemoryRateLimitStore, RateLimiter, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit('10/60') == (10, 60.0)
+
+
+def test_bucket_allows_a_burst_then_limits():
+    store = MemoryRateLimitStore()
+    
+    results = [store.consume('ai:user-1', 3, 60) for _ in range(4)]
+    
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+    assert [remaining for _, _, remaining in results] == [2, 1, 0, 0]
+    assert 0 < results[-1][1] <= 20
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    store = MemoryRateLimitStore()
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    
+    store.consume('ai:user-1', 1, 60)
+    assert not store.consume('ai:user-1', 1, 60)[0]
+    
+    now[0] += 60
+    assert store.consume('ai:user-1', 1, 60)[0]
+
+
+def test_least_recently_used_buckets_are_dropped():
+    store = MemoryRateLimitStore(max_buckets=2)
+    
+    store.consume('read:user-1', 5, 60)
+    store.consume('read:user-2', 5, 60)
+    store.consume('read:user-1', 5, 60)
+    store.consume('read:user-3', 5, 60)
+    
+    assert list(store._buckets) == ['read:user-1', 'read:user-3']
+
+
+def test_missing_redis_falls_back_to_memory_once(monkeypatch, caplog):
+    app = Flask(__name__)
+    app.config.update(RATE_LIMIT_STORE='redis', RATE_LIMIT_REDIS_URL='redis://localhost:6379/0',
+                      RATE_LIMIT_MAX_BUCKETS=10)
+    monkeypatch.setitem(sys.modules, 'redis', None)
+    monkeypatch.setattr(RateLimiter, '_store', None)
+    
+    with app.app_context():
+        store = RateLimiter.get_store()
+        assert RateLimiter.get_store() is store
+    
+    assert isinstance(store, MemoryRateLimitStore)
+    assert store.max_buckets == 10
+    assert len([r for r in caplog.records if 'redis package is not installed' in r.getMessage()]) == 1
@@ -0,0 +1,104 @@
+"""Tests for the per-user friend search index."""
+from datetime import date
+
+from app.models.friend import Friend
+from app.services.search_index import SearchIndex, within_one_edit
+
+
+def friend(friend_id, name, notes=None, user_id='user-1'):
+    return Friend(friend_id, user_id, name, date(1990, 5, 1), notes)
+
+
+FRIENDS = [
+    friend('1', 'John Smith', 'loves jazz'),
+    friend('2', 'Johanna Berg'),
+    friend('3', 'Maria Lopez', 'works with John'),
+    friend('4', 'José García'),
+]
+
+
+def search(query, friends=FRIENDS, **kwargs):
+    results, total = SearchIndex.search('user-1', query, lambda: friends, **kwargs)
+    return [friend.name for friend, _ in results], total
+
+
+def test_within_one_edit():
+    assert within_one_edit('john', 'jonh')   # swap
+    assert within_one_edit('john', 'jon')    # deletion
+    assert within_one_edit('john', 'joan')   # substitution
+    assert not within_one_edit('john', 'jane')
+
+
+def test_name_match_outranks_notes_match():
+    names, total = search('john')
+    
+    assert names[0] == 'John Smith'
+    assert 'Maria Lopez' in names
+    assert total == len(names)
+
+
+def test_prefix_match():
+    names, _ = search('joh')
+    
+    assert set(names) == {'John Smith', 'Johanna Berg', 'Maria Lopez'}
+
+
+def test_fuzzy_match_and_disabling_it():
+    names, _ = search('jhon')
+    assert 'John Smith' in names
+    
+    names, _ = search('jhon', fuzzy=False)
+    assert names == []
+
+
+def test_accents_are_ignored():
+    names, _ = search('jose garcia')
+    
+    assert names == ['José García']
+
+
+def test_every_query_word_must_match():
+    names, _ = search('john jazz')
+    
+    assert names == ['John Smith']
+
+
+def test_limit_keeps_best_results_and_full_total():
+    friends = [friend(str(i), f'Ann {i:03d}') for i in range(300)]
+    full, total = search('ann', friends)
+    
+    page, page_total = search('ann', friends, limit=30)
+    
+    assert page_total == total == 300
+    assert page == full[:30]
+
+
+def test_index_follows_writes():
+    search('john')
+    SearchIndex.upsert(friend('5', 'Johnny Cash'))
+    SearchIndex.remove('1', 'user-1')
+    
+    names, _ = search('john')
+    
+    assert 'Johnny Cash' in names
+    assert 'John Smith' not in names
+
+
+def test_build_racing_a_write_is_not_kept():
+    def load():
+        # A write lands while the friends are being read
+        SearchIndex.upsert(friend('5', 'Johnny Cash'))
+        return FRIENDS
+    
+    SearchIndex.search('user-1', 'john', load)
+    
+    assert SearchIndex.get_stats()['users'] == 0
+    assert SearchIndex._builds == {}
+
+
+def test_write_tracking_is_dropped_after_builds():
+    search('john')
+    SearchIndex.upsert(friend('9', 'Other', user_id='user-2'))
+    
+    assert SearchIndex._builds == {}
+    assert SearchIndex.get_stats()['users'] == 1
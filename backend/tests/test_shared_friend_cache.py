@@ -0,0 +1,140 @@
+"""Tests for the cross-process shared friend cache."""
+import os
+from datetime import date
+
+import pytest
+
+from app.models.friend import Friend
+from app.services import shared_friend_cache
+from app.services.shared_friend_cache import (
+    SLOT_HEADER_SIZE, SharedFriendCache, _U64, layout_path, user_key
+)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(shared_friend_cache.time, 'time', lambda: clock[0])
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, now, monkeypatch):
+    monkeypatch.setattr(SharedFriendCache, '_stats', dict.fromkeys(SharedFriendCache._stats, 0))
+    SharedFriendCache.configure(True, str(tmp_path / 'friends.cache'), 4, 2048, 300)
+    yield
+    if SharedFriendCache._mm is not None:
+        SharedFriendCache._mm.close()
+        os.close(SharedFriendCache._fd)
+    SharedFriendCache._mm = SharedFriendCache._fd = None
+    SharedFriendCache.configure(False, '/dev/shm/friends.cache', 1024, 64 * 1024, 300)
+
+
+def friends(*names):
+    return [Friend(str(i), 'user-1', name, date(1990, 5, 1)) for i, name in enumerate(names)]
+
+
+def cached_names(user_id='user-1'):
+    cached, _ = SharedFriendCache.get(user_id)
+    return None if cached is None else [friend.name for friend in cached]
+
+
+def slot_offset(user_id='user-1'):
+    key = user_key(user_id)
+    for offset in SharedFriendCache._slot_offsets(key):
+        if SharedFriendCache._mm[offset + 8:offset + 24] == key:
+            return offset
+    raise AssertionError('user has no slot')
+
+
+def test_round_trip(tmp_path):
+    assert SharedFriendCache.get('user-1') == (None, 0)
+    
+    SharedFriendCache.put('user-1', friends('Anna', 'Ben'), 0)
+    
+    assert cached_names() == ['Anna', 'Ben']
+    assert os.path.exists(tmp_path / 'friends-v1-4x2048.cache')
+
+
+def test_layout_is_part_of_the_file_name():
+    assert layout_path('/dev/shm/friends.cache', 1024, 65536) == '/dev/shm/friends-v1-1024x65536.cache'
+
+
+def test_entries_expire(now):
+    SharedFriendCache.put('user-1', friends('Anna'), 0)
+    
+    now[0] += 301
+    
+    assert cached_names() is None
+
+
+def test_invalidate_bumps_the_generation():
+    SharedFriendCache.put('user-1', friends('Anna'), 0)
+    
+    assert SharedFriendCache.invalidate('user-1') == 1
+    
+    assert SharedFriendCache.get('user-1') == (None, 1)
+
+
+def test_list_read_before_a_write_is_not_stored():
+    _, generation = SharedFriendCache.get('user-1')
+    SharedFriendCache.invalidate('user-1')
+    
+    SharedFriendCache.put('user-1', friends('Anna'), generation)
+    
+    assert cached_names() is None
+    assert SharedFriendCache.get_stats()['stale_stores'] == 1
+
+
+def test_slot_being_written_is_a_miss():
+    SharedFriendCache.put('user-1', friends('Anna'), 0)
+    offset = slot_offset()
+    seq = _U64.unpack_from(SharedFriendCache._mm, offset)[0]
+    
+    _U64.pack_into(SharedFriendCache._mm, offset, seq + 1)
+    assert cached_names() is None
+    
+    _U64.pack_into(SharedFriendCache._mm, offset, seq)
+    assert cached_names() == ['Anna']
+
+
+def test_torn_payload_is_a_miss():
+    SharedFriendCache.put('user-1', friends('Anna'), 0)
+    start = slot_offset() + SLOT_HEADER_SIZE
+    
+    SharedFriendCache._mm[start] ^= 0xFF
+    
+    assert cached_names() is None
+
+
+def test_least_recently_used_slot_is_evicted(now):
+    for user in range(4):
+        now[0] += 1
+        SharedFriendCache.put(f'user-{user}', friends('Anna'), 0)
+    now[0] += 1
+    SharedFriendCache.get('user-0')
+    
+    now[0] += 1
+    SharedFriendCache.put('user-4', friends('Anna'), 0)
+    
+    assert cached_names('user-1') is None
+    assert all(cached_names(f'user-{user}') == ['Anna'] for user in (0, 2, 3, 4))
+
+
+def test_lists_too_large_for_a_slot_are_skipped():
+    SharedFriendCache.put('user-1', friends(*(os.urandom(16).hex() for _ in range(100))), 0)
+    
+    assert cached_names() is None
+    assert SharedFriendCache.get_stats()['too_large'] == 1
+
+
+def test_clear_empties_slots_and_keeps_generations():
+    SharedFriendCache.put('user-1', friends('Anna'), 0)
+    _, generation = SharedFriendCache.get('user-1')
+    SharedFriendCache.invalidate('user-1')
+    
+    SharedFriendCache.clear()
+    
+    assert SharedFriendCache.get('user-1') == (None, 1)
+    SharedFriendCache.put('user-1', friends('Anna'), generation)
+    assert cached_names() is None
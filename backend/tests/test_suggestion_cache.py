@@ -0,0 +1,78 @@
+"""Tests for the two-tier AI suggestion cache."""
+import pytest
+
+from app.services.suggestion_cache import SuggestionCache, age_bracket, cosine_similarity
+
+GIFTS = [{'title': 'Trail map', 'description': 'For Anna to plan hikes'}]
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    SuggestionCache.configure(True, 3600, 100, 0.85, False)
+    SuggestionCache.clear()
+    yield
+    SuggestionCache.clear()
+    SuggestionCache.configure(False, 7 * 24 * 3600, 5000, 0.85, False)
+
+
+def lookup(notes, age=30, user_id='user-1', name='Ben'):
+    return SuggestionCache.lookup(user_id, 'gifts', name, age, notes)
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, 'Loves hiking!', GIFTS)
+    
+    suggestions, tier = lookup('loves HIKING')
+    
+    assert tier == SuggestionCache.EXACT
+    assert suggestions == [{'title': 'Trail map', 'description': 'For Ben to plan hikes'}]
+
+
+def test_similar_notes_in_the_same_bracket_are_reused():
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, 'loves hiking and coffee', GIFTS)
+    
+    assert lookup('Likes coffee & hiking!', age=32)[1] == SuggestionCache.SIMILAR
+    assert lookup('loves hiking and coffee', age=45) is None
+
+
+def test_loosely_related_notes_are_not_reused():
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, 'loves hiking', GIFTS)
+    
+    assert lookup('likes hiking, coffee') is None
+
+
+def test_empty_notes_are_only_reused_exactly():
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, None, GIFTS)
+    SuggestionCache.store('user-1', 'gifts', 'Cleo', 31, 'loves', GIFTS)
+    
+    assert lookup('', age=30)[1] == SuggestionCache.EXACT
+    assert lookup(None, age=32) is None
+    assert lookup('likes', age=31) is None
+
+
+def test_empty_vectors_do_not_match():
+    assert cosine_similarity({}, {}, 0.0, 0.0) == 0.0
+    assert cosine_similarity({'w:jazz': 1}, {}, 1.0, 0.0) == 0.0
+
+
+def test_entries_are_scoped_to_the_user_unless_shared():
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, 'loves hiking', GIFTS)
+    assert lookup('loves hiking', user_id='user-2') is None
+    
+    SuggestionCache.configure(True, 3600, 100, 0.85, True)
+    SuggestionCache.store('user-1', 'gifts', 'Anna', 30, 'loves hiking', GIFTS)
+    assert lookup('loves hiking', user_id='user-2')[1] == SuggestionCache.EXACT
+
+
+def test_oldest_entries_are_evicted():
+    SuggestionCache.configure(True, 3600, 2, 0.85, False)
+    for notes in ('jazz', 'chess', 'tennis'):
+        SuggestionCache.store('user-1', 'gifts', 'Anna', 30, notes, GIFTS)
+    
+    assert lookup('jazz') is None
+    assert SuggestionCache.get_stats()['entries'] == 2
+
+
+def test_age_brackets_use_the_age_being_turned():
+    assert age_bracket(30) == age_bracket(39)
+    assert age_bracket(29) != age_bracket(30)
@@ -0,0 +1,64 @@
+"""Tests for resolving today in a user's timezone."""
+from datetime import date, datetime, timezone
+
+import pytest
+from flask import Flask
+
+from app.utils import timezone as tz
+
+
+def utc_timestamp(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [utc_timestamp(2026, 10, 19, 12)]
+    monkeypatch.setattr(tz, '_day_boundaries', {})
+    monkeypatch.setattr(tz.time, 'time', lambda: clock[0])
+    return clock
+
+
+def test_today_changes_at_local_midnight(now):
+    now[0] = utc_timestamp(2026, 10, 19, 18, 29, 59)
+    assert tz.local_today('Asia/Kolkata') == date(2026, 10, 19)
+    
+    now[0] = utc_timestamp(2026, 10, 19, 18, 30)
+    assert tz.local_today('Asia/Kolkata') == date(2026, 10, 20)
+
+
+def test_day_boundaries_are_cached_per_zone(now):
+    tz.local_today('Asia/Kolkata')
+    tz.local_today('America/New_York')
+    
+    start, end, today = tz._day_boundaries['Asia/Kolkata']
+    assert (start, end, today) == (utc_timestamp(2026, 10, 18, 18, 30), utc_timestamp(2026, 10, 19, 18, 30),
+                                   date(2026, 10, 19))
+    assert tz._day_boundaries['America/New_York'][2] == date(2026, 10, 19)
+
+
+def test_day_boundaries_follow_daylight_saving_changes(now):
+    now[0] = utc_timestamp(2026, 11, 1, 12)
+    
+    assert tz.local_today('America/New_York') == date(2026, 11, 1)
+    start, end, _ = tz._day_boundaries['America/New_York']
+    assert end - start == 25 * 3600
+
+
+def test_unknown_or_missing_zones_use_server_time(now):
+    assert tz.local_today('Mars/Olympus_Mons') == date.today()
+    assert tz.local_today(None) == date.today()
+    assert tz._day_boundaries == {}
+
+
+def test_request_today_is_resolved_once_per_request(now, monkeypatch):
+    app = Flask(__name__)
+    calls = []
+    local_today = tz.local_today
+    monkeypatch.setattr(tz, 'local_today', lambda name: calls.append(name) or local_today(name))
+    
+    with app.test_request_context(headers={tz.TIMEZONE_HEADER: 'Pacific/Kiritimati'}):
+        assert tz.get_request_today() == date(2026, 10, 20)
+        assert tz.get_request_today() == date(2026, 10, 20)
+    
+    assert calls == ['Pacific/Kiritimati']
@@ -0,0 +1,74 @@
+"""Tests for friend payload validation."""
+from datetime import date
+
+from app.utils.validators import (
+    parse_date_of_birth, validate_friend_batch, validate_friend_data, validate_friend_payload
+)
+
+TODAY = date(2026, 10, 19)
+
+
+def test_parse_date_of_birth():
+    assert parse_date_of_birth('1992-02-29', TODAY) == (date(1992, 2, 29), None)
+
+
+def test_parse_date_of_birth_errors():
+    assert parse_date_of_birth('', TODAY)[1] == "Date is required"
+    assert parse_date_of_birth('29/02/1992', TODAY)[1] == "Date must be in YYYY-MM-DD format"
+    assert parse_date_of_birth(19920229, TODAY)[1] == "Date must be in YYYY-MM-DD format"
+    assert parse_date_of_birth('1993-02-29', TODAY)[1] == "Invalid date (e.g., 2023-02-30 is not valid)"
+    assert parse_date_of_birth('1899-12-31', TODAY)[1] == "Date of birth must be after 1900"
+
+
+def test_future_dates_are_checked_against_the_given_today():
+    assert parse_date_of_birth('2026-10-20', TODAY)[1] == "Date of birth cannot be in the future"
+    assert parse_date_of_birth('2026-10-20', date(2026, 10, 20))[1] is None
+
+
+def test_payload_is_cleaned():
+    cleaned, errors = validate_friend_payload(
+        {'name': '  Anna ', 'date_of_birth': '1990-05-01', 'notes': '   '}, today=TODAY
+    )
+    
+    assert errors == {}
+    assert cleaned == {'name': 'Anna', 'date_of_birth': date(1990, 5, 1), 'notes': None}
+
+
+def test_payload_collects_every_field_error():
+    _, errors = validate_friend_payload({'name': 5, 'notes': 'x' * 5001}, today=TODAY)
+    
+    assert errors == {
+        'name': "Name must be a string",
+        'date_of_birth': "Date of birth is required",
+        'notes': "Notes must be 5000 characters or less",
+    }
+
+
+def test_update_payload_fields_are_optional():
+    cleaned, errors = validate_friend_payload({'notes': 'likes tea'}, is_update=True, today=TODAY)
+    
+    assert errors == {}
+    assert cleaned == {'notes': 'likes tea'}
+
+
+def test_payload_must_be_an_object():
+    assert validate_friend_payload(['Anna'], today=TODAY) == ({}, {'friend': "Friend must be a JSON object"})
+
+
+def test_batch_reports_errors_by_index():
+    cleaned, errors = validate_friend_batch([
+        {'name': 'Anna', 'date_of_birth': '1990-05-01'},
+        {'name': ' ', 'date_of_birth': '1990-05-01'},
+        {'name': 'Ben', 'date_of_birth': '2030-01-01'},
+    ], today=TODAY)
+    
+    assert [item['name'] for item in cleaned] == ['Anna']
+    assert errors == {
+        1: {'name': "Name cannot be empty or just whitespace"},
+        2: {'date_of_birth': "Date of birth cannot be in the future"},
+    }
+
+
+def test_validate_friend_data_returns_the_first_error():
+    assert validate_friend_data({'date_of_birth': 'soon'}) == (False, "Name is required")
+    assert validate_friend_data({'name': 'Anna', 'date_of_birth': '1990-05-01'}) == (True, None)
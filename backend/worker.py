@@ -0,0 +1,25 @@
+"""
+Job worker entry point.
+Run this file next to the API to process background jobs.
+
+    python worker.py                 # JOB_WORKERS processes
+    python worker.py --processes 4
+"""
+import argparse
+import logging
+from app.config import get_config
+from app.services.job_worker import run_pool
+
+if __name__ == '__main__':
+    config = get_config()
+    
+    parser = argparse.ArgumentParser(description='Birthday Reminder job worker')
+    parser.add_argument('--processes', type=int, default=config.JOB_WORKERS,
+                        help='Number of worker processes')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    run_pool(args.processes, config.JOB_POLL_INTERVAL)
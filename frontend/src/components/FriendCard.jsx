@@ -5,7 +5,8 @@
 import React from 'react'
 import { formatDateToReadable, getDaysUntilText } from '../utils/dateHelpers'
 
-export const FriendCard = ({ friend, onEdit, onDelete, onViewSuggestions }) => {
+// Memoized: a card re-renders only when its friend object or handlers change
+export const FriendCard = React.memo(({ friend, onEdit, onDelete, onViewSuggestions }) => {
     const { name, date_of_birth, age, notes, days_until_birthday, is_reminder_due, next_birthday } = friend
 
     return (
@@ -48,7 +49,7 @@ export const FriendCard = ({ friend, onEdit, onDelete, onViewSuggestions }) => {
                 </div>
                 {notes && (
                     <div className="mt-3 pt-3 border-t border-slate-200 dark:border-slate-700">
-                        <p className="text-sm text-slate-600 dark:text-slate-400 italic">"{notes}"</p>
+                        <p className="text-sm text-slate-600 dark:text-slate-400 italic line-clamp-3" title={notes}>"{notes}"</p>
                     </div>
                 )}
             </div>
@@ -76,4 +77,4 @@ export const FriendCard = ({ friend, onEdit, onDelete, onViewSuggestions }) => {
             </div>
         </div>
     )
-}
+})
@@ -4,6 +4,37 @@
  */
 import React from 'react'
 import { FriendCard } from './FriendCard'
+import { useVirtualGrid } from '../hooks/useVirtualGrid'
+
+// Lists longer than this are rendered through a window over the visible rows
+const VIRTUALIZE_THRESHOLD = 60
+
+const VirtualFriendGrid = ({ friends, onEdit, onDelete, onViewSuggestions }) => {
+    const { containerRef, measureRow, rows, rowHeight, paddingTop, paddingBottom } = useVirtualGrid(friends.length)
+
+    return (
+        <div ref={containerRef} style={{ paddingTop, paddingBottom }} className="flex flex-col gap-6">
+            {rows.map((row) => (
+                <div
+                    key={row.index}
+                    ref={measureRow(row.index)}
+                    style={{ minHeight: rowHeight }}
+                    className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6"
+                >
+                    {friends.slice(row.start, row.end).map((friend) => (
+                        <FriendCard
+                            key={friend.id}
+                            friend={friend}
+                            onEdit={onEdit}
+                            onDelete={onDelete}
+                            onViewSuggestions={onViewSuggestions}
+                        />
+                    ))}
+                </div>
+            ))}
+        </div>
+    )
+}
 
 export const FriendList = ({ friends, loading, error, onEdit, onDelete, onViewSuggestions }) => {
     if (loading) {
@@ -36,6 +67,17 @@ export const FriendList = ({ friends, loading, error, onEdit, onDelete, onViewSu
         )
     }
 
+    if (friends.length > VIRTUALIZE_THRESHOLD) {
+        return (
+            <VirtualFriendGrid
+                friends={friends}
+                onEdit={onEdit}
+                onDelete={onDelete}
+                onViewSuggestions={onViewSuggestions}
+            />
+        )
+    }
+
     return (
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
             {friends.map((friend) => (
@@ -1,61 +1,143 @@
 /**
  * Custom React hook for managing friends data.
+ *
+ * All instances share one cached copy of the full friend list. Cached data is
+ * shown immediately and revalidated in the background once stale, concurrent
+ * fetches are deduplicated, and the upcoming/reminders filters are applied
+ * locally instead of refetching. The list is loaded page by page so the
+ * first friends appear before large accounts finish loading.
  */
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useMemo, useCallback } from 'react'
 import { getFriends, createFriend, updateFriend, deleteFriend } from '../services/api'
+import { fetchQuery, getQueryData, isStale, setQueryData, subscribeQuery } from '../services/queryCache'
+
+export const FRIENDS_KEY = 'friends'
+
+// Revalidate cached friends after this long (ms)
+const STALE_TIME = 30 * 1000
+
+// Same window the backend uses for ?upcoming=true
+const UPCOMING_DAYS = 30
+
+// Friends requested per page
+const PAGE_SIZE = 200
+
+// Times a load starts over when friends are added or deleted while paging
+const MAX_RESTARTS = 2
+
+const sortByNextBirthday = (friends) =>
+    [...friends].sort((a, b) => a.days_until_birthday - b.days_until_birthday)
+
+const applyFilters = (friends, filters) =>
+    friends.filter((friend) => {
+        if (filters.upcoming && friend.days_until_birthday > UPCOMING_DAYS) return false
+        if (filters.reminders && !friend.is_reminder_due) return false
+        return true
+    })
 
 export const useFriends = (filters = {}) => {
-    const [friends, setFriends] = useState([])
-    const [loading, setLoading] = useState(true)
+    const [allFriends, setAllFriends] = useState(() => getQueryData(FRIENDS_KEY) || [])
+    const [loading, setLoading] = useState(() => getQueryData(FRIENDS_KEY) === undefined)
     const [error, setError] = useState(null)
 
-    const fetchFriends = async () => {
+    const fetchFriends = useCallback(async () => {
         try {
-            setLoading(true)
             setError(null)
-            const data = await getFriends(filters)
-            setFriends(data.friends || [])
+            await fetchQuery(FRIENDS_KEY, async (isCurrent) => {
+                // Only show partial pages on first load; revalidation keeps the old list until done
+                const showPages = getQueryData(FRIENDS_KEY) === undefined
+                let friends = []
+                let seen = new Set()
+                let offset = 0
+                let total = null
+                let restarts = 0
+
+                do {
+                    // Signed out meanwhile: stop loading the previous user's friends
+                    if (!isCurrent()) return friends
+                    const page = await getFriends({ limit: PAGE_SIZE, offset })
+
+                    // A friend was added or deleted between pages, so later pages shifted: start over
+                    if (total != null && page.total !== total && restarts < MAX_RESTARTS) {
+                        restarts += 1
+                        friends = []
+                        seen = new Set()
+                        offset = 0
+                        total = null
+                        continue
+                    }
+                    total = page.total
+
+                    // An edit that moved a friend between pages can repeat them
+                    const fresh = (page.friends || []).filter((friend) => !seen.has(friend.id))
+                    fresh.forEach((friend) => seen.add(friend.id))
+                    friends = friends.concat(fresh)
+                    offset = page.next_offset
+                    if (showPages && offset != null && isCurrent()) setQueryData(FRIENDS_KEY, friends)
+                } while (offset != null)
+
+                return friends
+            })
         } catch (err) {
             setError(err.message)
         } finally {
             setLoading(false)
         }
-    }
+    }, [])
 
     useEffect(() => {
-        fetchFriends()
-    }, [JSON.stringify(filters)])
+        const unsubscribe = subscribeQuery(FRIENDS_KEY, (data) => {
+            setAllFriends(data || [])
+            setLoading(false)
+        })
+
+        const revalidate = () => {
+            if (isStale(FRIENDS_KEY, STALE_TIME)) fetchFriends()
+        }
+        revalidate()
+        window.addEventListener('focus', revalidate)
+
+        return () => {
+            unsubscribe()
+            window.removeEventListener('focus', revalidate)
+        }
+    }, [fetchFriends])
+
+    const friends = useMemo(
+        () => applyFilters(allFriends, filters),
+        [allFriends, filters.upcoming, filters.reminders]
+    )
 
-    const addFriend = async (friendData) => {
+    const addFriend = useCallback(async (friendData) => {
         try {
             const newFriend = await createFriend(friendData)
-            setFriends((prev) => [...prev, newFriend])
+            setQueryData(FRIENDS_KEY, (prev = []) => sortByNextBirthday([...prev, newFriend]))
             return newFriend
         } catch (err) {
             throw new Error(err.message)
         }
-    }
+    }, [])
 
-    const editFriend = async (friendId, friendData) => {
+    const editFriend = useCallback(async (friendId, friendData) => {
         try {
             const updatedFriend = await updateFriend(friendId, friendData)
-            setFriends((prev) =>
-                prev.map((f) => (f.id === friendId ? updatedFriend : f))
+            setQueryData(FRIENDS_KEY, (prev = []) =>
+                sortByNextBirthday(prev.map((f) => (f.id === friendId ? updatedFriend : f)))
             )
             return updatedFriend
         } catch (err) {
             throw new Error(err.message)
         }
-    }
+    }, [])
 
-    const removeFriend = async (friendId) => {
+    const removeFriend = useCallback(async (friendId) => {
         try {
             await deleteFriend(friendId)
-            setFriends((prev) => prev.filter((f) => f.id !== friendId))
+            setQueryData(FRIENDS_KEY, (prev = []) => prev.filter((f) => f.id !== friendId))
         } catch (err) {
             throw new Error(err.message)
         }
-    }
+    }, [])
 
     return {
         friends,
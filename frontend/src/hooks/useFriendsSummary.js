@@ -0,0 +1,57 @@
+/**
+ * Custom React hook for the dashboard counts.
+ *
+ * Reads /friends/summary, which the backend computes in one pass over the
+ * user's friends, so the counts are right before a large friend list has
+ * finished loading page by page. Refetched after the friend list changes.
+ */
+import { useState, useEffect } from 'react'
+import { getFriendsSummary } from '../services/api'
+import { fetchQuery, getQueryData, invalidateQuery, isStale, subscribeQuery } from '../services/queryCache'
+import { FRIENDS_KEY } from './useFriends'
+
+const SUMMARY_KEY = 'friends-summary'
+
+// Revalidate cached counts after this long (ms)
+const STALE_TIME = 30 * 1000
+
+// Wait for a burst of friend list updates (e.g. pages loading) to settle before refetching (ms)
+const REFRESH_DELAY = 500
+
+export const useFriendsSummary = () => {
+    const [summary, setSummary] = useState(() => getQueryData(SUMMARY_KEY) || null)
+
+    useEffect(() => {
+        let timer = null
+
+        const fetchSummary = () =>
+            // Only the counts are shown, so skip the next birthdays
+            fetchQuery(SUMMARY_KEY, () => getFriendsSummary(0)).catch(() => {
+                // The counts are optional; the friend list reports load errors
+            })
+
+        const unsubscribeSummary = subscribeQuery(SUMMARY_KEY, (data) => setSummary(data || null))
+        const unsubscribeFriends = subscribeQuery(FRIENDS_KEY, (data) => {
+            // Cleared on sign out: nothing to count
+            if (data === undefined) return
+            invalidateQuery(SUMMARY_KEY)
+            clearTimeout(timer)
+            timer = setTimeout(fetchSummary, REFRESH_DELAY)
+        })
+
+        const revalidate = () => {
+            if (isStale(SUMMARY_KEY, STALE_TIME)) fetchSummary()
+        }
+        revalidate()
+        window.addEventListener('focus', revalidate)
+
+        return () => {
+            clearTimeout(timer)
+            unsubscribeSummary()
+            unsubscribeFriends()
+            window.removeEventListener('focus', revalidate)
+        }
+    }, [])
+
+    return summary
+}
@@ -0,0 +1,87 @@
+/**
+ * Custom React hook for windowed rendering of a responsive grid.
+ *
+ * Only the rows near the viewport are rendered; the rest of the grid is
+ * replaced by top and bottom padding of the same height. Rows share one
+ * height, which grows to the tallest row measured so far.
+ */
+import { useState, useEffect, useLayoutEffect, useRef, useCallback } from 'react'
+
+// Tailwind md and lg breakpoints -> grid-cols-1 / md:grid-cols-2 / lg:grid-cols-3
+const getColumnCount = () => {
+    if (window.matchMedia('(min-width: 1024px)').matches) return 3
+    if (window.matchMedia('(min-width: 768px)').matches) return 2
+    return 1
+}
+
+export const useVirtualGrid = (itemCount, { estimatedRowHeight = 300, gap = 24, overscan = 3 } = {}) => {
+    const containerRef = useRef(null)
+    const rowRefs = useRef(new Map())
+    const [columns, setColumns] = useState(getColumnCount)
+    const [rowHeight, setRowHeight] = useState(estimatedRowHeight)
+    const [scroll, setScroll] = useState({ top: 0, height: window.innerHeight })
+
+    const rowCount = Math.ceil(itemCount / columns)
+    const rowStride = rowHeight + gap
+
+    // Read the viewport relative to the top of the grid
+    const measureViewport = useCallback(() => {
+        if (!containerRef.current) return
+        const containerTop = containerRef.current.getBoundingClientRect().top + window.scrollY
+        setScroll({ top: window.scrollY - containerTop, height: window.innerHeight })
+        setColumns(getColumnCount())
+    }, [])
+
+    // The page height changes with the item count (e.g. when a filter is applied)
+    useEffect(measureViewport, [itemCount, measureViewport])
+
+    useEffect(() => {
+        let frame = null
+        const update = () => {
+            frame = null
+            measureViewport()
+        }
+        const schedule = () => {
+            if (frame === null) frame = window.requestAnimationFrame(update)
+        }
+
+        window.addEventListener('scroll', schedule, { passive: true })
+        window.addEventListener('resize', schedule)
+        return () => {
+            window.removeEventListener('scroll', schedule)
+            window.removeEventListener('resize', schedule)
+            if (frame !== null) window.cancelAnimationFrame(frame)
+        }
+    }, [measureViewport])
+
+    const endRow = Math.min(rowCount, Math.max(0, Math.ceil((scroll.top + scroll.height) / rowStride) + overscan))
+    const startRow = Math.min(endRow, Math.max(0, Math.floor(scroll.top / rowStride) - overscan))
+
+    // Grow the shared row height to fit the tallest rendered row
+    useLayoutEffect(() => {
+        let tallest = rowHeight
+        rowRefs.current.forEach((node) => {
+            if (node) tallest = Math.max(tallest, node.offsetHeight)
+        })
+        if (tallest > rowHeight) setRowHeight(tallest)
+    })
+
+    const measureRow = useCallback((rowIndex) => (node) => {
+        if (node) rowRefs.current.set(rowIndex, node)
+        else rowRefs.current.delete(rowIndex)
+    }, [])
+
+    const rows = []
+    for (let row = startRow; row < endRow; row++) {
+        rows.push({ index: row, start: row * columns, end: Math.min(itemCount, (row + 1) * columns) })
+    }
+
+    return {
+        containerRef,
+        measureRow,
+        rows,
+        rowHeight,
+        paddingTop: startRow * rowStride,
+        paddingBottom: Math.max(0, (rowCount - endRow) * rowStride),
+    }
+}
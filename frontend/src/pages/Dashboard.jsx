@@ -2,12 +2,13 @@
  * Dashboard page component.
  * Main application page for managing friends.
  */
-import React, { useState } from 'react'
+import React, { useState, useCallback } from 'react'
 import { Layout } from '../components/Layout'
 import { FriendList } from '../components/FriendList'
 import { FriendForm } from '../components/FriendForm'
 import { AISuggestions } from '../components/AISuggestions'
 import { useFriends } from '../hooks/useFriends'
+import { useFriendsSummary } from '../hooks/useFriendsSummary'
 
 export const Dashboard = ({ user }) => {
     const [showForm, setShowForm] = useState(false)
@@ -21,6 +22,7 @@ export const Dashboard = ({ user }) => {
         reminders: filter === 'reminders',
     }
     const { friends, loading, error, refetch, addFriend, editFriend, removeFriend } = useFriends(filters)
+    const summary = useFriendsSummary()
 
     const handleAddFriend = async (friendData) => {
         await addFriend(friendData)
@@ -33,24 +35,26 @@ export const Dashboard = ({ user }) => {
         setShowForm(false)
     }
 
-    const handleDeleteFriend = async (friendId) => {
+    // Stable handlers let memoized friend cards skip re-rendering
+    const handleDeleteFriend = useCallback(async (friendId) => {
         if (window.confirm('Are you sure you want to delete this friend?')) {
             await removeFriend(friendId)
         }
-    }
+    }, [removeFriend])
 
-    const handleEdit = (friend) => {
+    const handleEdit = useCallback((friend) => {
         setEditingFriend(friend)
         setShowForm(true)
-    }
+    }, [])
 
     const handleCancelForm = () => {
         setShowForm(false)
         setEditingFriend(null)
     }
 
-    // Count reminders
-    const reminderCount = friends.filter((f) => f.is_reminder_due).length
+    // Counts come from the server, so they cover all friends before every page has loaded
+    const reminderCount = summary ? summary.reminders_due : 0
+    const countLabel = (key) => (summary ? ` (${summary[key]})` : '')
 
     return (
         <Layout user={user}>
@@ -84,7 +88,7 @@ export const Dashboard = ({ user }) => {
                             : 'bg-white dark:bg-slate-700 text-slate-700 dark:text-slate-300 border border-slate-300 dark:border-slate-600'
                         }`}
                 >
-                    All Friends
+                    All Friends{countLabel('total')}
                 </button>
                 <button
                     onClick={() => setFilter('reminders')}
@@ -93,7 +97,7 @@ export const Dashboard = ({ user }) => {
                             : 'bg-white dark:bg-slate-700 text-slate-700 dark:text-slate-300 border border-slate-300 dark:border-slate-600'
                         }`}
                 >
-                    🔔 Reminders
+                    🔔 Reminders{countLabel('reminders_due')}
                 </button>
                 <button
                     onClick={() => setFilter('upcoming')}
@@ -102,7 +106,7 @@ export const Dashboard = ({ user }) => {
                             : 'bg-white dark:bg-slate-700 text-slate-700 dark:text-slate-300 border border-slate-300 dark:border-slate-600'
                         }`}
                 >
-                    📅 Upcoming (30 days)
+                    📅 Upcoming (30 days){countLabel('upcoming')}
                 </button>
             </div>
 
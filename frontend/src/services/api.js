@@ -4,24 +4,50 @@
  */
 import axios from 'axios'
 import { supabase } from './auth'
+import { clearQueries } from './queryCache'
 
 const API_URL = import.meta.env.VITE_API_URL
 
+// Re-read the session this long (seconds) before the cached token expires
+const TOKEN_REFRESH_MARGIN = 60
+
+let cachedSession = null
+
+// Keep the cached session in sync with sign in/out and background refreshes
+supabase.auth.onAuthStateChange((event, session) => {
+    cachedSession = session
+    if (event === 'SIGNED_OUT') clearQueries()
+})
+
+/**
+ * Get the access token, only asking Supabase for the session near expiry
+ */
+const getAccessToken = async () => {
+    const now = Date.now() / 1000
+    if (!cachedSession || !cachedSession.expires_at || cachedSession.expires_at - now < TOKEN_REFRESH_MARGIN) {
+        const { data: { session } } = await supabase.auth.getSession()
+        cachedSession = session
+    }
+    return cachedSession?.access_token
+}
+
 // Create axios instance
 const apiClient = axios.create({
     baseURL: API_URL,
     headers: {
         'Content-Type': 'application/json',
+        // Lets the backend count days until birthdays from the user's local date
+        'X-Timezone': Intl.DateTimeFormat().resolvedOptions().timeZone,
     },
 })
 
 // Request interceptor to add auth token
 apiClient.interceptors.request.use(
     async (config) => {
-        const { data: { session } } = await supabase.auth.getSession()
+        const accessToken = await getAccessToken()
 
-        if (session?.access_token) {
-            config.headers.Authorization = `Bearer ${session.access_token}`
+        if (accessToken) {
+            config.headers.Authorization = `Bearer ${accessToken}`
         }
 
         return config
@@ -52,17 +78,36 @@ apiClient.interceptors.response.use(
 // API methods
 
 /**
- * Get all friends
+ * Get friends (one page when limit is given)
  */
 export const getFriends = async (filters = {}) => {
     const params = new URLSearchParams()
     if (filters.upcoming) params.append('upcoming', 'true')
     if (filters.reminders) params.append('reminders', 'true')
+    if (filters.limit) params.append('limit', filters.limit)
+    if (filters.offset) params.append('offset', filters.offset)
 
     const response = await apiClient.get(`/friends?${params.toString()}`)
     return response.data
 }
 
+/**
+ * Get dashboard counts and the next few birthdays in one call
+ */
+export const getFriendsSummary = async (next = 5) => {
+    const response = await apiClient.get(`/friends/summary?next=${next}`)
+    return response.data
+}
+
+/**
+ * Search friends by name and notes, best match first
+ */
+export const searchFriends = async (query, { limit = 20, offset = 0 } = {}) => {
+    const params = new URLSearchParams({ q: query, limit, offset })
+    const response = await apiClient.get(`/friends/search?${params.toString()}`)
+    return response.data
+}
+
 /**
  * Get single friend by ID
  */
@@ -94,6 +139,14 @@ export const deleteFriend = async (friendId) => {
     await apiClient.delete(`/friends/${friendId}`)
 }
 
+/**
+ * Get the URL of the user's birthday calendar feed (for calendar app subscriptions)
+ */
+export const getCalendarFeedUrl = async () => {
+    const response = await apiClient.get('/calendar/feed')
+    return response.data.url
+}
+
 /**
  * Get AI suggestions for friend
  */
@@ -0,0 +1,102 @@
+/**
+ * Client-side query cache.
+ * Stale-while-revalidate caching with in-flight request deduplication.
+ */
+
+// key -> { data, fetchedAt, promise, listeners }
+const queries = new Map()
+
+// Bumped by clearQueries so fetches started before it cannot write old data back
+let epoch = 0
+
+const getEntry = (key) => {
+    if (!queries.has(key)) {
+        queries.set(key, { data: undefined, fetchedAt: 0, promise: null, listeners: new Set() })
+    }
+    return queries.get(key)
+}
+
+const notify = (entry) => {
+    entry.listeners.forEach((listener) => listener(entry.data))
+}
+
+/**
+ * Get cached data for a key (undefined if never fetched)
+ */
+export const getQueryData = (key) => queries.get(key)?.data
+
+/**
+ * Check whether cached data is older than staleTime (ms)
+ */
+export const isStale = (key, staleTime) => {
+    const entry = queries.get(key)
+    return !entry || entry.data === undefined || Date.now() - entry.fetchedAt > staleTime
+}
+
+/**
+ * Fetch data for a key, sharing one request between concurrent callers.
+ * The fetcher gets an isCurrent() check that turns false once the cache is cleared,
+ * and its result is not cached if the cache was cleared meanwhile.
+ */
+export const fetchQuery = (key, fetcher) => {
+    const entry = getEntry(key)
+    if (entry.promise) return entry.promise
+
+    const fetchEpoch = epoch
+    const isCurrent = () => fetchEpoch === epoch
+
+    const promise = fetcher(isCurrent)
+        .then((data) => {
+            if (isCurrent()) {
+                entry.data = data
+                entry.fetchedAt = Date.now()
+                notify(entry)
+            }
+            return data
+        })
+        .finally(() => {
+            if (entry.promise === promise) entry.promise = null
+        })
+
+    entry.promise = promise
+    return promise
+}
+
+/**
+ * Update cached data locally (e.g. after a mutation) and notify subscribers
+ */
+export const setQueryData = (key, updater) => {
+    const entry = getEntry(key)
+    entry.data = typeof updater === 'function' ? updater(entry.data) : updater
+    notify(entry)
+}
+
+/**
+ * Subscribe to data changes for a key. Returns an unsubscribe function.
+ */
+export const subscribeQuery = (key, listener) => {
+    const entry = getEntry(key)
+    entry.listeners.add(listener)
+    return () => entry.listeners.delete(listener)
+}
+
+/**
+ * Mark a key stale so the next read revalidates it
+ */
+export const invalidateQuery = (key) => {
+    const entry = queries.get(key)
+    if (entry) entry.fetchedAt = 0
+}
+
+/**
+ * Drop all cached data and in-flight fetches (e.g. on sign out)
+ */
+export const clearQueries = () => {
+    epoch += 1
+    queries.forEach((entry) => {
+        entry.data = undefined
+        entry.fetchedAt = 0
+        entry.promise = null
+        notify(entry)
+    })
+}